@@ -0,0 +1,12 @@
+#!/bin/sh
+# Entrypoint: source the pre-rendered pixi environment, then exec the command.
+# No interpreter start-up or JSON parsing; entrypoint.py remains the fallback
+# for images built without /app/pixi_env.sh.
+if [ -r /app/pixi_env.sh ]; then
+    # shellcheck disable=SC1091
+    . /app/pixi_env.sh
+else
+    exec /app/python_runtime /app/entrypoint.py "$@"
+fi
+[ "$#" -gt 0 ] || set -- /bin/bash
+exec "$@"
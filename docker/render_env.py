@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Render the frozen pixi environment as a POSIX shell file for entrypoint.sh.
+
+``/app/pixi_env.json`` is produced in the builder stage; this turns it into
+``export NAME='value'`` lines at build time so container start-up only has to
+``.``-source a file instead of starting Python to parse JSON.
+"""
+
+import json
+import shlex
+import sys
+from pathlib import Path
+
+
+def render(env: dict[str, str]) -> str:
+    """Return ``export`` lines for every variable a shell can name, sorted by name."""
+    lines = [
+        f"export {name}={shlex.quote(str(value))}"
+        for name, value in sorted(env.items())
+        if name.isidentifier() and name.isascii()
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    """Convert ``argv[1]`` (JSON) into ``argv[2]`` (shell)."""
+    src, dest = (Path(arg) for arg in sys.argv[1:3])
+    dest.write_text(render(json.loads(src.read_text(encoding="utf-8"))), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
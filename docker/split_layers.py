@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Split the pixi prefix into a stable toolchain layer and a volatile remainder.
+
+Runs in the builder stage. Every file or symlink under ``--pixi-dir`` is hard-linked into
+``<out>/toolchain`` when it belongs to a compiler/LLVM package (per the
+``conda-meta`` records), or ``<out>/rest`` otherwise, keeping its absolute
+path. The runtime stage COPYs the two trees as separate layers, so a lockfile
+bump that leaves the toolchain alone only changes the smaller one.
+
+Timestamps are normalised to ``SOURCE_DATE_EPOCH`` (default 0) so an unchanged
+toolchain reinstalled by a rebuild still produces a byte-identical layer.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import shutil
+from pathlib import Path
+
+TOOLCHAIN_PACKAGES = (
+    "binutils*",
+    "clang*",
+    "compiler-rt*",
+    "gcc*",
+    "gxx*",
+    "kernel-headers_*",
+    "ld_impl_*",
+    "libclang*",
+    "libgcc*",
+    "libgomp",
+    "liblld*",
+    "libllvm*",
+    "libsanitizer",
+    "libstdcxx*",
+    "lld",
+    "lldb",
+    "llvm*",
+    "mlir*",
+    "sysroot_*",
+)
+LAYERS = ("toolchain", "rest")
+
+
+def toolchain_files(pixi_dir: Path) -> set[Path]:
+    """Return absolute paths owned by toolchain packages in every pixi environment."""
+    owned: set[Path] = set()
+    for record in pixi_dir.glob("envs/*/conda-meta/*.json"):
+        data = json.loads(record.read_text(encoding="utf-8"))
+        name = data.get("name", "")
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in TOOLCHAIN_PACKAGES):
+            continue
+        prefix = record.parent.parent
+        owned.add(record)
+        owned.update(prefix / rel for rel in data.get("files", []))
+    return owned
+
+
+def place(src: Path, dest: Path) -> None:
+    """Hard-link (or copy) ``src`` to ``dest``, recreating symlinks as symlinks."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if src.is_symlink():
+        dest.symlink_to(src.readlink())
+        return
+    try:
+        dest.hardlink_to(src)
+    except OSError:
+        shutil.copy2(src, dest)
+
+
+def normalize_mtimes(root: Path, epoch: int) -> None:
+    """Set every path under ``root`` (symlinks included, not followed) to ``epoch``."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in [*dirnames, *filenames]:
+            os.utime(Path(dirpath) / name, (epoch, epoch), follow_symlinks=False)
+    os.utime(root, (epoch, epoch))
+
+
+def split(pixi_dir: Path, out: Path) -> dict[str, int]:
+    """Distribute ``pixi_dir`` over the layer trees and return bytes per layer.
+
+    Empty directories go to the ``rest`` layer, and every recreated directory
+    keeps the mode of its source.
+    """
+    owned = toolchain_files(pixi_dir)
+    sizes = dict.fromkeys(LAYERS, 0)
+    for layer in LAYERS:
+        (out / layer).mkdir(parents=True, exist_ok=True)
+    directories = []
+    for dirpath, dirnames, filenames in os.walk(pixi_dir):
+        directory = Path(dirpath)
+        directories.append(directory)
+        # os.walk lists symlinks to directories (lib64 -> lib) under dirnames
+        # without descending into them; they are placed like any other link.
+        links = [name for name in dirnames if (directory / name).is_symlink()]
+        for name in [*links, *filenames]:
+            src = directory / name
+            layer = "toolchain" if src in owned else "rest"
+            place(src, out / layer / src.relative_to(src.anchor))
+            sizes[layer] += src.lstat().st_size
+        if not dirnames and not filenames:
+            (out / "rest" / directory.relative_to(directory.anchor)).mkdir(parents=True)
+    # Deepest first, so a read-only directory is only locked once it is filled.
+    for directory in reversed(directories):
+        for layer in LAYERS:
+            dest = out / layer / directory.relative_to(directory.anchor)
+            if dest.is_dir():
+                shutil.copystat(directory, dest)
+    return sizes
+
+
+def main() -> None:
+    """Split the prefix and report the size of each layer."""
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--pixi-dir", type=Path, default=Path("/app/.pixi"))
+    p.add_argument("--out", type=Path, default=Path("/layers"))
+    args = p.parse_args()
+
+    sizes = split(args.pixi_dir, args.out)
+    epoch = int(os.environ.get("SOURCE_DATE_EPOCH", "0"))
+    for layer in LAYERS:
+        normalize_mtimes(args.out / layer, epoch)
+        print(f"{layer}: {sizes[layer] / 1024**2:.1f} MiB")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -27,13 +27,26 @@ TEMPLATE_PATHS = [
     "docker/Dockerfile",
     "docker/docker-bake.hcl",
     "docker/entrypoint.py",
+    "docker/entrypoint.sh",
+    "docker/render_env.py",
+    "docker/split_layers.py",
     "scripts/__init__.py",
     "scripts/build.py",
+    "scripts/devcontainer_ports.py",
     "scripts/validate.py",
     "scripts/validate_container.py",
     "scripts/setup_dev.py",
     "scripts/lib/__init__.py",
+    "scripts/lib/bake.py",
+    "scripts/lib/buildkit_cache.py",
+    "scripts/lib/cache.py",
+    "scripts/lib/console.py",
     "scripts/lib/container_init.py",
+    "scripts/lib/image_layers.py",
+    "scripts/lib/procs.py",
+    "scripts/lib/profile_report.py",
+    "scripts/lib/scheduler.py",
+    "scripts/lib/tool_cache.py",
     "scripts/tests/__init__.py",
     "scripts/tests/test_build_unit.py",
     "scripts/tests/test_validate_unit.py",
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark devcontainer listing latency as the container count grows.
+
+Creates throwaway (never started) containers that carry a dedicated
+``devcontainer.local_folder`` label, then times ``devcontainer_list.list_rows``
+at each count. Listing uses a fixed number of docker calls, so the median
+should stay roughly flat from 1 to 40 containers. The containers are removed
+afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from scripts.devcontainer_list import DOCKER, LABEL, list_rows
+from scripts.lib.console import LazyConsole
+from scripts.lib.run_history import percentile
+
+console = LazyConsole()
+
+DEFAULT_COUNTS = (1, 10, 40)
+DEFAULT_IMAGE = "busybox:stable"
+DEFAULT_RUNS = 10
+BENCH_LABEL = f"{LABEL}=/tmp/pixi-devcontainer-bench"
+
+
+def time_listing(label: str, runs: int) -> list[float]:
+    """Return ``runs`` listing latencies (ms) for containers matching ``label``."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter_ns()
+        list_rows(label)
+        samples.append((time.perf_counter_ns() - started) / 1e6)
+    return samples
+
+
+def summarize(samples: dict[int, list[float]]) -> dict[int, dict[str, float]]:
+    """Return median/p95 (ms) per container count and the slowdown over the smallest count."""
+    baseline = statistics.median(samples[min(samples)]) if samples else 0.0
+    summary = {}
+    for count, values in sorted(samples.items()):
+        median = statistics.median(values)
+        summary[count] = {
+            "median_ms": median,
+            "p95_ms": percentile(values, 0.95),
+            "slowdown": median / baseline if baseline else 0.0,
+        }
+    return summary
+
+
+def create_containers(image: str, count: int) -> list[str]:  # pragma: no cover - docker
+    """Create ``count`` stopped containers labelled for the benchmark."""
+    return [
+        subprocess.check_output(  # noqa: S603
+            [DOCKER, "create", "--label", BENCH_LABEL, image, "true"],
+            text=True,
+        ).strip()
+        for _ in range(count)
+    ]
+
+
+def run_benchmark(  # pragma: no cover - docker
+    image: str,
+    counts: list[int],
+    runs: int,
+) -> dict[int, list[float]]:
+    """Grow the labelled container set through ``counts`` and time listing at each step."""
+    created: list[str] = []
+    samples: dict[int, list[float]] = {}
+    try:
+        for count in sorted(counts):
+            created += create_containers(image, count - len(created))
+            list_rows(BENCH_LABEL)  # warm-up
+            samples[count] = time_listing(BENCH_LABEL, runs)
+    finally:
+        if created:
+            subprocess.run(  # noqa: S603
+                [DOCKER, "rm", "-f", *created],
+                capture_output=True,
+                check=False,
+            )
+    return samples
+
+
+def print_summary(summary: dict[int, dict[str, float]]) -> None:
+    """Render the summary table."""
+    from rich.table import Table  # noqa: PLC0415 - keep rich off the import path
+
+    table = Table(title="Devcontainer listing latency")
+    table.add_column("Containers", justify="right", style="cyan")
+    for column in ("median (ms)", "p95 (ms)", "slowdown"):
+        table.add_column(column, justify="right")
+    for count, stats in summary.items():
+        table.add_row(
+            str(count),
+            f"{stats['median_ms']:.1f}",
+            f"{stats['p95_ms']:.1f}",
+            f"{stats['slowdown']:.2f}x",
+        )
+    console.print(table)
+
+
+def parse_args() -> argparse.Namespace:  # pragma: no cover
+    """Parse CLI arguments."""
+    p = argparse.ArgumentParser(description="Benchmark devcontainer listing latency")
+    p.add_argument(
+        "--counts",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_COUNTS),
+        help="container counts to measure",
+    )
+    p.add_argument("--image", default=DEFAULT_IMAGE, help="image for the throwaway containers")
+    p.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="samples per count")
+    p.add_argument("--json", action="store_true", help="print the summary as JSON instead")
+    return p.parse_args()
+
+
+def main() -> int:  # pragma: no cover
+    """Benchmark listing at each container count and report the results."""
+    args = parse_args()
+    try:
+        samples = run_benchmark(args.image, args.counts, args.runs)
+    except subprocess.CalledProcessError as exc:
+        console.print(f"[red]Benchmark failed:[/] {exc}")
+        return 1
+    summary = summarize(samples)
+    if args.json:
+        sys.stdout.write(json.dumps(summary, indent=2) + "\n")
+    else:
+        print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
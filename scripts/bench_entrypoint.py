@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark container start-up latency through each entrypoint path.
+
+Times, inside one container, how long it takes to get from exec to a trivial
+command (``/bin/true``) running with the pixi environment loaded. It compares
+``/app/entrypoint.sh`` (which sources the pre-rendered env) with the
+``entrypoint.py`` fallback (which starts Python and parses JSON). A direct exec
+of ``/bin/true`` is the baseline, and its time is subtracted as overhead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from scripts.lib.console import LazyConsole
+
+console = LazyConsole()
+
+DEFAULT_IMAGE = "cpp-devcontainer:validation-noble-stable"
+DEFAULT_RUNS = 50
+PATHS = {
+    "direct": ["/bin/true"],
+    "entrypoint.sh": ["/app/entrypoint.sh", "/bin/true"],
+    "entrypoint.py": ["/app/python_runtime", "/app/entrypoint.py", "/bin/true"],
+}
+
+# Runs inside the container; spawning from an already-running process keeps
+# docker's own exec overhead out of the numbers.
+BENCH_SCRIPT = """
+import json, subprocess, sys, time
+paths, runs = json.loads(sys.argv[1]), int(sys.argv[2])
+samples = {name: [] for name in paths}
+for _ in range(runs):
+    for name, cmd in paths.items():
+        started = time.perf_counter_ns()
+        subprocess.run(cmd, check=True)
+        samples[name].append((time.perf_counter_ns() - started) / 1e6)
+print(json.dumps(samples))
+"""
+
+
+def summarize(samples: dict[str, list[float]]) -> dict[str, dict[str, float]]:
+    """Return min/median/p95 (ms) per path and the median overhead over ``direct``."""
+    baseline = statistics.median(samples["direct"]) if samples.get("direct") else 0.0
+    summary = {}
+    for name, values in samples.items():
+        ordered = sorted(values)
+        median = statistics.median(ordered)
+        summary[name] = {
+            "min_ms": ordered[0],
+            "median_ms": median,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "overhead_ms": max(median - baseline, 0.0),
+        }
+    return summary
+
+
+def run_benchmark(image: str, runs: int) -> dict[str, list[float]]:  # pragma: no cover
+    """Run the timing loop in a throwaway container and return raw samples (ms)."""
+    result = subprocess.run(  # noqa: S603
+        [  # noqa: S607
+            "docker",
+            "run",
+            "--rm",
+            "--entrypoint",
+            "/app/python_runtime",
+            image,
+            "-c",
+            BENCH_SCRIPT,
+            json.dumps(PATHS),
+            str(runs),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def print_summary(summary: dict[str, dict[str, float]]) -> None:
+    """Render the summary table."""
+    from rich.table import Table  # noqa: PLC0415 - keep rich off the import path
+
+    table = Table(title="Entrypoint start-up latency")
+    table.add_column("Path", style="cyan")
+    for column in ("min", "median", "p95", "overhead"):
+        table.add_column(f"{column} (ms)", justify="right")
+    for name, stats in summary.items():
+        table.add_row(
+            name,
+            f"{stats['min_ms']:.2f}",
+            f"{stats['median_ms']:.2f}",
+            f"{stats['p95_ms']:.2f}",
+            f"{stats['overhead_ms']:.2f}",
+        )
+    console.print(table)
+
+
+def parse_args() -> argparse.Namespace:  # pragma: no cover
+    """Parse CLI arguments."""
+    p = argparse.ArgumentParser(description="Benchmark entrypoint start-up latency")
+    p.add_argument("--image", default=DEFAULT_IMAGE, help="runtime image to benchmark")
+    p.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="samples per path")
+    p.add_argument("--json", action="store_true", help="print the summary as JSON instead")
+    return p.parse_args()
+
+
+def main() -> int:  # pragma: no cover
+    """Benchmark both entrypoint paths and report the results."""
+    args = parse_args()
+    try:
+        samples = run_benchmark(args.image, args.runs)
+    except subprocess.CalledProcessError as exc:
+        console.print(f"[red]Benchmark failed in {args.image}:[/]\n{exc.stderr}")
+        return 1
+    summary = summarize(samples)
+    if args.json:
+        sys.stdout.write(json.dumps(summary, indent=2) + "\n")
+    else:
+        print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Measure CLI import cost with ``python -X importtime`` and enforce a budget.
+
+Every entry point is imported in a fresh interpreter (best of ``--runs``). The
+report shows its cumulative import time, its heaviest imports, and any heavy
+optional modules (rich) that leaked onto the start-up path.
+
+Usage examples:
+  python -m scripts.bench_startup
+  python -m scripts.bench_startup --budget-ms 80 scripts.build
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from scripts.lib.console import LazyConsole
+
+console = LazyConsole()
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CLI_MODULES = (
+    "scripts.bench_entrypoint",
+    "scripts.build",
+    "scripts.gha_history",
+    "scripts.gha_monitor",
+    "scripts.lib.container_init",
+    "scripts.prepush",
+    "scripts.setup_dev",
+    "scripts.validate",
+    "scripts.validate_container",
+)
+# Imported lazily by the CLIs; seeing them at import time is a regression.
+HEAVY_MODULES = ("rich",)
+BUDGET_MS = 100.0
+DEFAULT_RUNS = 3
+
+
+@dataclass
+class ImportProfile:
+    """Import cost of one module in a fresh interpreter."""
+
+    module: str
+    cumulative_ms: float
+    heavy: list[str] = field(default_factory=list)
+    top: list[tuple[str, float]] = field(default_factory=list)
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[float, float]]:
+    """Map each imported module to its (self, cumulative) import time in ms."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|", 2)
+        times[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return times
+
+
+def profile_from(module: str, times: dict[str, tuple[float, float]], top: int = 5) -> ImportProfile:
+    """Summarise one importtime run for ``module``."""
+    heavy = sorted(
+        name for name in times if any(name.split(".")[0] == pkg for pkg in HEAVY_MODULES)
+    )
+    slowest = sorted(
+        ((name, own) for name, (own, _) in times.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return ImportProfile(
+        module=module,
+        cumulative_ms=times.get(module, (0.0, 0.0))[1],
+        heavy=heavy,
+        top=slowest[:top],
+    )
+
+
+def measure(module: str, runs: int = DEFAULT_RUNS) -> ImportProfile:
+    """Import ``module`` ``runs`` times in fresh interpreters and keep the fastest run."""
+    profiles = []
+    for _ in range(max(1, runs)):
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            cwd=REPO_ROOT,
+            check=True,
+        )
+        profiles.append(profile_from(module, parse_importtime(result.stderr)))
+    return min(profiles, key=lambda profile: profile.cumulative_ms)
+
+
+def over_budget(profile: ImportProfile, budget_ms: float) -> bool:
+    """Return True if the module is too slow to import or pulls in heavy modules."""
+    return profile.cumulative_ms > budget_ms or bool(profile.heavy)
+
+
+def parse_args() -> argparse.Namespace:  # pragma: no cover
+    """Parse CLI arguments."""
+    p = argparse.ArgumentParser(description="Benchmark CLI import time against a budget")
+    p.add_argument("modules", nargs="*", default=list(CLI_MODULES), help="modules to import")
+    p.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="per-module import budget")
+    p.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="fresh imports per module")
+    return p.parse_args()
+
+
+def main() -> int:  # pragma: no cover
+    """Profile each module and fail if any exceeds the budget."""
+    args = parse_args()
+    failed = False
+    for module in args.modules:
+        profile = measure(module, args.runs)
+        bad = over_budget(profile, args.budget_ms)
+        failed |= bad
+        mark = "[red]✗" if bad else "[green]✓"
+        console.print(f"{mark} {module}: {profile.cumulative_ms:.1f} ms[/]")
+        if profile.heavy:
+            console.print(f"    heavy imports: {', '.join(profile.heavy[:5])}")
+        for name, own in profile.top:
+            console.print(f"    {own:6.1f} ms  {name}", highlight=False)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
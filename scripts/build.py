@@ -1,18 +1,52 @@
 #!/usr/bin/env python3
 """Build and publish devcontainer images with reproducible hashing."""
 
+import argparse
+import fnmatch
 import hashlib
+import itertools
+import json
 import os
 import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from rich.console import Console
+from scripts.lib import buildkit_cache
+from scripts.lib.bake import (
+    Step,
+    bake_command,
+    bake_definition,
+    render_markdown,
+    stream_bake,
+    summarize,
+    vertex_steps,
+)
+from scripts.lib.cache import FileDigestCache, hash_file, user_cache_dir, write_json_atomic
+from scripts.lib.console import LazyConsole
+from scripts.lib.image_layers import Layer, LayerDelta, layer_delta, manifest_layers
 
-console = Console()
+console = LazyConsole()
 BASE_IMAGES = {
     "focal": "ghcr.io/prefix-dev/pixi:focal",
     "noble": "ghcr.io/prefix-dev/pixi:noble",
 }
+DOCKERFILE = Path("docker/Dockerfile")
+# Always hashed, whatever the Dockerfile copies: they shape the build itself.
+HASH_BASE_INPUTS = ("pixi.lock", "pixi.toml", "docker/Dockerfile", "docker/docker-bake.hcl")
+DIGEST_TTL_S = 15 * 60
+TARGETS_ENV = "BUILD_TARGETS"
+DIGEST_FILE_ENV = "BASE_DIGESTS_FILE"
+REGISTRY_MIRROR_ENV = "BASE_IMAGE_MIRROR"
+
+
+class DigestError(RuntimeError):
+    """Raised in strict mode when a base image digest cannot be resolved."""
+
+
+class TargetError(ValueError):
+    """Raised when a requested bake target is not defined in the bake file."""
 
 
 def get_remote_digest(image: str) -> str:  # pragma: no cover - external docker call
@@ -41,20 +75,411 @@ def get_remote_digest(image: str) -> str:  # pragma: no cover - external docker
     return "latest"
 
 
-def calculate_hash(digests: dict[str, str]) -> str:
-    """Combine file contents and remote digests into a short config hash."""
-    hasher = hashlib.sha256()
-    for f in ["pixi.lock", "pixi.toml", "docker/Dockerfile", "docker/docker-bake.hcl"]:
-        path = Path(f)
-        if not path.exists():
+def mirror_ref(image: str, mirror: str | None) -> str:
+    """Point ``image`` at a registry mirror (e.g. ``localhost:5000``), keeping its repository."""
+    if not mirror:
+        return image
+    _, _, repository = image.partition("/")
+    return f"{mirror.rstrip('/')}/{repository}"
+
+
+def load_digest_file(path: Path) -> dict[str, str]:
+    """Read an offline ``{image ref or BASE_IMAGES key: digest}`` JSON map."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {str(k): str(v) for k, v in data.items()}
+
+
+def resolve_digests(
+    images: dict[str, str],
+    *,
+    strict: bool = False,
+    ttl: float = DIGEST_TTL_S,
+    digest_file: Path | None = None,
+    mirror: str | None = None,
+) -> dict[str, str]:
+    """Resolve base image digests: offline file, then TTL cache, then concurrent lookups.
+
+    Cache entries are keyed by the ref actually looked up, so a digest read
+    from a mirror is never replayed as the upstream one (or vice versa).
+    Lookups that fall back to ``latest`` are never cached; in ``strict`` mode
+    they raise :class:`DigestError` instead.
+    """
+    offline = load_digest_file(digest_file) if digest_file else {}
+    cache_path = user_cache_dir("build", "base-digests.json")
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cached = {}
+
+    now = time.time()
+    resolved: dict[str, str] = {}
+    pending: dict[str, str] = {}
+    for name, ref in images.items():
+        lookup = mirror_ref(ref, mirror)
+        entry = cached.get(lookup)
+        if ref in offline or name in offline:
+            resolved[name] = offline.get(ref) or offline[name]
+        elif entry and now - entry["fetched"] < ttl:
+            resolved[name] = entry["digest"]
+        else:
+            pending[name] = lookup
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as exe:
+            fetched = dict(zip(pending, exe.map(get_remote_digest, pending.values()), strict=True))
+        for name, digest in fetched.items():
+            resolved[name] = digest
+            if digest != "latest":
+                cached[pending[name]] = {"digest": digest, "fetched": now}
+        write_json_atomic(cache_path, cached)
+
+    unresolved = sorted(name for name, digest in resolved.items() if digest == "latest")
+    if strict and unresolved:
+        message = f"Could not resolve base image digests: {', '.join(unresolved)}"
+        raise DigestError(message)
+    return {name: resolved[name] for name in images}
+
+
+def dockerfile_copy_sources(dockerfile: Path) -> list[str]:
+    """Return the build-context sources of every COPY/ADD (``--from`` stages excluded)."""
+    sources: list[str] = []
+    text = dockerfile.read_text(encoding="utf-8").replace("\\\n", " ")
+    for line in text.splitlines():
+        words = line.split()
+        if not words or words[0].upper() not in {"COPY", "ADD"}:
             continue
-        with path.open("rb") as file:
-            hasher.update(file.read())
+        if any(w.startswith("--from=") for w in words[1:]):
+            continue
+        args = [w for w in words[1:] if not w.startswith("--")]
+        if args and args[0].startswith("["):
+            try:
+                args = json.loads(" ".join(args))
+            except ValueError:
+                continue
+        sources.extend(src for src in args[:-1] if "://" not in src and not src.startswith("<<"))
+    return sources
+
+
+def dockerignore_patterns(context: Path) -> list[str]:
+    """Return the exclusion patterns from the context's .dockerignore (negations skipped)."""
+    path = context / ".dockerignore"
+    if not path.is_file():
+        return []
+    lines = (line.strip() for line in path.read_text(encoding="utf-8").splitlines())
+    return [line.strip("/") for line in lines if line and not line.startswith(("#", "!"))]
+
+
+def _ignored(rel: Path, patterns: list[str]) -> bool:
+    names = [rel.as_posix(), *rel.parts]
+    return any(fnmatch.fnmatch(name, pat) for pat in patterns for name in names)
+
+
+def hash_inputs(dockerfile: Path = DOCKERFILE, context: Path = Path()) -> list[Path]:
+    """Return the sorted files that feed the image: the base inputs plus COPY/ADD sources."""
+    candidates = [context / name for name in HASH_BASE_INPUTS]
+    if dockerfile.is_file():
+        for src in dockerfile_copy_sources(dockerfile):
+            pattern = src.removeprefix("./").rstrip("/") or "."
+            if any(ch in pattern for ch in "*?["):
+                candidates.extend(context.glob(pattern))
+            else:
+                candidates.append(context / pattern)
+    patterns = dockerignore_patterns(context)
+    files: set[Path] = set()
+    for path in candidates:
+        if path.is_dir():
+            tree = (p for p in path.rglob("*") if p.is_file())
+            files.update(p for p in tree if not _ignored(p.relative_to(context), patterns))
+        elif path.is_file():
+            files.add(path)
+    return sorted(files)
+
+
+def calculate_hash(
+    digests: dict[str, str],
+    cache: FileDigestCache | None = None,
+    dockerfile: Path = DOCKERFILE,
+) -> str:
+    """Combine input file digests and remote digests into a short config hash.
+
+    Files are hashed in fixed-size chunks; with a ``cache``, unchanged files
+    (same size and mtime) reuse their digest from the previous run.
+    """
+    hasher = hashlib.sha256()
+    for path in hash_inputs(dockerfile):
+        digest = cache.digest(path) if cache else hash_file(path)
+        hasher.update(f"{path.as_posix()}\0{digest}\n".encode())
     for k, v in digests.items():
         hasher.update(f"{k}:{v}".encode())
     return hasher.hexdigest()[:12]
 
 
+def hash_tag(target: dict, config_hash: str) -> str | None:
+    """Return the target's content-addressed ``...-<config_hash>`` tag, if it has one."""
+    return next((t for t in target.get("tags", []) if t.endswith(f"-{config_hash}")), None)
+
+
+def tag_exists(ref: str) -> bool:
+    """Return True if ``ref`` resolves in its registry (manifest lookup only, no pull)."""
+    result = subprocess.run(  # noqa: S603
+        ["docker", "buildx", "imagetools", "inspect", ref],  # noqa: S607
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return result.returncode == 0
+
+
+def published_targets(targets: dict[str, dict], config_hash: str) -> set[str]:
+    """Return the targets whose content-hash tag is already in the registry.
+
+    Targets without a hash tag (e.g. local artifact exports) always count as
+    unpublished. Registry lookups run concurrently.
+    """
+    tagged = {name: ref for name, t in targets.items() if (ref := hash_tag(t, config_hash))}
+    if not tagged:
+        return set()
+    with ThreadPoolExecutor(max_workers=len(tagged)) as exe:
+        exists = dict(zip(tagged, exe.map(tag_exists, tagged.values()), strict=True))
+    return {name for name, present in exists.items() if present}
+
+
+def retag(target: dict, config_hash: str) -> bool:
+    """Point the target's other tags (e.g. ``-latest``) at its existing hash tag.
+
+    Uses ``imagetools create``, which copies the manifest inside the registry
+    without pulling or pushing layers.
+    """
+    source = hash_tag(target, config_hash)
+    others = [t for t in target.get("tags", []) if t != source]
+    if source is None or not others:
+        return True
+    tag_args = [arg for t in others for arg in ("--tag", t)]
+    result = subprocess.run(  # noqa: S603
+        ["docker", "buildx", "imagetools", "create", *tag_args, source],  # noqa: S607
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return result.returncode == 0
+
+
+def skip_published(plan: dict[str, dict], targets: list[str], config_hash: str) -> list[str]:
+    """Re-tag already-published targets and return the ones that still need baking."""
+    published = published_targets({name: plan[name] for name in targets}, config_hash)
+    for name in sorted(published):
+        if retag(plan[name], config_hash):
+            console.print(f"⏭️  {name}: {hash_tag(plan[name], config_hash)} exists, re-tagged")
+        else:
+            console.print(f"[yellow]{name}: published, but re-tagging failed[/]")
+    return [name for name in targets if name not in published]
+
+
+def split_targets(value: str) -> list[str]:
+    """Split a whitespace- or comma-separated target list (as in ``BUILD_TARGETS``)."""
+    return [name for name in value.replace(",", " ").split() if name]
+
+
+def select_targets(requested: list[str], plan: dict[str, dict], *, push: bool) -> list[str]:
+    """Validate requested targets against the bake plan, defaulting by mode.
+
+    Without a request, pushing builds every target of the ``default`` group and
+    local builds only the tagged image targets.
+    """
+    if not requested:
+        return [name for name in plan if push or plan[name].get("tags")]
+    unknown = [name for name in requested if name not in plan]
+    if unknown:
+        message = f"Unknown bake target(s): {', '.join(unknown)} (available: {', '.join(plan)})"
+        raise TargetError(message)
+    return list(dict.fromkeys(requested))
+
+
+def group_independent(targets: list[str]) -> list[list[str]]:
+    """Group targets by variant (``image-noble-stable`` and ``artifact-noble-stable``).
+
+    Targets of one variant share builder stages, so they stay in one bake
+    invocation; different variants are independent and can bake in parallel.
+    """
+    groups: dict[str, list[str]] = {}
+    for name in targets:
+        groups.setdefault(name.partition("-")[2] or name, []).append(name)
+    return list(groups.values())
+
+
+def bake_invocations(
+    groups: list[list[str]],
+    plan: dict[str, dict],
+    *,
+    push: bool,
+    overrides: dict[str, list[str]] | None = None,
+) -> list[list[str]]:
+    """Return the bake arguments (after ``-f <file>``) for each target group.
+
+    ``overrides`` maps a target to extra arguments (e.g. cache ``--set``s)
+    added to whichever invocation builds it.
+    """
+    overrides = overrides or {}
+    invocations = []
+    for group in groups:
+        extra = [arg for name in group for arg in overrides.get(name, [])]
+        if push:
+            invocations.append([*group, "--push", *extra])
+            continue
+        # Local: load tagged images into docker (single-arch); exports keep their output.
+        loads = [
+            arg
+            for name in group
+            if plan[name].get("tags")
+            for arg in ("--set", f"{name}.output=type=docker")
+        ]
+        invocations.append([*group, "--set", "*.platforms=linux/amd64", *loads, *extra])
+    return invocations
+
+
+def print_step(vertex: dict) -> None:
+    """Echo one completed BuildKit step (rawjson progress replaces the TTY view)."""
+    if vertex.get("error"):
+        state, style = "ERROR ", "red"
+    else:
+        state, style = ("CACHED" if vertex.get("cached") else "DONE  "), None
+    name = vertex.get("name", "")
+    console.print(f"  {state} {name}", markup=False, highlight=False, style=style)
+
+
+def publish_telemetry(telemetry_dir: Path, steps: list[Step]) -> dict:
+    """Summarise bake steps to ``summary.json`` and ``$GITHUB_STEP_SUMMARY``."""
+    metadata: dict[str, dict] = {}
+    for path in sorted(telemetry_dir.glob("bake-*.metadata.json")):
+        try:
+            metadata.update(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    summary = summarize(steps, metadata)
+    write_json_atomic(telemetry_dir / "summary.json", summary)
+    if "GITHUB_STEP_SUMMARY" in os.environ:
+        with Path(os.environ["GITHUB_STEP_SUMMARY"]).open("a", encoding="utf-8") as fh:
+            fh.write(render_markdown(summary))
+    for name, target in summary["targets"].items():
+        console.print(
+            f"📊 {name}: {target['cached']}/{target['steps']} steps cached "
+            f"({target['cache_hit_ratio']:.0%}), {target['executed_s']:.1f}s executed",
+        )
+    for step in summary["slowest_steps"][:3]:
+        console.print(f"   🐢 {step['duration_s']:.1f}s {step['name']}", markup=False)
+    return summary
+
+
+def run_bakes(
+    invocations: list[list[str]],
+    env: dict[str, str],
+    jobs: int = 1,
+    telemetry_dir: Path | None = None,
+) -> bool:
+    """Run bake invocations with at most ``jobs`` concurrently; True if all succeeded.
+
+    With ``telemetry_dir``, each bake writes ``--metadata-file`` and rawjson
+    progress there and the per-step timings are summarised afterwards.
+    """
+    jobs = max(1, min(jobs, len(invocations)))
+    progress = ["--progress=plain"] if jobs > 1 else []
+    steps: list[Step] = []
+    if telemetry_dir is not None:
+        telemetry_dir.mkdir(parents=True, exist_ok=True)
+        for stale in telemetry_dir.glob("bake-*"):
+            stale.unlink()
+
+    def bake(indexed: tuple[int, list[str]]) -> int:
+        index, args = indexed
+        if telemetry_dir is None:
+            cmd = [*bake_command(), *args, *progress]
+            return subprocess.run(cmd, env=env, check=False).returncode  # noqa: S603
+        metadata = telemetry_dir / f"bake-{index}.metadata.json"
+        cmd = [*bake_command(), *args, "--metadata-file", str(metadata), "--progress=rawjson"]
+        raw = telemetry_dir / f"bake-{index}.rawjson"
+        code, vertices = stream_bake(cmd, env, raw, print_step)
+        targets = list(itertools.takewhile(lambda arg: not arg.startswith("-"), args))
+        steps.extend(vertex_steps(vertices, targets))
+        return code
+
+    with ThreadPoolExecutor(max_workers=jobs) as exe:
+        codes = list(exe.map(bake, enumerate(invocations)))
+    for args, code in zip(invocations, codes, strict=True):
+        if code != 0:
+            console.print(f"[red]Bake failed ({code}): {' '.join(args)}[/]")
+    if telemetry_dir is not None:
+        publish_telemetry(telemetry_dir, steps)
+    return not any(codes)
+
+
+def cache_overrides(targets: list[str], args: argparse.Namespace) -> dict[str, list[str]]:
+    """Return the cache ``--set`` overrides, without exports on a ``docker`` driver builder."""
+    console.print(f"🗄️  Cache backend: {args.cache_backend}")
+    # gha keeps the bake file's entries, which buildx drops outside Actions.
+    export = args.cache_backend == "gha" or buildkit_cache.can_export(
+        buildkit_cache.builder_driver(),
+    )
+    if not export:
+        console.print(
+            "[yellow]The docker buildx driver cannot export a cache; skipping cache-to[/]",
+        )
+    return buildkit_cache.cache_overrides(
+        targets,
+        args.cache_backend,
+        cache_dir=args.cache_dir,
+        registry=args.cache_registry,
+        export=export,
+    )
+
+
+def snapshot_layers(
+    plan: dict[str, dict],
+    targets: list[str],
+    config_hash: str,
+) -> dict[str, list[Layer] | None]:
+    """Record the layers currently behind each target's non-hash tag (e.g. ``-latest``)."""
+    refs = {}
+    for name in targets:
+        source = hash_tag(plan[name], config_hash)
+        previous = next((t for t in plan[name].get("tags", []) if t != source), None)
+        if source and previous:
+            refs[name] = previous
+    if not refs:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(refs)) as exe:
+        return dict(zip(refs, exe.map(manifest_layers, refs.values()), strict=True))
+
+
+def report_layer_deltas(
+    plan: dict[str, dict],
+    previous: dict[str, list[Layer] | None],
+    config_hash: str,
+    out_dir: Path | None = None,
+) -> dict[str, LayerDelta]:
+    """Print how much of each new image a holder of the previous tag must pull."""
+    deltas = {}
+    for name, old in previous.items():
+        current = manifest_layers(hash_tag(plan[name], config_hash) or "")
+        if current is None:
+            continue
+        delta = deltas[name] = layer_delta(old, current)
+        reused = sum(layer["status"] == "reused" for layer in delta["layers"])
+        console.print(
+            f"📦 {name}: {delta['new_bytes'] / 1024**2:.1f} MiB new of "
+            f"{delta['total_bytes'] / 1024**2:.1f} MiB "
+            f"({reused}/{len(delta['layers'])} layers reused)",
+        )
+        for layer in delta["layers"]:
+            if layer["status"] == "new":
+                console.print(
+                    f"   layer {layer['index']}: {layer['size'] / 1024**2:.1f} MiB "
+                    f"{layer['digest'][:19]}",
+                )
+    if out_dir is not None and deltas:
+        write_json_atomic(out_dir / "layer-delta.json", deltas)
+    return deltas
+
+
 def upload_artifacts(
     *_: str,
 ) -> None:  # pragma: no cover
@@ -62,12 +487,118 @@ def upload_artifacts(
     console.log("Artifact upload skipped (handled by artifacts target)", style="yellow")
 
 
+def default_telemetry_dir() -> Path:
+    """Return $BUILD_TELEMETRY_DIR, else $ARTIFACTS_DIR/telemetry, else the user cache."""
+    if "BUILD_TELEMETRY_DIR" in os.environ:
+        return Path(os.environ["BUILD_TELEMETRY_DIR"])
+    if "ARTIFACTS_DIR" in os.environ:
+        return Path(os.environ["ARTIFACTS_DIR"]) / "telemetry"
+    return user_cache_dir("build", "telemetry")
+
+
+def parse_args() -> argparse.Namespace:  # pragma: no cover
+    """Parse CLI arguments."""
+    p = argparse.ArgumentParser(description="Build and optionally publish devcontainer images")
+    p.add_argument(
+        "targets",
+        nargs="*",
+        default=split_targets(os.getenv(TARGETS_ENV, "")),
+        help=f"bake targets to build (env: {TARGETS_ENV}; default: every target for the mode)",
+    )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=int(os.getenv("BUILD_JOBS", "1")),
+        help="independent variants baked concurrently (env: BUILD_JOBS)",
+    )
+    p.add_argument(
+        "--telemetry-dir",
+        type=Path,
+        default=default_telemetry_dir(),
+        help="where bake metadata, rawjson progress and summary.json are written "
+        "(env: BUILD_TELEMETRY_DIR; default: $ARTIFACTS_DIR/telemetry or the user cache)",
+    )
+    p.add_argument(
+        "--no-telemetry",
+        action="store_true",
+        help="stream bake's normal progress output instead of collecting telemetry",
+    )
+    p.add_argument(
+        "--cache-backend",
+        choices=buildkit_cache.BACKENDS,
+        default=buildkit_cache.select_backend(),
+        help=f"BuildKit cache backend (env: {buildkit_cache.BACKEND_ENV}; default: gha in "
+        f"Actions, registry if {buildkit_cache.REGISTRY_ENV} is set, else local)",
+    )
+    p.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=user_cache_dir("buildkit"),
+        help="directory for the local cache backend",
+    )
+    p.add_argument(
+        "--cache-registry",
+        default=os.getenv(buildkit_cache.REGISTRY_ENV),
+        help="image repository for the registry cache backend, e.g. localhost:5000/cpp-cache",
+    )
+    p.add_argument(
+        "--cache-max-gb",
+        type=float,
+        default=buildkit_cache.DEFAULT_MAX_BYTES / 1024**3,
+        help="prune the local cache directory down to this size after building",
+    )
+    p.add_argument(
+        "--strict-digests",
+        action="store_true",
+        default=os.getenv("STRICT_DIGESTS") == "1",
+        help="fail instead of falling back to 'latest' when a base digest is unresolvable",
+    )
+    p.add_argument(
+        "--digest-file",
+        type=Path,
+        default=Path(os.environ[DIGEST_FILE_ENV]) if DIGEST_FILE_ENV in os.environ else None,
+        help=f"offline JSON map of base image digests (env: {DIGEST_FILE_ENV})",
+    )
+    p.add_argument(
+        "--registry-mirror",
+        default=os.getenv(REGISTRY_MIRROR_ENV),
+        help=f"resolve base digests from this registry, e.g. localhost:5000 "
+        f"(env: {REGISTRY_MIRROR_ENV})",
+    )
+    p.add_argument(
+        "--force",
+        action="store_true",
+        default=os.getenv("FORCE_REBUILD") == "1",
+        help="bake every target even if its content-hash tag is already published",
+    )
+    p.add_argument(
+        "--digest-ttl",
+        type=float,
+        default=DIGEST_TTL_S,
+        help="seconds a resolved base digest is reused without a lookup (0 disables)",
+    )
+    return p.parse_args()
+
+
 def main() -> None:  # pragma: no cover
     """Entrypoint for building and optionally publishing images."""
+    args = parse_args()
     console.rule("[bold blue]Starting Build")
 
-    digests = {k: get_remote_digest(v) for k, v in BASE_IMAGES.items()}
-    config_hash = calculate_hash(digests)
+    try:
+        digests = resolve_digests(
+            BASE_IMAGES,
+            strict=args.strict_digests,
+            ttl=args.digest_ttl,
+            digest_file=args.digest_file,
+            mirror=args.registry_mirror,
+        )
+    except DigestError as exc:
+        console.print(f"[red]{exc}[/]")
+        sys.exit(1)
+    file_digests = FileDigestCache(user_cache_dir("build", "file-digests.json"))
+    config_hash = calculate_hash(digests, file_digests)
+    file_digests.save()
     console.print(f"🔑 Hash: {config_hash}")
 
     if "GITHUB_OUTPUT" in os.environ:
@@ -88,28 +619,37 @@ def main() -> None:  # pragma: no cover
     is_ci = bool(os.getenv("CI"))
     push_enabled = is_ci and not skip_push
 
-    base_cmd = ["docker", "buildx", "bake", "-f", "docker/docker-bake.hcl"]
+    try:
+        plan = bake_definition(["default"], env=env)
+        targets = select_targets(args.targets, plan, push=push_enabled)
+    except TargetError as exc:
+        console.print(f"[red]{exc}[/]")
+        sys.exit(1)
 
-    if push_enabled:
-        # CI: push multi-arch images and export artifacts
-        subprocess.run(  # noqa: S603
-            [*base_cmd, "default", "--push"],
-            env=env,
-            check=True,
-        )
-    else:
-        # Local or CI with push disabled: load single-arch image only
-        subprocess.run(  # noqa: S603
-            [
-                *base_cmd,
-                "image",
-                "--load",
-                "--set",
-                "*.platforms=linux/amd64",
-            ],
-            env=env,
-            check=True,
-        )
+    if push_enabled and not args.force:
+        # CI: skip images whose content-hash tag is already in the registry.
+        targets = skip_published(plan, targets, config_hash)
+        if not targets:
+            console.print("[green]✓ Every target is already published for this hash[/]")
+            return
+
+    console.print(f"🎯 Targets: {', '.join(targets)}")
+    # One bake already parallelises within BuildKit; --jobs > 1 adds separate
+    # bake processes per independent variant.
+    groups = group_independent(targets) if args.jobs > 1 else [targets]
+    overrides = cache_overrides(targets, args)
+    invocations = bake_invocations(groups, plan, push=push_enabled, overrides=overrides)
+    telemetry_dir = None if args.no_telemetry else args.telemetry_dir
+    previous = snapshot_layers(plan, targets, config_hash) if push_enabled else {}
+    ok = run_bakes(invocations, env, args.jobs, telemetry_dir)
+    if ok and previous:
+        report_layer_deltas(plan, previous, config_hash, telemetry_dir)
+    if args.cache_backend == "local":
+        max_bytes = int(args.cache_max_gb * 1024**3)
+        for path in buildkit_cache.prune(args.cache_dir, max_bytes):
+            console.print(f"🧹 Pruned cache scope {path.name}")
+    if not ok:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
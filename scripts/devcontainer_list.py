@@ -1,36 +1,197 @@
-"""List devcontainer containers with status, user, and ports."""
+"""List devcontainer containers with status, user, and ports.
+
+Listing costs two docker processes regardless of how many devcontainers exist:
+one ``docker ps`` for the ids and one ``docker inspect`` for all of them.
+``--stats`` adds CPU, memory, block I/O, uptime and ``--shm-size`` columns from
+one ``docker stats`` call. ``--watch`` keeps that single stats stream open and
+redraws in place on every frame. Each frame re-runs the one labelled
+``docker ps``, so the status column stays current and containers that appear or
+disappear restart the stream.
+
+Usage examples:
+  python -m scripts.devcontainer_list
+  python -m scripts.devcontainer_list --stats
+  python -m scripts.devcontainer_list --watch
+  python -m scripts.devcontainer_list --stats --json
+"""
 
 from __future__ import annotations
 
+import argparse
+import contextlib
 import json
+import re
 import shutil
 import subprocess
 import sys
-from typing import Any
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from typing import TextIO
 
 DOCKER = shutil.which("docker") or "/usr/bin/docker"
+LABEL = "devcontainer.local_folder"
+COLUMNS = ("name", "status", "user", "ports")
+STATS_COLUMNS = ("cpu", "memory", "block_io", "uptime", "shm")
+# docker stats clears the screen before every streamed frame, even off a TTY.
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+# Docker timestamps carry nanoseconds; datetime accepts at most microseconds.
+FRACTION_RE = re.compile(r"(\.\d{6})\d+")
+CLEAR_SCREEN = "\x1b[H\x1b[J"
+
+
+def ps_command(label: str, fmt: str) -> list[str]:
+    """Return the ``docker ps`` invocation listing containers that match ``label``."""
+    return [DOCKER, "ps", "-a", "--filter", f"label={label}", "--format", fmt]
+
+
+def get_devcontainer_ids(label: str = LABEL) -> list[str]:
+    """Return ids of containers matching the ``label`` filter (``key`` or ``key=value``)."""
+    raw = subprocess.check_output(ps_command(label, "{{json .ID}}"), text=True)  # noqa: S603
+    return [line.strip().strip('"') for line in raw.splitlines() if line.strip()]
 
 
-def _docker_json(cmd: list[str]) -> dict:
-    """Run a docker command and parse JSON output."""
-    return json.loads(subprocess.check_output(cmd, text=True))  # noqa: S603
+def container_states(label: str = LABEL) -> dict[str, str]:
+    """Return ``{short id: state}`` for containers matching ``label``, from one ``docker ps``."""
+    raw = subprocess.check_output(ps_command(label, "{{.ID}} {{.State}}"), text=True)  # noqa: S603
+    states = {}
+    for line in raw.splitlines():
+        short, _, state = line.strip().partition(" ")
+        if short:
+            states[short] = state or "unknown"
+    return states
 
 
-def get_devcontainer_ids() -> list[str]:
-    """Return container IDs labeled as devcontainers."""
-    raw = subprocess.check_output(  # noqa: S603
-        [
-            DOCKER,
-            "ps",
-            "-a",
-            "--filter",
-            "label=devcontainer.local_folder",
-            "--format",
-            "{{json .ID}}",
-        ],
+def refresh_entries(entries: list[dict], states: dict[str, str]) -> list[dict]:
+    """Keep the inspected containers ``docker ps`` still lists, with their current state."""
+    fresh = []
+    for entry in entries:
+        full_id = entry.get("Id", "")
+        state = next((s for short, s in states.items() if full_id.startswith(short)), None)
+        if state is None:
+            continue
+        current = {**entry.get("State", {}), "Status": state, "Running": state == "running"}
+        fresh.append({**entry, "State": current})
+    return fresh
+
+
+def inspect_containers(ids: list[str]) -> list[dict]:
+    """Inspect every container in one ``docker inspect`` call.
+
+    A container removed after ``docker ps`` makes docker exit non-zero, but the
+    others are still printed, so the output is parsed regardless of the status.
+    """
+    if not ids:
+        return []
+    result = subprocess.run(  # noqa: S603
+        [DOCKER, "inspect", *ids],
+        capture_output=True,
         text=True,
+        check=False,
     )
-    return [line.strip().strip('"') for line in raw.splitlines() if line.strip()]
+    try:
+        return json.loads(result.stdout or "[]")
+    except ValueError:
+        return []
+
+
+def stats_command(ids: list[str], *, stream: bool) -> list[str]:
+    """Return the single ``docker stats`` invocation covering ``ids``."""
+    return [
+        DOCKER,
+        "stats",
+        *([] if stream else ["--no-stream"]),
+        "--format",
+        "{{json .}}",
+        *ids,
+    ]
+
+
+def parse_stats_line(line: str) -> dict | None:
+    """Parse one ``docker stats`` JSON line, ignoring screen-control codes."""
+    text = ANSI_RE.sub("", line).strip()
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def stats_frames(lines: Iterable[str]) -> Iterator[list[dict]]:
+    """Group streamed ``docker stats`` lines into one frame per refresh.
+
+    A frame ends at the screen clear docker emits before each refresh, or when a
+    container reports twice.
+    """
+    frame: list[dict] = []
+    for line in lines:
+        stats = parse_stats_line(line)
+        starts_frame = "\x1b[2J" in line or (
+            stats is not None and any(seen.get("ID") == stats.get("ID") for seen in frame)
+        )
+        if starts_frame and frame:
+            yield frame
+            frame = []
+        if stats is not None:
+            frame.append(stats)
+    if frame:
+        yield frame
+
+
+def snapshot_stats(ids: list[str]) -> list[dict]:
+    """Return one stats sample per container from a single ``docker stats --no-stream``."""
+    if not ids:
+        return []
+    result = subprocess.run(  # noqa: S603
+        stats_command(ids, stream=False),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return [stats for line in result.stdout.splitlines() if (stats := parse_stats_line(line))]
+
+
+def stream_stats(ids: list[str]) -> Iterator[list[dict]]:  # pragma: no cover - docker
+    """Yield stats frames from one long-lived ``docker stats`` process."""
+    with subprocess.Popen(  # noqa: S603
+        stats_command(ids, stream=True),
+        stdout=subprocess.PIPE,
+        text=True,
+    ) as proc:
+        try:
+            yield from stats_frames(proc.stdout or [])
+        finally:
+            proc.terminate()
+
+
+def watch_records(
+    entries: list[dict],
+    label: str = LABEL,
+    stream: Callable[[list[str]], Iterable[list[dict]]] | None = None,
+) -> Iterator[list[dict]]:
+    """Yield one record list per stats frame, re-listing containers with one ``docker ps``.
+
+    When containers appear or disappear, they are inspected again and the stats
+    stream is restarted for the new set. Nothing is yielded once none match.
+    """
+    stream = stream or stream_stats
+    while entries:
+        states: dict[str, str] = {}
+        changed = False
+        for frame in stream([entry["Id"] for entry in entries]):
+            states = container_states(label)
+            current = refresh_entries(entries, states)
+            if current:
+                yield [container_record(entry, frame) for entry in current]
+            changed = len(current) != len(entries) or len(current) != len(states)
+            if changed:
+                break
+        if not changed:
+            return
+        entries = [entry for entry in inspect_containers(list(states)) if entry.get("Id")]
 
 
 def render_ports(ports: dict[str, Any]) -> str:
@@ -46,33 +207,141 @@ def render_ports(ports: dict[str, Any]) -> str:
     return ", ".join(bindings) if bindings else "n/a"
 
 
-def main() -> None:
+def human_bytes(size: float) -> str:
+    """Render a byte count with binary units (``8GiB``, ``512MiB``)."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:  # noqa: PLR2004
+            return f"{size:.0f}{unit}" if size == int(size) else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TiB"
+
+
+def uptime(state: dict, now: datetime) -> str:
+    """Return how long a running container has been up (``-`` if it is not running)."""
+    started = state.get("StartedAt")
+    if not state.get("Running") or not started:
+        return "-"
+    since = datetime.fromisoformat(FRACTION_RE.sub(r"\1", started))
+    minutes = max(0, int((now - since).total_seconds()) // 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d{hours}h"
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m"
+
+
+def match_stats(entry: dict, frame: list[dict]) -> dict:
+    """Return the stats sample for an inspected container (matched by id prefix)."""
+    full_id = entry.get("Id", "")
+    for stats in frame:
+        short = stats.get("ID") or stats.get("Container") or ""
+        if short and full_id.startswith(short):
+            return stats
+    return {}
+
+
+def container_record(
+    entry: dict,
+    frame: list[dict] | None = None,
+    now: datetime | None = None,
+) -> dict:
+    """Return one container's columns; stats columns are added when ``frame`` is given."""
+    record = {
+        "name": entry.get("Name", "").lstrip("/"),
+        "status": entry.get("State", {}).get("Status", "unknown"),
+        "user": entry.get("Config", {}).get("User") or "n/a",
+        "ports": render_ports(entry.get("NetworkSettings", {}).get("Ports") or {}),
+    }
+    if frame is None:
+        return record
+    stats = match_stats(entry, frame)
+    shm = entry.get("HostConfig", {}).get("ShmSize")
+    memory = f"{stats['MemUsage']} ({stats.get('MemPerc', '-')})" if "MemUsage" in stats else "-"
+    record.update(
+        {
+            "cpu": stats.get("CPUPerc", "-"),
+            "memory": memory,
+            "block_io": stats.get("BlockIO", "-"),
+            "uptime": uptime(entry.get("State", {}), now or datetime.now(UTC)),
+            "shm": human_bytes(shm) if shm else "-",
+        },
+    )
+    return record
+
+
+def container_row(entry: dict) -> str:
+    """Render one inspected container as a tab-separated row."""
+    return "\t".join(container_record(entry).values())
+
+
+def render_table(records: list[dict], *, stats: bool) -> str:
+    """Render records as a tab-separated table with a header line."""
+    columns = COLUMNS + STATS_COLUMNS if stats else COLUMNS
+    lines = ["\t".join(columns)]
+    lines += ["\t".join(str(record.get(column, "-")) for column in columns) for record in records]
+    return "\n".join(lines)
+
+
+def list_rows(label: str = LABEL) -> list[str]:
+    """Return one row per devcontainer (two docker calls in total)."""
+    return [container_row(entry) for entry in inspect_containers(get_devcontainer_ids(label))]
+
+
+def emit(records: list[dict], args: argparse.Namespace, out: TextIO) -> None:
+    """Write one listing (or watch frame) as JSON or as a table."""
+    if args.json:
+        # One document per frame: a single JSON array, or JSON lines under --watch.
+        out.write(json.dumps(records, indent=None if args.watch else 2) + "\n")
+        return
+    text = f"# Devcontainer containers (docker label={LABEL})\n"
+    text += render_table(records, stats=args.stats or args.watch) + "\n"
+    if args.watch and out.isatty():
+        text = CLEAR_SCREEN + text
+    out.write(text)
+    out.flush()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse CLI arguments."""
+    p = argparse.ArgumentParser(description="List devcontainer containers")
+    p.add_argument(
+        "--stats",
+        action="store_true",
+        help="add CPU, memory, block I/O, uptime and shm-size columns",
+    )
+    p.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep one docker stats stream open and refresh in place (implies --stats)",
+    )
+    p.add_argument(
+        "--json",
+        action="store_true",
+        help="print JSON (one array per listing; JSON lines per frame with --watch)",
+    )
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
     """List devcontainer containers with status, user, and ports."""
+    args = parse_args(argv)
     if not shutil.which("docker"):
         sys.stdout.write("docker not found on PATH; cannot list devcontainers\n")
         raise SystemExit(1)
 
-    ids = get_devcontainer_ids()
-    if not ids:
-        sys.stdout.write("No devcontainer containers found (label=devcontainer.local_folder)\n")
+    entries = inspect_containers(get_devcontainer_ids())
+    if not entries and not args.json:
+        sys.stdout.write(f"No devcontainer containers found (label={LABEL})\n")
         return
 
-    lines = [
-        "name\tstatus\tuser\tports",
-    ]
-    for cid in ids:
-        info = _docker_json([DOCKER, "inspect", cid])
-        if not info:
-            continue
-        entry = info[0]
-        name = entry.get("Name", "").lstrip("/")
-        state = entry.get("State", {}).get("Status", "unknown")
-        user = entry.get("Config", {}).get("User") or "n/a"
-        ports = render_ports(entry.get("NetworkSettings", {}).get("Ports") or {})
-        lines.append(f"{name}\t{state}\t{user}\t{ports}")
-
-    sys.stdout.write("# Devcontainer containers (docker label=devcontainer.local_folder)\n")
-    sys.stdout.write("\n".join(lines) + "\n")
+    if args.watch:
+        with contextlib.suppress(KeyboardInterrupt):
+            for records in watch_records([entry for entry in entries if entry.get("Id")]):
+                emit(records, args, sys.stdout)
+        return
+    ids = [entry["Id"] for entry in entries if entry.get("Id")]
+    frame = snapshot_stats(ids) if args.stats else None
+    emit([container_record(entry, frame) for entry in entries], args, sys.stdout)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Record GitHub Actions run history locally and report CI timing trends.
+
+``sync`` pages through the repository's completed runs, newest first. For each
+run not yet in the history it fetches every job with its steps and appends them
+to the SQLite history (``scripts/lib/run_history.py``). ``report`` summarizes
+the last N runs of each workflow: p50/p95 run and job durations, queue time,
+and the slowest steps.
+
+Usage examples:
+  python -m scripts.gha_history sync --runs 200
+  python -m scripts.gha_history report --last 50 --top 5
+  python -m scripts.gha_history report --workflow .github/workflows/ci.yml --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from scripts.gha_monitor import api_get, close_clients, default_repo, require_token
+from scripts.lib.console import LazyConsole
+from scripts.lib.github_api import POOL_SIZE
+from scripts.lib.run_history import RunHistory, default_db_path
+
+console = LazyConsole()
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100
+DEFAULT_SYNC_RUNS = 100
+DEFAULT_LAST = 20
+DEFAULT_TOP = 10
+
+
+def paginate(
+    path: str,
+    token: str,
+    key: str,
+    limit: int | None = None,
+    params: dict[str, str] | None = None,
+) -> list[dict]:
+    """Collect ``key`` items from every page of ``path`` (up to ``limit`` items)."""
+    items: list[dict] = []
+    page = 1
+    while limit is None or len(items) < limit:
+        query = {**(params or {}), "per_page": str(PAGE_SIZE), "page": str(page)}
+        data = api_get(path, token, query)
+        batch = data.get(key) or []
+        items.extend(batch)
+        if len(batch) < PAGE_SIZE or len(items) >= data.get("total_count", 0):
+            break
+        page += 1
+    return items if limit is None else items[:limit]
+
+
+def fetch_jobs(repo: str, run_id: int, token: str) -> list[dict]:
+    """Return every job of a run attempt, with steps."""
+    return paginate(f"/repos/{repo}/actions/runs/{run_id}/jobs", token, "jobs")
+
+
+def sync(history: RunHistory, repo: str, token: str, limit: int) -> int:
+    """Append the newest ``limit`` completed runs that are not recorded yet; return how many."""
+    runs = [
+        run
+        for run in paginate(
+            f"/repos/{repo}/actions/runs",
+            token,
+            "workflow_runs",
+            limit,
+            {"status": "completed"},
+        )
+        if run.get("status") == "completed"
+    ]
+    known = history.known(run["id"] for run in runs)
+    new = [run for run in runs if run["id"] not in known]
+    if not new:
+        return 0
+    # Jobs are fetched concurrently over the shared connection pool; sqlite
+    # writes stay on this thread.
+    with ThreadPoolExecutor(max_workers=min(len(new), POOL_SIZE)) as pool:
+        jobs = pool.map(lambda run: fetch_jobs(repo, run["id"], token), new)
+        return sum(
+            history.add(repo, run, run_jobs) for run, run_jobs in zip(new, jobs, strict=True)
+        )
+
+
+def format_seconds(value: float | None) -> str:
+    """Render a duration as ``1m05s`` / ``42s`` (``-`` when unknown)."""
+    if value is None:
+        return "-"
+    minutes, seconds = divmod(round(value), 60)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def print_report(report: dict) -> None:
+    """Render one workflow's report as tables."""
+    from rich.table import Table  # noqa: PLC0415 - keep rich off the import path
+
+    duration, queue = report["duration"], report["queue"]
+    console.print(
+        f"[bold]{report['workflow']}[/] - last {report['runs']} runs: "
+        f"p50 {format_seconds(duration['p50_s'])}, p95 {format_seconds(duration['p95_s'])}, "
+        f"queue p50 {format_seconds(queue['p50_s'])}, p95 {format_seconds(queue['p95_s'])}",
+    )
+    jobs = Table(title="Jobs")
+    jobs.add_column("Job", style="cyan")
+    for column in ("runs", "p50", "p95", "queue p50", "queue p95"):
+        jobs.add_column(column, justify="right")
+    for job in report["jobs"]:
+        jobs.add_row(
+            job["name"],
+            str(job["count"]),
+            format_seconds(job["duration"]["p50_s"]),
+            format_seconds(job["duration"]["p95_s"]),
+            format_seconds(job["queue"]["p50_s"]),
+            format_seconds(job["queue"]["p95_s"]),
+        )
+    console.print(jobs)
+    steps = Table(title="Slowest steps (by p95)")
+    steps.add_column("Job", style="cyan")
+    steps.add_column("Step")
+    for column in ("runs", "p50", "p95"):
+        steps.add_column(column, justify="right")
+    for step in report["slowest_steps"]:
+        steps.add_row(
+            step["job"],
+            step["step"],
+            str(step["count"]),
+            format_seconds(step["p50_s"]),
+            format_seconds(step["p95_s"]),
+        )
+    console.print(steps)
+
+
+def parse_args() -> argparse.Namespace:  # pragma: no cover - CLI wiring
+    """Parse CLI arguments."""
+    p = argparse.ArgumentParser(description="GitHub Actions run history and timing report")
+    p.add_argument("--repo", default=None, help="owner/repo (default: from git remote)")
+    p.add_argument(
+        "--db",
+        type=Path,
+        default=None,
+        help="history database (default: ~/.cache/pixi-devcontainer/gha/history.sqlite)",
+    )
+    sub = p.add_subparsers(dest="command", required=True)
+    sync_p = sub.add_parser("sync", help="append new completed runs to the history")
+    sync_p.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_SYNC_RUNS,
+        help="how many of the newest runs to consider",
+    )
+    report_p = sub.add_parser("report", help="p50/p95 durations and slowest steps")
+    report_p.add_argument("--last", type=int, default=DEFAULT_LAST, help="runs per workflow")
+    report_p.add_argument("--top", type=int, default=DEFAULT_TOP, help="slowest steps to show")
+    report_p.add_argument(
+        "--workflow",
+        action="append",
+        default=None,
+        help="workflow path to report on; repeatable (default: all recorded)",
+    )
+    report_p.add_argument("--json", action="store_true", help="print the reports as JSON")
+    return p.parse_args()
+
+
+def main() -> int:  # pragma: no cover
+    """Sync or report, depending on the subcommand."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    args = parse_args()
+    repo = args.repo or default_repo()
+    history = RunHistory(args.db or default_db_path())
+    try:
+        if args.command == "sync":
+            token = require_token()
+            try:
+                added = sync(history, repo, token, args.runs)
+            finally:
+                close_clients()
+            logger.info("Recorded %s new runs for %s", added, repo)
+            return 0
+        reports = [
+            history.report(repo, workflow, args.last, args.top)
+            for workflow in args.workflow or history.workflows(repo)
+        ]
+    finally:
+        history.close()
+    if args.json:
+        sys.stdout.write(json.dumps(reports, indent=2) + "\n")
+    else:
+        for report in reports:
+            print_report(report)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -3,11 +3,18 @@
 
 Features:
 - Fetch latest workflow run for a branch and store its ID locally.
-- Optional watch mode to poll until completion.
+- Optional watch mode to poll until completion, backing off from a few seconds
+  towards ``--interval`` and reporting per-job/step progress.
+- Several branches/workflows/run ids are watched concurrently behind a
+  compact status board, with one exit code for all of them.
+- Requests reuse keep-alive connections and revalidate with ETags, so
+  unchanged polls are answered 304 and do not consume rate limit.
 
 Usage examples:
   python -m scripts.gha_monitor --store
   python -m scripts.gha_monitor --watch --interval 20
+  python -m scripts.gha_monitor --watch --min-interval 1 --timeout 3600
+  python -m scripts.gha_monitor --watch --branch main --workflow ci.yml --workflow renovate.yml
 """
 
 from __future__ import annotations
@@ -16,20 +23,52 @@ import argparse
 import json
 import logging
 import os
-import ssl
+import random
 import subprocess
 import sys
+import threading
 import time
-import urllib.error
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from scripts.lib.github_api import POOL_SIZE, GitHubAPIError, GitHubClient, Response
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
 
 STATE_DIR = Path(".gha")
 STATE_FILE = STATE_DIR / "latest_run.json"
-GITHUB_API = "https://api.github.com"
 logger = logging.getLogger(__name__)
-HTTP_ERROR_THRESHOLD = 400
+_clients: dict[str, GitHubClient] = {}
+_clients_lock = threading.Lock()
+# Set on Ctrl-C: wakes every poller out of its delay so the watch ends promptly.
+_stop = threading.Event()
+EXIT_TIMEOUT = 2
+TIMED_OUT = "timed_out"
+INTERRUPTED = "interrupted"
+DONE_STATUSES = frozenset({"completed", "failure", "cancelled"})
+# Job states that still count as outstanding on the status board.
+ACTIVE_STATES = frozenset({"queued", "in_progress", "waiting", "pending", "requested"})
+# 403 is GitHub's primary/secondary rate-limit status; 429 is used by proxies.
+RATE_LIMIT_STATUSES = frozenset({403, 429})
+RATE_LIMIT_RETRIES = 3
+# Below this many remaining requests, wait for the window to reset.
+RATE_LIMIT_FLOOR = 5
+
+
+@dataclass(frozen=True)
+class PollPolicy:
+    """Adaptive polling schedule for ``watch_run``."""
+
+    min_interval: float = 2.0
+    max_interval: float = 30.0
+    backoff: float = 1.5
+    # Each delay is scaled by a uniform factor in [1 - jitter, 1 + jitter].
+    jitter: float = 0.2
+    timeout: float | None = None
 
 
 def require_token() -> str:
@@ -64,53 +103,83 @@ def default_branch() -> str:
     return git(["rev-parse", "--abbrev-ref", "HEAD"])
 
 
+def client(token: str) -> GitHubClient:
+    """Return the shared pooled client for ``token``."""
+    with _clients_lock:
+        cached = _clients.get(token)
+        if cached is None:
+            cached = _clients[token] = GitHubClient(token)
+        return cached
+
+
+def close_clients() -> None:
+    """Persist ETag caches and close every pooled connection."""
+    while _clients:
+        _clients.popitem()[1].close()
+
+
+def rate_limit_delay(headers: dict[str, str], now: float) -> float:
+    """Return how long the rate-limit headers ask us to wait before the next request.
+
+    ``Retry-After`` wins; otherwise the remaining quota is spread evenly over the
+    time left until the window resets, so a long watch never exhausts it.
+    """
+    if "retry-after" in headers:
+        return float(headers["retry-after"])
+    if "x-ratelimit-remaining" not in headers or "x-ratelimit-reset" not in headers:
+        return 0.0
+    remaining = int(headers["x-ratelimit-remaining"])
+    window = max(0.0, float(headers["x-ratelimit-reset"]) - now)
+    if remaining <= RATE_LIMIT_FLOOR:
+        return window
+    return window / remaining
+
+
+def api_request(
+    path: str,
+    token: str,
+    params: dict[str, str] | None = None,
+) -> Response:
+    """GET over the pooled client, waiting out rate limits; exit on other errors."""
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            return client(token).request(path, params)
+        except GitHubAPIError as error:
+            limited = error.status in RATE_LIMIT_STATUSES and (
+                "retry-after" in error.headers or error.headers.get("x-ratelimit-remaining") == "0"
+            )
+            if not limited or attempt == RATE_LIMIT_RETRIES:
+                sys.exit(str(error))
+            wait = rate_limit_delay(error.headers, time.time())
+            logger.warning("Rate limited; retrying in %.0fs", wait)
+            if _stop.wait(wait):
+                sys.exit("Interrupted while waiting out the rate limit")
+    raise AssertionError  # pragma: no cover - the loop always returns or exits
+
+
 def api_get(
     path: str,
     token: str,
     params: dict[str, str] | None = None,
-) -> dict:  # pragma: no cover - network boundary
-    """Perform a GitHub API GET with minimal headers."""
-    query = urllib.parse.urlencode(params or {})
-    query = urllib.parse.urlencode(params or {})
-    url = f"{GITHUB_API}{path}"
-    if query:
-        url = f"{url}?{query}"
-
-    parsed = urllib.parse.urlparse(url)
-    if parsed.scheme != "https":
-        message = "Refusing non-https GitHub API URL"
-        raise ValueError(message)
-    if parsed.netloc != "api.github.com":
-        message = f"Unexpected GitHub API host: {parsed.netloc}"
-        raise ValueError(message)
-
-    context = ssl.create_default_context()
-    try:
-        request = urllib.request.Request(  # noqa: S310
-            url,
-            headers={"Authorization": f"Bearer {token}", "Accept": "application/vnd.github+json"},
-        )
-        with urllib.request.urlopen(  # nosemgrep  # noqa: S310
-            request,
-            context=context,
-            timeout=10,
-        ) as response:
-            body = response.read().decode("utf-8")
-            if response.status >= HTTP_ERROR_THRESHOLD:
-                sys.exit(f"GitHub API error {response.status}: {body}")
-            return json.loads(body)
-    except urllib.error.HTTPError as error:
-        body = error.read().decode("utf-8", errors="ignore")
-        sys.exit(f"GitHub API error {error.code}: {body}")
-
-
-def latest_run(repo: str, branch: str, token: str) -> dict | None:
-    """Return the latest push workflow run for a branch."""
-    data = api_get(
-        f"/repos/{repo}/actions/runs",
-        token,
-        {"branch": branch, "event": "push", "per_page": "1"},
-    )
+) -> dict:
+    """Perform a GitHub API GET over the pooled, ETag-revalidating client."""
+    return api_request(path, token, params).data
+
+
+def latest_run(
+    repo: str,
+    branch: str,
+    token: str,
+    workflow: str | None = None,
+) -> dict | None:
+    """Return the latest run for a branch: of ``workflow`` (any event), else any push run."""
+    if workflow:
+        path = f"/repos/{repo}/actions/workflows/{workflow}/runs"
+        params = {"branch": branch, "per_page": "1"}
+    else:
+        path = f"/repos/{repo}/actions/runs"
+        params = {"branch": branch, "event": "push", "per_page": "1"}
+    data = api_get(path, token, params)
     runs = data.get("workflow_runs") or []
     return runs[0] if runs else None
 
@@ -127,38 +196,318 @@ def store_run(run: dict) -> None:
     logger.info("Stored run id %s to %s", run["id"], STATE_FILE)
 
 
-def watch_run(repo: str, run_id: int, token: str, interval: int) -> None:
-    """Poll a workflow run until completion; exit non-zero on failure."""
-    logger.info("Watching run %s on %s (poll every %ss)", run_id, repo, interval)
+def job_progress(jobs: list[dict]) -> dict[str, str]:
+    """Summarize each job as one line: status plus the step it is on."""
+    progress: dict[str, str] = {}
+    for job in jobs:
+        steps = job.get("steps") or []
+        done = sum(1 for step in steps if step.get("status") == "completed")
+        line = job.get("conclusion") or job.get("status") or "unknown"
+        current = next((step for step in steps if step.get("status") == "in_progress"), None)
+        if current is not None:
+            line = f"{line} [{done}/{len(steps)}] {current.get('name')}"
+        elif steps and job.get("status") != "completed":
+            line = f"{line} [{done}/{len(steps)}]"
+        progress[job.get("name") or str(job.get("id"))] = line
+    return progress
+
+
+def fetch_progress(repo: str, run_id: int, token: str) -> tuple[dict, dict[str, str], Response]:
+    """Fetch the run and all of its jobs (with steps) in one pass of two requests."""
+    response = api_request(f"/repos/{repo}/actions/runs/{run_id}", token)
+    jobs = api_get(
+        f"/repos/{repo}/actions/runs/{run_id}/jobs",
+        token,
+        {"filter": "latest", "per_page": "100"},
+    )
+    return response.data, job_progress(jobs.get("jobs") or []), response
+
+
+def log_changes(previous: dict[str, str], current: dict[str, str]) -> bool:
+    """Log jobs whose progress line changed; return True if anything did."""
+    changed = False
+    for name, line in current.items():
+        if previous.get(name) != line:
+            logger.info("  %s: %s", name, line)
+            changed = True
+    return changed
+
+
+def next_delay(policy: PollPolicy, attempt: int, rng: random.Random) -> float:
+    """Exponential backoff from ``min_interval`` to ``max_interval`` with +/- jitter."""
+    base = min(policy.max_interval, policy.min_interval * policy.backoff**attempt)
+    return base * rng.uniform(1 - policy.jitter, 1 + policy.jitter)
+
+
+class ProgressLog:
+    """Reporter for a single watched run: logs status changes and job transitions."""
+
+    def __init__(self) -> None:
+        """Start with nothing reported."""
+        self.status: tuple = ()
+        self.jobs: dict[str, str] = {}
+
+    def __call__(self, run: dict, jobs: dict[str, str]) -> None:
+        """Log what changed since the previous report."""
+        status = (run.get("status"), run.get("conclusion"))
+        if status != self.status:
+            logger.info("Status: %s, conclusion: %s", *status)
+        log_changes(self.jobs, jobs)
+        self.status, self.jobs = status, jobs
+
+
+def poll_run(
+    repo: str,
+    run_id: int,
+    token: str,
+    policy: PollPolicy,
+    report: Callable[[dict, dict[str, str]], None],
+) -> str:
+    """Poll a workflow run until it finishes; return its conclusion or ``TIMED_OUT``.
+
+    Polls start at ``min_interval`` and back off towards ``max_interval``; any
+    run, job or step transition (also passed to ``report``) resets the backoff,
+    and the rate-limit headers can only stretch the delay. A stopped watch
+    (Ctrl-C in ``watch_runs``) returns ``INTERRUPTED`` without waiting out the delay.
+    """
+    deadline = time.monotonic() + policy.timeout if policy.timeout else None
+    rng = random.Random()  # noqa: S311 - jitter, not cryptography
+    last: tuple = ()
+    attempt = 0
     while True:
-        run = api_get(f"/repos/{repo}/actions/runs/{run_id}", token)
-        status = run.get("status")
-        conclusion = run.get("conclusion")
-        logger.info("Status: %s, conclusion: %s", status, conclusion)
-        if status in {"completed", "failure", "cancelled"}:
-            if conclusion not in {"success"}:
-                sys.exit(1)
-            return
-        time.sleep(interval)
+        run, jobs, response = fetch_progress(repo, run_id, token)
+        snapshot = (run.get("status"), run.get("conclusion"), jobs)
+        if snapshot != last:
+            report(run, jobs)
+            attempt = 0
+        else:
+            attempt += 1
+        last = snapshot
+        if run.get("status") in DONE_STATUSES:
+            return run.get("conclusion") or "unknown"
+        delay = next_delay(policy, attempt, rng)
+        delay = max(delay, rate_limit_delay(response.headers, time.time()))
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error("Timed out after %ss waiting for run %s", policy.timeout, run_id)
+                return TIMED_OUT
+            delay = min(delay, remaining)
+        if _stop.wait(delay):
+            return INTERRUPTED
+
+
+def watch_run(
+    repo: str,
+    run_id: int,
+    token: str,
+    policy: PollPolicy | None = None,
+) -> None:
+    """Poll a workflow run until completion; exit non-zero on failure or timeout."""
+    policy = policy or PollPolicy()
+    logger.info(
+        "Watching run %s on %s (poll %s-%ss)",
+        run_id,
+        repo,
+        policy.min_interval,
+        policy.max_interval,
+    )
+    code = exit_code([poll_run(repo, run_id, token, policy, ProgressLog())])
+    if code:
+        sys.exit(code)
+
+
+def exit_code(conclusions: Iterable[str]) -> int:
+    """Fold run conclusions into one exit code: 0 all passed, 1 any failed, 2 timed out."""
+    outcomes = set(conclusions)
+    if outcomes <= {"success"}:
+        return 0
+    if outcomes <= {"success", TIMED_OUT}:
+        return EXIT_TIMEOUT
+    return 1
+
+
+def run_summary(run: dict, jobs: dict[str, str]) -> str:
+    """Compress a run and its job progress into one status-board line."""
+    summary = run.get("conclusion") or run.get("status") or "unknown"
+    if jobs:
+        done = sum(1 for line in jobs.values() if line.split(" ", 1)[0] not in ACTIVE_STATES)
+        summary = f"{summary} {done}/{len(jobs)} jobs"
+    active = next(((name, line) for name, line in jobs.items() if line.startswith("in_")), None)
+    if active is not None:
+        summary = f"{summary} | {active[0]}: {active[1]}"
+    return summary
+
+
+class StatusBoard:
+    """Compact one-line-per-run board shared by the watcher threads.
+
+    Without a ``refresh`` callback (e.g. when stderr is not a terminal) each
+    changed row is logged instead of redrawing the board.
+    """
+
+    def __init__(
+        self,
+        labels: Iterable[str],
+        refresh: Callable[[str], None] | None = None,
+    ) -> None:
+        """Create a board with every row pending."""
+        self.rows = dict.fromkeys(labels, "pending")
+        self.refresh = refresh
+        self._lock = threading.Lock()
+
+    def render(self) -> str:
+        """Return the board as aligned ``label  status`` lines."""
+        width = max((len(label) for label in self.rows), default=0)
+        return "\n".join(f"{label:<{width}}  {line}" for label, line in self.rows.items())
+
+    def update(self, label: str, line: str) -> None:
+        """Replace one row and redraw (or log) it if it changed."""
+        with self._lock:
+            if self.rows.get(label) == line:
+                return
+            self.rows[label] = line
+            text = self.render()
+            if self.refresh is not None:
+                self.refresh(text)
+        if self.refresh is None:
+            logger.info("%s: %s", label, line)
+
+    def reporter(self, label: str) -> Callable[[dict, dict[str, str]], None]:
+        """Return a ``poll_run`` reporter that feeds one row."""
+        return lambda run, jobs: self.update(label, run_summary(run, jobs))
+
+
+def _poll_row(
+    repo: str,
+    run_id: int,
+    token: str,
+    policy: PollPolicy,
+    report: Callable[[dict, dict[str, str]], None],
+) -> str:
+    """Run ``poll_run`` on a worker thread, turning fatal API and network errors into ``error``."""
+    import http.client  # noqa: PLC0415 - already loaded by the client; keep it off the CLI path
+
+    try:
+        return poll_run(repo, run_id, token, policy, report)
+    except (SystemExit, OSError, http.client.HTTPException) as error:
+        logger.error("Run %s: %s", run_id, error)  # noqa: TRY400 - the message is the error
+        return "error"
+
+
+def watch_runs(
+    repo: str,
+    runs: dict[str, int],
+    token: str,
+    policy: PollPolicy,
+    board: StatusBoard,
+) -> int:
+    """Watch several runs concurrently over the shared client; return one exit code."""
+    _stop.clear()
+    pool = ThreadPoolExecutor(max_workers=max(1, min(len(runs), POOL_SIZE)))
+    try:
+        futures = {
+            label: pool.submit(_poll_row, repo, run_id, token, policy, board.reporter(label))
+            for label, run_id in runs.items()
+        }
+        conclusions = {label: future.result() for label, future in futures.items()}
+    finally:
+        # On Ctrl-C or an unexpected error, wake the sleeping pollers and drop
+        # queued ones instead of waiting them out. Every poller is done otherwise.
+        _stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+    for label, conclusion in conclusions.items():
+        if conclusion in {TIMED_OUT, "error"}:
+            board.update(label, conclusion)
+    return exit_code(conclusions.values())
+
+
+def resolve_runs(
+    repo: str,
+    branches: list[str],
+    workflows: list[str] | None,
+    token: str,
+) -> dict[str, dict]:
+    """Find the latest run for every branch x workflow pair concurrently."""
+    targets = [(branch, workflow) for branch in branches for workflow in workflows or [None]]
+    with ThreadPoolExecutor(max_workers=max(1, min(len(targets), POOL_SIZE))) as pool:
+        found = list(pool.map(lambda t: latest_run(repo, t[0], token, t[1]), targets))
+    runs: dict[str, dict] = {}
+    for (branch, workflow), run in zip(targets, found, strict=True):
+        label = f"{branch} {workflow}" if workflow else branch
+        if run is None:
+            logger.warning("No workflow runs found for %s@%s", repo, label)
+        else:
+            runs[label] = run
+    return runs
+
+
+def watch_board(  # pragma: no cover - terminal wiring
+    repo: str,
+    runs: dict[str, int],
+    token: str,
+    policy: PollPolicy,
+) -> int:
+    """Watch ``runs`` behind a live status board (plain log lines off a terminal)."""
+    board = StatusBoard(runs)
+    if not sys.stderr.isatty():
+        return watch_runs(repo, runs, token, policy, board)
+    from rich.console import Console  # noqa: PLC0415 - keep rich off the import path
+    from rich.live import Live  # noqa: PLC0415
+    from rich.text import Text  # noqa: PLC0415
+
+    with Live(Text(board.render()), console=Console(stderr=True), auto_refresh=False) as live:
+        board.refresh = lambda text: live.update(Text(text), refresh=True)
+        return watch_runs(repo, runs, token, policy, board)
 
 
 def parse_args() -> argparse.Namespace:  # pragma: no cover - CLI wiring
     """Parse CLI arguments."""
     p = argparse.ArgumentParser(description="Monitor GitHub Actions runs")
     p.add_argument("--repo", default=None, help="owner/repo (default: from git remote)")
-    p.add_argument("--branch", default=None, help="branch to check (default: current)")
+    p.add_argument(
+        "--branch",
+        action="append",
+        default=None,
+        help="branch to check; repeat to watch several (default: current)",
+    )
+    p.add_argument(
+        "--workflow",
+        action="append",
+        default=None,
+        help="workflow file (e.g. ci.yml) to track on each branch; repeatable "
+        "(default: latest push run of any workflow)",
+    )
     p.add_argument(
         "--store",
         action="store_true",
         help="store latest run id to .gha/latest_run.json",
     )
     p.add_argument("--watch", action="store_true", help="watch run until completion")
-    p.add_argument("--interval", type=int, default=15, help="poll interval seconds for watch mode")
+    p.add_argument(
+        "--interval",
+        type=float,
+        default=PollPolicy.max_interval,
+        help="longest poll interval in seconds for watch mode (backoff ceiling)",
+    )
+    p.add_argument(
+        "--min-interval",
+        type=float,
+        default=PollPolicy.min_interval,
+        help="first poll interval in seconds; resets whenever a job or step changes",
+    )
+    p.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="give up (exit 2) after this many seconds of watching",
+    )
     p.add_argument(
         "--run-id",
         type=int,
+        action="append",
         default=None,
-        help="specific run id to watch (default: latest)",
+        help="specific run id to watch; repeatable (default: latest)",
     )
     return p.parse_args()
 
@@ -168,32 +517,59 @@ def main() -> None:  # pragma: no cover
     logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
     args = parse_args()
     repo = args.repo or default_repo()
-    branch = args.branch or default_branch()
+    branches = args.branch or [default_branch()]
     token = require_token()
+    try:
+        monitor(args, repo, branches, token)
+    except KeyboardInterrupt:
+        logger.warning("Interrupted")
+        sys.exit(130)
+    finally:
+        close_clients()
+
+
+def monitor(  # pragma: no cover
+    args: argparse.Namespace,
+    repo: str,
+    branches: list[str],
+    token: str,
+) -> None:
+    """Report the latest runs and optionally store or watch them."""
+    runs: dict[str, dict] = {}
+    if args.store or not args.run_id:
+        runs = resolve_runs(repo, branches, args.workflow, token)
+        if not runs:
+            message = f"No workflow runs found for {repo}@{','.join(branches)}"
+            raise SystemExit(message)
 
-    run = latest_run(repo, branch, token)
-    if not run:
-        message = f"No workflow runs found for {repo}@{branch}"
-        raise SystemExit(message)
-
-    logger.info(
-        "Latest run for %s@%s: id=%s status=%s conclusion=%s",
-        repo,
-        branch,
-        run["id"],
-        run["status"],
-        run.get("conclusion"),
-    )
+    for label, run in runs.items():
+        logger.info(
+            "Latest run for %s@%s: id=%s status=%s conclusion=%s",
+            repo,
+            label,
+            run["id"],
+            run["status"],
+            run.get("conclusion"),
+        )
 
     if args.store:
-        store_run(run)
-
-    if args.watch:
-        run_id = args.run_id or run["id"]
-        if run_id is None:
-            message = "Run id missing; cannot watch workflow."
-            raise SystemExit(message)
-        watch_run(repo, run_id, token, args.interval)
+        store_run(next(iter(runs.values())))
+
+    if not args.watch:
+        return
+    policy = PollPolicy(
+        min_interval=min(args.min_interval, args.interval),
+        max_interval=args.interval,
+        timeout=args.timeout,
+    )
+    if args.run_id:
+        ids = {f"run {run_id}": run_id for run_id in args.run_id}
+    else:
+        ids = {label: run["id"] for label, run in runs.items()}
+    if len(ids) == 1:
+        watch_run(repo, next(iter(ids.values())), token, policy)
+    else:
+        sys.exit(watch_board(repo, ids, token, policy))
 
 
 if __name__ == "__main__":  # pragma: no cover
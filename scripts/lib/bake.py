@@ -0,0 +1,206 @@
+"""Helpers around ``docker buildx bake``: resolved definitions and build telemetry."""
+
+from __future__ import annotations
+
+import base64
+import json
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+BAKE_FILE = Path("docker/docker-bake.hcl")
+
+
+def bake_command(bake_file: Path = BAKE_FILE) -> list[str]:
+    """Return the ``docker buildx bake`` prefix for ``bake_file``."""
+    return ["docker", "buildx", "bake", "-f", str(bake_file)]
+
+
+def bake_definition(
+    targets: list[str],
+    *,
+    env: dict[str, str] | None = None,
+    bake_file: Path = BAKE_FILE,
+) -> dict[str, dict]:
+    """Return the fully resolved definition of each target (groups expanded).
+
+    Variables such as ``CONFIG_HASH`` and ``REGISTRY`` are taken from ``env``,
+    so tags come back exactly as bake would push them.
+    """
+    result = subprocess.run(  # noqa: S603
+        [*bake_command(bake_file), *targets, "--print"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return json.loads(result.stdout).get("target", {})
+
+
+@dataclass(frozen=True)
+class Step:
+    """One completed BuildKit vertex from a rawjson progress stream."""
+
+    target: str
+    name: str
+    duration: float
+    cached: bool
+
+
+# Bake prefixes vertex names with the target when building several at once,
+# e.g. "[image-noble-stable builder 3/5] RUN ...".
+VERTEX_TARGET_RE = re.compile(r"^\[(?P<target>[^\s\]]+)[\s\]]")
+FRACTION_RE = re.compile(r"(\.\d{6})\d+")
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse a BuildKit RFC 3339 timestamp (nanosecond precision is truncated)."""
+    return datetime.fromisoformat(FRACTION_RE.sub(r"\1", value))
+
+
+def fold_status(status: dict, vertices: dict[str, dict]) -> None:
+    """Fold one decoded rawjson status into the latest known state of each vertex."""
+    for vertex in status.get("vertexes") or []:
+        update = {k: v for k, v in vertex.items() if v not in (None, "")}
+        vertices[vertex["digest"]] = {**vertices.get(vertex["digest"], {}), **update}
+
+
+def merge_vertices(
+    lines: Iterable[str],
+    vertices: dict[str, dict] | None = None,
+) -> dict[str, dict]:
+    """Fold rawjson status lines into the latest known state of each vertex."""
+    vertices = {} if vertices is None else vertices
+    for line in lines:
+        try:
+            status = json.loads(line)
+        except ValueError:
+            continue
+        fold_status(status, vertices)
+    return vertices
+
+
+def buffer_logs(status: dict, logs: dict[str, list[str]]) -> None:
+    """Append the step output carried by one rawjson status (base64 data) per vertex."""
+    for entry in status.get("logs") or []:
+        try:
+            text = base64.b64decode(entry.get("data") or "").decode("utf-8", errors="replace")
+        except ValueError:
+            continue
+        logs.setdefault(entry.get("vertex", ""), []).append(text)
+
+
+def vertex_steps(vertices: dict[str, dict], targets: list[str]) -> list[Step]:
+    """Return completed vertices as steps attributed to one of ``targets``.
+
+    Vertices without a target prefix belong to the only target of a
+    single-target invocation, and are otherwise shared (empty target).
+    """
+    fallback = targets[0] if len(targets) == 1 else ""
+    steps = []
+    for vertex in vertices.values():
+        if "completed" not in vertex:
+            continue
+        name = vertex.get("name", "")
+        match = VERTEX_TARGET_RE.match(name)
+        target = match.group("target") if match and match.group("target") in targets else fallback
+        started = parse_timestamp(vertex.get("started", vertex["completed"]))
+        duration = (parse_timestamp(vertex["completed"]) - started).total_seconds()
+        steps.append(Step(target, name, max(duration, 0.0), bool(vertex.get("cached"))))
+    return steps
+
+
+def summarize(steps: list[Step], metadata: dict[str, dict], top: int = 10) -> dict:
+    """Return per-target cache hit ratios and the slowest executed steps."""
+    targets: dict[str, dict] = {}
+    for step in steps:
+        entry = targets.setdefault(
+            step.target or "(shared)",
+            {"steps": 0, "cached": 0, "executed_s": 0.0},
+        )
+        entry["steps"] += 1
+        entry["cached"] += step.cached
+        entry["executed_s"] += 0.0 if step.cached else step.duration
+    for name, entry in targets.items():
+        entry["cache_hit_ratio"] = round(entry["cached"] / entry["steps"], 3)
+        entry["executed_s"] = round(entry["executed_s"], 3)
+        meta = metadata.get(name, {})
+        entry["digest"] = meta.get("containerimage.digest", "")
+        entry["build_ref"] = meta.get("buildx.build.ref", "")
+    slowest = sorted((s for s in steps if not s.cached), key=lambda s: s.duration, reverse=True)
+    return {
+        "targets": dict(sorted(targets.items())),
+        "slowest_steps": [
+            {"target": s.target, "name": s.name, "duration_s": round(s.duration, 3)}
+            for s in slowest[:top]
+        ],
+    }
+
+
+def render_markdown(summary: dict) -> str:
+    """Render a telemetry summary as GitHub-flavoured markdown."""
+    lines = [
+        "### Bake telemetry",
+        "",
+        "| Target | Steps | Cached | Hit ratio | Executed |",
+        "| --- | ---: | ---: | ---: | ---: |",
+    ]
+    lines.extend(
+        f"| {name} | {t['steps']} | {t['cached']} | {t['cache_hit_ratio']:.0%} "
+        f"| {t['executed_s']:.1f}s |"
+        for name, t in summary["targets"].items()
+    )
+    if summary["slowest_steps"]:
+        lines += ["", "| Slowest step | Target | Duration |", "| --- | --- | ---: |"]
+        for step in summary["slowest_steps"]:
+            name = step["name"].replace("|", r"\|")
+            lines.append(f"| `{name}` | {step['target']} | {step['duration_s']:.1f}s |")
+    return "\n".join(lines) + "\n"
+
+
+def stream_bake(
+    cmd: list[str],
+    env: dict[str, str],
+    raw_path: Path,
+    on_step: Callable[[dict], None] | None = None,
+) -> tuple[int, dict[str, dict]]:
+    """Run bake with rawjson progress on stderr, logging it to ``raw_path``.
+
+    Returns the exit code and the folded vertex states; ``on_step`` is called
+    once per vertex as it completes. Lines that are not rawjson (such as
+    ``ERROR: failed to solve: ...``) and the output and error of failed steps
+    are echoed to our stderr, since the raw log is not shown.
+    """
+    vertices: dict[str, dict] = {}
+    logs: dict[str, list[str]] = {}
+    reported: set[str] = set()
+    raw_path.parent.mkdir(parents=True, exist_ok=True)
+    proc = subprocess.Popen(cmd, env=env, stderr=subprocess.PIPE, text=True)  # noqa: S603
+    with raw_path.open("w", encoding="utf-8") as log:
+        for line in proc.stderr or ():
+            log.write(line)
+            try:
+                status = json.loads(line)
+            except ValueError:
+                sys.stderr.write(line)
+                continue
+            fold_status(status, vertices)
+            buffer_logs(status, logs)
+            for digest, vertex in vertices.items():
+                if "completed" not in vertex or digest in reported:
+                    continue
+                reported.add(digest)
+                output = "".join(logs.pop(digest, []))
+                if "error" in vertex:
+                    error = f"ERROR: {vertex.get('name', '')}: {vertex['error']}"
+                    sys.stderr.write(f"{output}{error}\n")
+                if on_step:
+                    on_step(vertex)
+    return proc.wait(), vertices
@@ -0,0 +1,130 @@
+"""Pick a BuildKit cache backend per environment and keep local caches bounded.
+
+The bake file defaults to ``type=gha``, which only works inside GitHub Actions.
+Elsewhere, builds use a per-target ``type=local`` directory, or a
+``type=registry`` ref (for example a local ``registry:2``), via ``--set``
+overrides. The default ``docker`` buildx driver cannot export a cache (unless
+the containerd image store is enabled), so there only imports are kept.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from pathlib import Path
+
+BACKENDS = ("gha", "local", "registry")
+BACKEND_ENV = "BUILD_CACHE_BACKEND"
+REGISTRY_ENV = "BUILD_CACHE_REGISTRY"
+DEFAULT_MAX_BYTES = 10 * 1024**3
+# Buildx drivers that reject ``cache-to`` (other than ``type=inline``).
+NO_EXPORT_DRIVERS = frozenset({"docker"})
+
+
+def select_backend(env: Mapping[str, str] | None = None) -> str:
+    """Return the explicit backend, else gha in Actions, registry if configured, else local."""
+    env = os.environ if env is None else env
+    explicit = env.get(BACKEND_ENV, "")
+    if explicit in BACKENDS:
+        return explicit
+    if env.get("GITHUB_ACTIONS") == "true":
+        return "gha"
+    return "registry" if env.get(REGISTRY_ENV) else "local"
+
+
+def builder_driver() -> str | None:
+    """Return the driver of the active buildx builder, or None if it cannot be inspected."""
+    result = subprocess.run(
+        ["docker", "buildx", "inspect"],  # noqa: S607
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        return None
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip() == "Driver":
+            return value.strip()
+    return None
+
+
+def can_export(driver: str | None) -> bool:
+    """Return whether a builder on ``driver`` accepts ``cache-to`` exports."""
+    return driver not in NO_EXPORT_DRIVERS
+
+
+def cache_scope(target: str) -> str:
+    """Return the per-variant scope used by the bake file, e.g. ``build-noble-stable``."""
+    return f"build-{target.partition('-')[2] or target}"
+
+
+def cache_overrides(
+    targets: list[str],
+    backend: str,
+    *,
+    cache_dir: Path,
+    registry: str | None = None,
+    export: bool = True,
+) -> dict[str, list[str]]:
+    """Return the ``--set`` arguments that point each target's cache at ``backend``.
+
+    Registry targets of one variant share a scope, as in the bake file. Local
+    caches get one directory per target instead: the ``image-*`` and
+    ``artifact-*`` targets of a variant build concurrently, and two exports to
+    one directory race on its ``index.json``. ``gha`` needs no overrides.
+
+    Without ``export`` (a ``docker`` driver builder) no ``cache-to`` is set: a
+    registry cache is still imported, and a local one is skipped, since nothing
+    could have been exported to it.
+    """
+    overrides: dict[str, list[str]] = {}
+    for target in targets:
+        scope = cache_scope(target)
+        if backend == "local" and export:
+            location = cache_dir / target
+            cache_from = f"type=local,src={location}"
+            cache_to = f"type=local,dest={location},mode=max"
+        elif backend == "registry" and registry:
+            cache_from = f"type=registry,ref={registry}:{scope}"
+            cache_to = f"type=registry,ref={registry}:{scope},mode=max"
+        else:
+            continue
+        overrides[target] = ["--set", f"{target}.cache-from={cache_from}"]
+        if export:
+            overrides[target] += ["--set", f"{target}.cache-to={cache_to}"]
+    return overrides
+
+
+def _tree_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _last_used(path: Path) -> float:
+    index = path / "index.json"
+    return (index if index.is_file() else path).stat().st_mtime
+
+
+def prune(cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> list[Path]:
+    """Delete least recently exported cache directories until ``cache_dir`` fits ``max_bytes``.
+
+    ``type=local`` exports never drop old blobs, so without this a long-lived
+    cache directory grows without bound.
+    """
+    if not cache_dir.is_dir():
+        return []
+    scopes = [(p, _tree_size(p)) for p in cache_dir.iterdir() if p.is_dir()]
+    total = sum(size for _, size in scopes)
+    removed = []
+    for path, size in sorted(scopes, key=lambda item: _last_used(item[0])):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed.append(path)
+    return removed
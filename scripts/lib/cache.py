@@ -0,0 +1,154 @@
+"""Persistent on-disk caches shared by the automation scripts."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+CACHE_HOME_ENV = "PIXI_DEVCONTAINER_CACHE"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+def user_cache_dir(*parts: str) -> Path:
+    """Return the per-user cache directory (honours $PIXI_DEVCONTAINER_CACHE/$XDG_CACHE_HOME)."""
+    override = os.environ.get(CACHE_HOME_ENV)
+    if override:
+        root = Path(override)
+    else:
+        xdg = os.environ.get("XDG_CACHE_HOME")
+        root = (Path(xdg) if xdg else Path.home() / ".cache") / "pixi-devcontainer"
+    return root.joinpath(*parts)
+
+
+def hash_file(path: Path) -> str:
+    """Return the sha256 of a file, reading it in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        while chunk := fh.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path: Path, payload: object) -> None:
+    """Write JSON to ``path`` via a temp file so concurrent readers never see partial data."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh)
+    Path(tmp).replace(path)
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    """Replayable outcome of a check."""
+
+    success: bool
+    output: str
+
+
+class ResultCache:
+    """Content-addressed store of check results with LRU size eviction."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Create a cache rooted at ``root`` capped at ``max_bytes``."""
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(cmd: list[str], tool_version: str, files: list[Path]) -> str:
+        """Derive a cache key from the command, tool version and input file contents."""
+        hasher = hashlib.sha256()
+        hasher.update(json.dumps(cmd).encode())
+        hasher.update(b"\0")
+        hasher.update(tool_version.encode())
+        for path in sorted(files):
+            hasher.update(b"\0")
+            hasher.update(path.as_posix().encode())
+            hasher.update(b"\0")
+            if path.is_file():
+                hasher.update(hash_file(path).encode())
+        return hasher.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> CachedResult | None:
+        """Return a stored result and mark it recently used, or None on a miss."""
+        entry = self._entry(key)
+        try:
+            data = json.loads(entry.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        os.utime(entry, (now, now))
+        return CachedResult(success=bool(data["success"]), output=str(data["output"]))
+
+    def put(self, key: str, result: CachedResult) -> None:
+        """Store a result under ``key``."""
+        write_json_atomic(
+            self._entry(key),
+            {"success": result.success, "output": result.output, "created": time.time()},
+        )
+
+    def clear(self) -> int:
+        """Drop every stored result and return how many were removed."""
+        removed = 0
+        for entry in self.root.glob("*.json"):
+            entry.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits ``max_bytes``."""
+        entries = [(p, p.stat()) for p in self.root.glob("*.json")]
+        total = sum(st.st_size for _, st in entries)
+        removed = 0
+        for path, st in sorted(entries, key=lambda item: item[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= st.st_size
+            removed += 1
+        return removed
+
+
+class FileDigestCache:
+    """Per-file sha256 digests memoised by (path, size, mtime_ns) across runs."""
+
+    # Files modified this recently are hashed but not memoised: a second write
+    # within the filesystem's timestamp granularity could keep size and mtime.
+    RACY_WINDOW_S = 2.0
+
+    def __init__(self, path: Path) -> None:
+        """Load memoised digests from ``path`` (a missing or corrupt file starts empty)."""
+        self.path = path
+        try:
+            self.entries: dict[str, list] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+        self.dirty = False
+
+    def digest(self, path: Path) -> str:
+        """Return the sha256 of ``path``, rehashing only if its size or mtime changed."""
+        st = path.stat()
+        key = str(path.resolve())
+        entry = self.entries.get(key)
+        if entry is not None and entry[:2] == [st.st_size, st.st_mtime_ns]:
+            return entry[2]
+        digest = hash_file(path)
+        if time.time() - st.st_mtime >= self.RACY_WINDOW_S:
+            self.entries[key] = [st.st_size, st.st_mtime_ns, digest]
+            self.dirty = True
+        return digest
+
+    def save(self) -> None:
+        """Persist the memoised digests if anything changed."""
+        if self.dirty:
+            write_json_atomic(self.path, self.entries)
+            self.dirty = False
@@ -0,0 +1,43 @@
+"""Lazily constructed rich console shared by the CLI scripts.
+
+Importing ``rich.console`` costs tens of milliseconds, which dominated start-up
+of paths that print a line or nothing (``--help``, early exits). Scripts bind
+``console = LazyConsole()`` at module level exactly as before; rich is only
+imported the first time the console is actually used.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+class LazyConsole:
+    """Proxy for :class:`rich.console.Console` that builds it on first attribute access."""
+
+    def __init__(self, **kwargs: Any) -> None:  # noqa: ANN401
+        """Remember the ``Console`` keyword arguments without importing rich."""
+        object.__setattr__(self, "_kwargs", kwargs)
+        object.__setattr__(self, "_console", None)
+
+    def _resolve(self) -> Console:
+        if self._console is None:
+            from rich.console import Console  # noqa: PLC0415
+
+            object.__setattr__(self, "_console", Console(**self._kwargs))
+        return self._console
+
+    @property
+    def loaded(self) -> bool:
+        """Return True once the underlying console has been constructed."""
+        return self._console is not None
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        """Forward attribute reads (``print``, ``rule``, ``log``...) to the real console."""
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        """Forward attribute writes (e.g. ``console.file = sys.stderr``)."""
+        setattr(self._resolve(), name, value)
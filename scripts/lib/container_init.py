@@ -5,9 +5,9 @@ import shutil
 import subprocess
 from pathlib import Path
 
-from rich.console import Console
+from scripts.lib.console import LazyConsole
 
-console = Console()
+console = LazyConsole()
 
 
 def install_agents() -> None:
@@ -0,0 +1,238 @@
+"""Keep-alive GitHub REST client with ETag revalidation.
+
+Connections are pooled per client and reused across requests, every connection
+shares one SSL context, and GET responses carrying an ``ETag`` are remembered on
+disk so repeated polls send ``If-None-Match``. GitHub answers those with
+``304 Not Modified``, which does not count against the primary rate limit.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from scripts.lib.cache import user_cache_dir, write_json_atomic
+
+if TYPE_CHECKING:
+    import http.client
+    import ssl
+    from pathlib import Path
+
+GITHUB_API = "https://api.github.com"
+API_URL_ENV = "GITHUB_API_URL"
+ALLOWED_HOSTS = frozenset({"api.github.com"})
+# Plain http is only accepted for local stand-ins (tests, recorded fixtures).
+LOOPBACK_HOSTS = frozenset({"127.0.0.1", "localhost", "::1"})
+HTTP_ERROR_THRESHOLD = 400
+NOT_MODIFIED = 304
+MAX_ETAG_ENTRIES = 256
+POOL_SIZE = 8
+TIMEOUT_S = 10.0
+
+_ssl_context: ssl.SSLContext | None = None
+_ssl_lock = threading.Lock()
+
+
+class GitHubAPIError(RuntimeError):
+    """Raised when the GitHub API answers with an error status."""
+
+    def __init__(self, status: int, body: str, headers: dict[str, str] | None = None) -> None:
+        """Record the HTTP status, response body and (lower-cased) headers."""
+        super().__init__(f"GitHub API error {status}: {body}")
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+@dataclass(frozen=True)
+class Response:
+    """Decoded API response."""
+
+    status: int
+    data: dict
+    headers: dict[str, str] = field(default_factory=dict)
+    # True when the body was replayed from the ETag cache after a 304.
+    cached: bool = False
+
+
+def shared_ssl_context() -> ssl.SSLContext:
+    """Return the process-wide default SSL context, creating it on first use."""
+    global _ssl_context  # noqa: PLW0603 - one context for every connection
+    import ssl  # noqa: PLC0415 - keep ssl off the CLI import path
+
+    with _ssl_lock:
+        if _ssl_context is None:
+            _ssl_context = ssl.create_default_context()
+        return _ssl_context
+
+
+def check_base_url(base_url: str) -> urllib.parse.SplitResult:
+    """Validate an API base URL: https to GitHub, or http to a loopback stand-in."""
+    parsed = urllib.parse.urlsplit(base_url)
+    host = parsed.hostname or ""
+    if parsed.scheme == "https" and host in ALLOWED_HOSTS:
+        return parsed
+    if parsed.scheme == "http" and host in LOOPBACK_HOSTS:
+        return parsed
+    if parsed.scheme != "https":
+        message = "Refusing non-https GitHub API URL"
+        raise ValueError(message)
+    message = f"Unexpected GitHub API host: {parsed.netloc}"
+    raise ValueError(message)
+
+
+def default_etag_path() -> Path:
+    """Return the on-disk ETag cache location."""
+    return user_cache_dir("gha", "etags.json")
+
+
+class GitHubClient:
+    """Thread-safe GitHub REST client over a pool of keep-alive connections."""
+
+    def __init__(
+        self,
+        token: str,
+        *,
+        base_url: str | None = None,
+        etag_path: Path | None = None,
+        timeout: float = TIMEOUT_S,
+    ) -> None:
+        """Create a client; ``etag_path`` defaults to the user cache."""
+        self.token = token
+        self.base = check_base_url(base_url or os.environ.get(API_URL_ENV) or GITHUB_API)
+        self.timeout = timeout
+        self.etag_path = etag_path or default_etag_path()
+        self._idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue(POOL_SIZE)
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            self._etags: dict[str, dict] = json.loads(self.etag_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._etags = {}
+        self.connections_opened = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        """Return an idle pooled connection, or open a new one."""
+        import http.client  # noqa: PLC0415 - keep http.client off the CLI import path
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            self.connections_opened += 1
+        host, port = self.base.hostname or "", self.base.port
+        if self.base.scheme == "https":
+            return http.client.HTTPSConnection(
+                host,
+                port,
+                timeout=self.timeout,
+                context=shared_ssl_context(),
+            )
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        """Return a connection to the pool, closing it if the pool is full."""
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _url(self, path: str, params: dict[str, str] | None) -> str:
+        """Build the request target (base path + API path + query)."""
+        target = f"{self.base.path.rstrip('/')}{path}"
+        query = urllib.parse.urlencode(sorted((params or {}).items()))
+        return f"{target}?{query}" if query else target
+
+    def _send(
+        self,
+        url: str,
+        headers: dict[str, str],
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Issue one GET, retrying once on a connection the server already closed."""
+        import http.client  # noqa: PLC0415
+
+        # A pooled connection the server has already closed fails on first use.
+        stale = (
+            http.client.RemoteDisconnected,
+            http.client.CannotSendRequest,
+            BrokenPipeError,
+            ConnectionResetError,
+        )
+        for attempt in range(2):
+            conn = self._connect()
+            try:
+                conn.request("GET", url, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except stale:
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, {k.lower(): v for k, v in response.getheaders()}, body
+        raise AssertionError  # pragma: no cover - the loop always returns or raises
+
+    def request(self, path: str, params: dict[str, str] | None = None) -> Response:
+        """GET ``path``, revalidating against the ETag cache."""
+        url = self._url(path, params)
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        key = f"{self.base.netloc}{url}"
+        with self._lock:
+            cached = self._etags.get(key)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+        status, response_headers, body = self._send(url, headers)
+        if status == NOT_MODIFIED and cached:
+            return Response(status, cached["data"], response_headers, cached=True)
+        text = body.decode("utf-8", errors="replace")
+        if status >= HTTP_ERROR_THRESHOLD:
+            raise GitHubAPIError(status, text, response_headers)
+        data = json.loads(text) if text else {}
+        etag = response_headers.get("etag")
+        if etag:
+            with self._lock:
+                self._etags.pop(key, None)
+                self._etags[key] = {"etag": etag, "data": data}
+                while len(self._etags) > MAX_ETAG_ENTRIES:
+                    self._etags.pop(next(iter(self._etags)))
+                self._dirty = True
+        return Response(status, data, response_headers)
+
+    def get(self, path: str, params: dict[str, str] | None = None) -> dict:
+        """GET ``path`` and return the decoded JSON object."""
+        return self.request(path, params).data
+
+    def save(self) -> None:
+        """Persist the ETag cache if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._etags)
+            self._dirty = False
+        write_json_atomic(self.etag_path, snapshot)
+
+    def close(self) -> None:
+        """Persist the ETag cache and close pooled connections."""
+        self.save()
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
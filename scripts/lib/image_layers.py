@@ -0,0 +1,102 @@
+"""Compare the layers of a freshly pushed image with the tag it replaces."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from typing import TypedDict
+
+INDEX_MEDIA_TYPES = (
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+)
+
+
+class Layer(TypedDict):
+    """One layer of an image manifest."""
+
+    digest: str
+    size: int
+
+
+class LayerStatus(Layer):
+    """A layer of the new image, numbered from the base and marked reused or new."""
+
+    index: int
+    status: str
+
+
+class LayerDelta(TypedDict):
+    """Per-layer status and byte totals of a new image against the one it replaces."""
+
+    layers: list[LayerStatus]
+    total_bytes: int
+    new_bytes: int
+    reused_bytes: int
+
+
+def repository(ref: str) -> str:
+    """Strip the tag or digest from an image reference (registry ports are kept)."""
+    if "@" in ref:
+        return ref.split("@", 1)[0]
+    name, _, tag = ref.rpartition(":")
+    return name if name and "/" not in tag else ref
+
+
+def raw_manifest(ref: str) -> dict | None:
+    """Return the raw manifest (or index) for ``ref``, or None if it does not resolve."""
+    result = subprocess.run(  # noqa: S603
+        ["docker", "buildx", "imagetools", "inspect", "--raw", ref],  # noqa: S607
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        return None
+
+
+def manifest_layers(ref: str, platform: str = "linux/amd64") -> list[Layer] | None:
+    """Return ``[{digest, size}]`` for the image's ``platform`` manifest, base layers first."""
+    manifest = raw_manifest(ref)
+    if manifest is not None and manifest.get("mediaType") in INDEX_MEDIA_TYPES:
+        os_name, _, arch = platform.partition("/")
+        entry = next(
+            (
+                m
+                for m in manifest.get("manifests", [])
+                if m.get("platform", {}).get("os") == os_name
+                and m.get("platform", {}).get("architecture") == arch
+            ),
+            None,
+        )
+        manifest = raw_manifest(f"{repository(ref)}@{entry['digest']}") if entry else None
+    if manifest is None:
+        return None
+    return [
+        Layer(digest=layer["digest"], size=int(layer["size"]))
+        for layer in manifest.get("layers", [])
+    ]
+
+
+def layer_delta(previous: list[Layer] | None, current: list[Layer]) -> LayerDelta:
+    """Classify each current layer as reused or new relative to ``previous``.
+
+    ``new_bytes`` is what a machine holding the previous image has to pull.
+    """
+    known = {layer["digest"] for layer in previous or []}
+    layers = [
+        LayerStatus(
+            digest=layer["digest"],
+            size=layer["size"],
+            index=index,
+            status="reused" if layer["digest"] in known else "new",
+        )
+        for index, layer in enumerate(current)
+    ]
+    total = sum(layer["size"] for layer in current)
+    new = sum(layer["size"] for layer in layers if layer["status"] == "new")
+    return LayerDelta(layers=layers, total_bytes=total, new_bytes=new, reused_bytes=total - new)
@@ -0,0 +1,98 @@
+"""Subprocess execution with per-child resource accounting."""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+
+class CancelledError(subprocess.SubprocessError):
+    """Raised when spawning into a process group that has been killed."""
+
+
+class ProcessGroup:
+    """Track live children so a whole batch can be killed at once."""
+
+    def __init__(self) -> None:
+        """Create an open, empty group."""
+        self._lock = threading.Lock()
+        self._live: set[subprocess.Popen[str]] = set()
+        self.closed = False
+
+    def spawn(self, cmd: list[str]) -> subprocess.Popen[str]:
+        """Start ``cmd`` in its own session and register it, unless the group is closed."""
+        with self._lock:
+            if self.closed:
+                message = f"cancelled before start: {cmd[0]}"
+                raise CancelledError(message)
+            proc = subprocess.Popen(  # noqa: S603
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                start_new_session=True,
+            )
+            self._live.add(proc)
+        return proc
+
+    def release(self, proc: subprocess.Popen[str]) -> None:
+        """Forget a child that has been reaped."""
+        with self._lock:
+            self._live.discard(proc)
+
+    def kill(self) -> int:
+        """Close the group and SIGTERM every live child's process group; return how many."""
+        with self._lock:
+            self.closed = True
+            live = list(self._live)
+        for proc in live:
+            try:
+                os.killpg(proc.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                continue
+        return len(live)
+
+
+@dataclass(frozen=True)
+class Execution:
+    """Exit status, combined output and resource usage of a finished child."""
+
+    returncode: int
+    output: str
+    wall: float
+    user: float
+    sys: float
+    max_rss_kb: int = 0
+
+    @property
+    def cpu(self) -> float:
+        """Total CPU seconds (user + sys) spent by the child and its reaped descendants."""
+        return self.user + self.sys
+
+
+def run_measured(cmd: list[str], group: ProcessGroup | None = None) -> Execution:
+    """Run ``cmd`` to completion, capturing stdout+stderr and its rusage via wait4.
+
+    Children started through ``group`` can be killed from another thread.
+    """
+    group = group or ProcessGroup()
+    start = time.monotonic()
+    with group.spawn(cmd) as proc:
+        output = proc.stdout.read() if proc.stdout else ""
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        group.release(proc)
+    return Execution(
+        returncode=proc.returncode,
+        output=output,
+        wall=time.monotonic() - start,
+        user=usage.ru_utime,
+        sys=usage.ru_stime,
+        # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+        max_rss_kb=usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss,
+    )
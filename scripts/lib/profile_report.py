@@ -0,0 +1,110 @@
+"""Per-check timing and resource profiles for the validation suite."""
+
+from __future__ import annotations
+
+import json
+import statistics
+import subprocess
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from scripts.lib.procs import Execution
+
+# A check slower than this multiple of its historical median is flagged.
+REGRESSION_FACTOR = 1.5
+# Ignore regressions smaller than this many seconds (noise on fast checks).
+REGRESSION_MIN_SECONDS = 2.0
+HISTORY_WINDOW = 20
+
+
+def current_commit() -> str:
+    """Return the HEAD commit, or an empty string outside a git checkout."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def build_report(executions: dict[str, Execution], wall_clock: float) -> dict:
+    """Return a JSON-serialisable profile of every executed check, slowest first."""
+    checks = [
+        {
+            "name": name,
+            "returncode": ex.returncode,
+            "wall_s": round(ex.wall, 3),
+            "user_s": round(ex.user, 3),
+            "sys_s": round(ex.sys, 3),
+            "max_rss_kb": ex.max_rss_kb,
+        }
+        for name, ex in sorted(executions.items(), key=lambda item: -item[1].wall)
+    ]
+    return {
+        "timestamp": time.time(),
+        "commit": current_commit(),
+        "wall_clock_s": round(wall_clock, 3),
+        "cpu_s": round(sum(ex.cpu for ex in executions.values()), 3),
+        "checks": checks,
+    }
+
+
+def render_table(report: dict) -> list[str]:
+    """Render the report as aligned text lines."""
+    width = max([len("Check"), *(len(c["name"]) for c in report["checks"])])
+    lines = [f"{'Check':<{width}}  {'Wall s':>8}  {'User s':>8}  {'Sys s':>8}  {'RSS MB':>8}  Exit"]
+    lines.extend(
+        f"{c['name']:<{width}}  {c['wall_s']:>8.2f}  {c['user_s']:>8.2f}  {c['sys_s']:>8.2f}  "
+        f"{c['max_rss_kb'] / 1024:>8.1f}  {c['returncode']}"
+        for c in report["checks"]
+    )
+    lines.append(f"Total wall {report['wall_clock_s']:.2f}s, CPU {report['cpu_s']:.2f}s")
+    return lines
+
+
+def load_history(path: Path, window: int = HISTORY_WINDOW) -> list[dict]:
+    """Return the last ``window`` reports from a JSONL history file."""
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    reports = []
+    for line in lines[-window:]:
+        try:
+            reports.append(json.loads(line))
+        except ValueError:
+            continue
+    return reports
+
+
+def append_history(path: Path, report: dict) -> None:
+    """Append a report to the JSONL history file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(report, separators=(",", ":")) + "\n")
+
+
+def find_regressions(report: dict, history: list[dict]) -> list[str]:
+    """Describe checks noticeably slower than their median over ``history``."""
+    past: dict[str, list[float]] = {}
+    for entry in history:
+        for check in entry.get("checks", []):
+            past.setdefault(check["name"], []).append(check["wall_s"])
+    messages = []
+    for check in report["checks"]:
+        samples = past.get(check["name"])
+        if not samples:
+            continue
+        median = statistics.median(samples)
+        slower = check["wall_s"] - median
+        if check["wall_s"] > median * REGRESSION_FACTOR and slower >= REGRESSION_MIN_SECONDS:
+            messages.append(
+                f"{check['name']} took {check['wall_s']:.1f}s vs median {median:.1f}s "
+                f"over {len(samples)} run(s)",
+            )
+    return messages
@@ -0,0 +1,225 @@
+"""Append-only SQLite history of GitHub Actions runs, jobs and step timings.
+
+Only completed runs are recorded, and each run is written once together with
+its jobs and steps, so rows never change after insert and a sync only has to
+fetch runs it has not seen. Timestamps are stored as Unix seconds so that
+durations are simple subtractions.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from scripts.lib.cache import user_cache_dir
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+# Stay under SQLITE_MAX_VARIABLE_NUMBER, which is 999 on SQLite before 3.32.
+MAX_QUERY_IDS = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL,
+    workflow TEXT NOT NULL,
+    branch TEXT,
+    event TEXT,
+    conclusion TEXT,
+    attempt INTEGER,
+    created_at REAL,
+    started_at REAL,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS runs_by_workflow ON runs (repo, workflow, created_at);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    name TEXT NOT NULL,
+    conclusion TEXT,
+    runner TEXT,
+    created_at REAL,
+    started_at REAL,
+    completed_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_run ON jobs (run_id);
+CREATE TABLE IF NOT EXISTS steps (
+    job_id INTEGER NOT NULL REFERENCES jobs (id),
+    number INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    conclusion TEXT,
+    started_at REAL,
+    completed_at REAL,
+    PRIMARY KEY (job_id, number)
+);
+"""
+
+
+def default_db_path() -> Path:
+    """Return the default history database location."""
+    return user_cache_dir("gha", "history.sqlite")
+
+
+def parse_time(value: str | None) -> float | None:
+    """Convert a GitHub ISO-8601 timestamp to Unix seconds."""
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of ``values`` (which must be non-empty)."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def spread(values: Iterable[float | None]) -> dict[str, float | None]:
+    """Return p50/p95 of the known values, or None when there are none."""
+    known = [value for value in values if value is not None]
+    if not known:
+        return {"p50_s": None, "p95_s": None}
+    return {"p50_s": percentile(known, 0.5), "p95_s": percentile(known, 0.95)}
+
+
+def elapsed(start: float | None, end: float | None) -> float | None:
+    """Return ``end - start`` when both are known."""
+    return end - start if start is not None and end is not None else None
+
+
+class RunHistory:
+    """SQLite-backed run/job/step history."""
+
+    def __init__(self, path: Path) -> None:
+        """Open (creating if needed) the database at ``path``."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        self.db.close()
+
+    def known(self, run_ids: Iterable[int]) -> set[int]:
+        """Return which of ``run_ids`` are already recorded (queried in bounded chunks)."""
+        ids = list(run_ids)
+        found: set[int] = set()
+        for start in range(0, len(ids), MAX_QUERY_IDS):
+            chunk = ids[start : start + MAX_QUERY_IDS]
+            marks = ",".join("?" * len(chunk))
+            rows = self.db.execute(f"SELECT id FROM runs WHERE id IN ({marks})", chunk)  # noqa: S608
+            found.update(row[0] for row in rows)
+        return found
+
+    def add(self, repo: str, run: dict, jobs: list[dict]) -> bool:
+        """Record a completed run with its jobs and steps; False if already present."""
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run["id"],
+                    repo,
+                    run.get("path") or run.get("name") or "unknown",
+                    run.get("head_branch"),
+                    run.get("event"),
+                    run.get("conclusion"),
+                    run.get("run_attempt"),
+                    parse_time(run.get("created_at")),
+                    parse_time(run.get("run_started_at")),
+                    parse_time(run.get("updated_at")),
+                ),
+            )
+            if not cursor.rowcount:
+                return False
+            self.db.executemany(
+                "INSERT OR IGNORE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        job["id"],
+                        run["id"],
+                        job.get("name") or str(job["id"]),
+                        job.get("conclusion"),
+                        job.get("runner_name"),
+                        parse_time(job.get("created_at")),
+                        parse_time(job.get("started_at")),
+                        parse_time(job.get("completed_at")),
+                    )
+                    for job in jobs
+                ],
+            )
+            self.db.executemany(
+                "INSERT OR IGNORE INTO steps VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        job["id"],
+                        step.get("number", index),
+                        step.get("name") or "",
+                        step.get("conclusion"),
+                        parse_time(step.get("started_at")),
+                        parse_time(step.get("completed_at")),
+                    )
+                    for job in jobs
+                    for index, step in enumerate(job.get("steps") or [], start=1)
+                ],
+            )
+        return True
+
+    def workflows(self, repo: str) -> list[str]:
+        """Return the workflows with recorded runs."""
+        rows = self.db.execute(
+            "SELECT DISTINCT workflow FROM runs WHERE repo = ? ORDER BY workflow",
+            (repo,),
+        )
+        return [row[0] for row in rows]
+
+    def report(self, repo: str, workflow: str, last: int, top: int) -> dict:
+        """Summarize the last ``last`` runs of ``workflow``.
+
+        Returns run duration and queue time percentiles, per-job duration and
+        queue time percentiles, and the ``top`` steps with the highest p95.
+        """
+        runs = self.db.execute(
+            "SELECT id, created_at, started_at, updated_at FROM runs "
+            "WHERE repo = ? AND workflow = ? ORDER BY created_at DESC LIMIT ?",
+            (repo, workflow, last),
+        ).fetchall()
+        ids = [run[0] for run in runs]
+        marks = ",".join("?" * len(ids))
+        jobs: dict[str, dict[str, list]] = defaultdict(lambda: {"duration": [], "queue": []})
+        for name, created, started, completed in self.db.execute(
+            "SELECT name, created_at, started_at, completed_at FROM jobs "  # noqa: S608
+            f"WHERE run_id IN ({marks})",
+            ids,
+        ):
+            jobs[name]["duration"].append(elapsed(started, completed))
+            jobs[name]["queue"].append(elapsed(created, started))
+        steps: dict[tuple[str, str], list] = defaultdict(list)
+        for job, step, started, completed in self.db.execute(
+            "SELECT jobs.name, steps.name, steps.started_at, steps.completed_at "  # noqa: S608
+            "FROM steps JOIN jobs ON jobs.id = steps.job_id "
+            f"WHERE jobs.run_id IN ({marks})",
+            ids,
+        ):
+            steps[(job, step)].append(elapsed(started, completed))
+        step_rows = [
+            {"job": job, "step": step, "count": len(values), **spread(values)}
+            for (job, step), values in steps.items()
+        ]
+        step_rows.sort(key=lambda row: row["p95_s"] or 0.0, reverse=True)
+        return {
+            "workflow": workflow,
+            "runs": len(runs),
+            "duration": spread(elapsed(run[2], run[3]) for run in runs),
+            "queue": spread(elapsed(run[1], run[2]) for run in runs),
+            "jobs": [
+                {
+                    "name": name,
+                    "count": len(values["duration"]),
+                    "duration": spread(values["duration"]),
+                    "queue": spread(values["queue"]),
+                }
+                for name, values in sorted(jobs.items())
+            ],
+            "slowest_steps": step_rows[:top],
+        }
@@ -0,0 +1,206 @@
+"""Cost-aware scheduling for parallel checks based on historical runs."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, TypeVar
+
+from scripts.lib.cache import write_json_atomic
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from scripts.lib.procs import Execution
+
+T = TypeVar("T")
+
+# Weight of the newest sample in the moving averages.
+SMOOTHING = 0.5
+# Checks averaging at least this many busy cores count as CPU-heavy.
+HEAVY_CPU_RATIO = 0.5
+
+
+@dataclass(frozen=True)
+class CheckStats:
+    """Smoothed wall/CPU seconds observed for a check."""
+
+    wall: float
+    cpu: float
+    runs: int = 1
+
+    @property
+    def cores(self) -> float:
+        """Average number of cores kept busy while the check ran."""
+        return self.cpu / self.wall if self.wall > 0 else 0.0
+
+
+class StatsStore:
+    """JSON-backed history of per-check durations and CPU usage."""
+
+    def __init__(self, path: Path) -> None:
+        """Load stats from ``path`` (missing or corrupt files start empty)."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats: dict[str, CheckStats] = {}
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            self._stats = {name: CheckStats(**entry) for name, entry in raw.items()}
+        except (OSError, ValueError, TypeError):
+            self._stats = {}
+
+    def get(self, name: str) -> CheckStats | None:
+        """Return recorded stats for a check, if any."""
+        return self._stats.get(name)
+
+    def record(self, name: str, wall: float, cpu: float) -> None:
+        """Fold a new observation into the moving averages."""
+        with self._lock:
+            old = self._stats.get(name)
+            if old is None:
+                self._stats[name] = CheckStats(wall=wall, cpu=cpu)
+                return
+            self._stats[name] = CheckStats(
+                wall=SMOOTHING * wall + (1 - SMOOTHING) * old.wall,
+                cpu=SMOOTHING * cpu + (1 - SMOOTHING) * old.cpu,
+                runs=old.runs + 1,
+            )
+
+    def save(self) -> None:
+        """Persist the stats atomically."""
+        with self._lock:
+            payload = {
+                name: {"wall": s.wall, "cpu": s.cpu, "runs": s.runs}
+                for name, s in self._stats.items()
+            }
+        write_json_atomic(self.path, payload)
+
+
+class CpuBudget:
+    """Weighted semaphore that admits waiters strictly by priority."""
+
+    def __init__(self, capacity: int) -> None:
+        """Create a budget of ``capacity`` CPU tokens."""
+        self.capacity = capacity
+        self.available = capacity
+        self._cond = threading.Condition()
+        self._waiting: list[tuple[float, int]] = []
+        self._seq = itertools.count()
+
+    @contextmanager
+    def reserve(self, tokens: int, priority: float = 0.0) -> Iterator[None]:
+        """Hold ``tokens`` (clamped to capacity); higher ``priority`` is admitted first."""
+        tokens = min(tokens, self.capacity)
+        if tokens <= 0:
+            yield
+            return
+        ticket = (-priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            self._cond.wait_for(
+                lambda: self._waiting[0] == ticket and self.available >= tokens,
+            )
+            heapq.heappop(self._waiting)
+            self.available -= tokens
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.available += tokens
+                self._cond.notify_all()
+
+
+@dataclass(frozen=True)
+class Span:
+    """When a check started and finished, relative to the suite start."""
+
+    name: str
+    started: float
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        """Seconds the check actually ran."""
+        return self.finished - self.started
+
+
+class Scheduler:
+    """Order checks longest-first and cap concurrent CPU-heavy work at the core count."""
+
+    def __init__(self, stats: StatsStore, cores: int) -> None:
+        """Schedule against ``stats`` with a budget of ``cores`` CPU tokens."""
+        self.stats = stats
+        self.budget = CpuBudget(max(cores, 1))
+        self.spans: dict[str, Span] = {}
+        self.running: dict[str, float] = {}
+        self.executions: dict[str, Execution] = {}
+        self._origin = time.monotonic()
+
+    def expected(self, name: str) -> float:
+        """Return expected wall time; unknown checks sort first so their cost is learned early."""
+        stats = self.stats.get(name)
+        return stats.wall if stats else float("inf")
+
+    def order(self, checks: list[tuple[str, T]]) -> list[tuple[str, T]]:
+        """Return checks sorted by expected duration, longest first."""
+        return sorted(checks, key=lambda check: self.expected(check[0]), reverse=True)
+
+    def tokens(self, name: str) -> int:
+        """CPU tokens a check holds while running (0 for I/O-bound checks)."""
+        stats = self.stats.get(name)
+        if stats is None:
+            return 1
+        if stats.cores < HEAVY_CPU_RATIO:
+            return 0
+        return max(1, min(round(stats.cores), self.budget.capacity))
+
+    @contextmanager
+    def slot(self, name: str) -> Iterator[None]:
+        """Wait for CPU budget, then time the wrapped execution."""
+        with self.budget.reserve(self.tokens(name), self.expected(name)):
+            started = time.monotonic() - self._origin
+            self.running[name] = started
+            try:
+                yield
+            finally:
+                self.running.pop(name, None)
+                self.spans[name] = Span(name, started, time.monotonic() - self._origin)
+
+    def elapsed(self) -> dict[str, float]:
+        """Return seconds elapsed for each check currently running."""
+        now = time.monotonic() - self._origin
+        return {name: now - started for name, started in dict(self.running).items()}
+
+    def record(self, name: str, execution: Execution) -> None:
+        """Keep a finished execution and fold its cost into future scheduling."""
+        self.executions[name] = execution
+        self.stats.record(name, execution.wall, execution.cpu)
+
+    @property
+    def wall_clock(self) -> float:
+        """Seconds from the suite start to the last finished check."""
+        return max((span.finished for span in self.spans.values()), default=0.0)
+
+    def report(self) -> list[str]:
+        """Describe the critical path: the check whose completion set the wall clock."""
+        if not self.spans:
+            return []
+        last = max(self.spans.values(), key=lambda span: span.finished)
+        longest = max(self.spans.values(), key=lambda span: span.duration)
+        return [
+            (
+                f"Critical path: {last.name} waited {last.started:.1f}s, "
+                f"ran {last.duration:.1f}s, finished at {last.finished:.1f}s"
+            ),
+            (
+                f"Lower bound: {longest.name} ran {longest.duration:.1f}s "
+                f"({last.finished - longest.duration:.1f}s above it)"
+            ),
+        ]
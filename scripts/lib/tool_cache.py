@@ -0,0 +1,211 @@
+"""Version-pinned, checksum-verified cache of standalone tool binaries.
+
+Binaries live under ``<user cache>/tools/<name>/<version>/<os>-<arch>/`` and are
+resolved without network access once present. Air-gapped machines can pre-seed
+the cache from a directory holding the release assets (and optionally their
+``.sha256`` sidecars).
+
+Usage examples:
+  python -m scripts.lib.tool_cache hadolint
+  python -m scripts.lib.tool_cache --seed-dir /mnt/tools hadolint
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from scripts.lib.cache import hash_file, user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+SEED_DIR_ENV = "TOOL_CACHE_SEED"
+SHA256_RE = re.compile(r"\b[0-9a-f]{64}\b")
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """A standalone binary pinned to one release."""
+
+    name: str
+    version: str
+    # (platform.system(), platform.machine()) -> release asset URL
+    urls: dict[tuple[str, str], str]
+    # Pinned sha256 per platform; platforms without one are verified against the
+    # release's published ``<asset>.sha256`` sidecar on first download.
+    sha256: dict[tuple[str, str], str] = field(default_factory=dict)
+
+
+_HADOLINT_RELEASE = "https://github.com/hadolint/hadolint/releases/download/v2.12.0"
+# Digests of the v2.12.0 release assets (the published ``<asset>.sha256`` files).
+_HADOLINT_LINUX_X86_64 = "56de6d5e5ec427e17b74fa48d51271c7fc0d61244bf5c90e828aab8362d55010"
+_HADOLINT_LINUX_ARM64 = "5798551bf19f33951881f15eb238f90aef023f11e7ec7e9f4c37961cb87c5df6"
+_HADOLINT_DARWIN_X86_64 = "2a5b7afcab91645c39a7cebefcd835b865f7488e69be85c5af9b5a6a7c8bb8b1"
+
+PINNED_TOOLS: dict[str, ToolSpec] = {
+    "hadolint": ToolSpec(
+        name="hadolint",
+        version="v2.12.0",
+        urls={
+            ("Linux", "x86_64"): f"{_HADOLINT_RELEASE}/hadolint-Linux-x86_64",
+            ("Linux", "aarch64"): f"{_HADOLINT_RELEASE}/hadolint-Linux-arm64",
+            ("Darwin", "x86_64"): f"{_HADOLINT_RELEASE}/hadolint-Darwin-x86_64",
+            # v2.12.0 ships no arm64 macOS asset: Apple silicon deliberately gets
+            # the x86_64 binary (run under Rosetta 2) and is pinned to its digest.
+            ("Darwin", "arm64"): f"{_HADOLINT_RELEASE}/hadolint-Darwin-x86_64",
+        },
+        sha256={
+            ("Linux", "x86_64"): _HADOLINT_LINUX_X86_64,
+            ("Linux", "aarch64"): _HADOLINT_LINUX_ARM64,
+            ("Darwin", "x86_64"): _HADOLINT_DARWIN_X86_64,
+            ("Darwin", "arm64"): _HADOLINT_DARWIN_X86_64,
+        },
+    ),
+}
+
+
+def platform_key() -> tuple[str, str]:
+    """Return the (system, machine) pair used to index tool tables."""
+    return platform.system(), platform.machine()
+
+
+def tool_dir(spec: ToolSpec, key: tuple[str, str]) -> Path:
+    """Return the cache directory for one tool/version/platform."""
+    return user_cache_dir("tools", spec.name, spec.version, f"{key[0]}-{key[1]}")
+
+
+def parse_sha256(text: str) -> str | None:
+    """Extract the first sha256 hex digest from a sidecar file's contents."""
+    match = SHA256_RE.search(text.lower())
+    return match.group(0) if match else None
+
+
+def download(url: str, dest: Path) -> bool:
+    """Download ``url`` to ``dest`` with curl; return False on failure."""
+    try:
+        subprocess.run(["curl", "-fsSL", "-o", str(dest), url], check=True)  # noqa: S603,S607
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return dest.is_file()
+
+
+def _install(binary: Path, expected: str, target: Path) -> Path | None:
+    """Verify ``binary`` against ``expected`` and move it into the cache as ``target``."""
+    actual = hash_file(binary)
+    if actual != expected:
+        logger.error("Checksum mismatch for %s: expected %s, got %s", binary, expected, actual)
+        return None
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staged = target.with_name(f".{target.name}.tmp")
+    shutil.copyfile(binary, staged)
+    staged.chmod(0o755)
+    staged.replace(target)
+    target.with_name(f"{target.name}.sha256").write_text(f"{expected}\n", encoding="utf-8")
+    return target
+
+
+def cached_binary(spec: ToolSpec, key: tuple[str, str]) -> Path | None:
+    """Return the cached binary if present and still matching its recorded checksum."""
+    binary = tool_dir(spec, key) / spec.name
+    record = binary.with_name(f"{spec.name}.sha256")
+    if not binary.is_file() or not record.is_file():
+        return None
+    expected = spec.sha256.get(key) or parse_sha256(record.read_text(encoding="utf-8"))
+    if expected is None or hash_file(binary) != expected:
+        logger.warning("Discarding corrupt cached %s at %s", spec.name, binary)
+        binary.unlink(missing_ok=True)
+        record.unlink(missing_ok=True)
+        return None
+    return binary
+
+
+def seed_from(spec: ToolSpec, key: tuple[str, str], seed_dir: Path) -> Path | None:
+    """Install the tool from a local directory of release assets."""
+    asset = spec.urls[key].rsplit("/", 1)[-1]
+    for candidate in (seed_dir / asset, seed_dir / spec.name):
+        if not candidate.is_file():
+            continue
+        sidecar = candidate.with_name(f"{candidate.name}.sha256")
+        expected = spec.sha256.get(key) or (
+            parse_sha256(sidecar.read_text(encoding="utf-8")) if sidecar.is_file() else None
+        )
+        if expected is None:
+            logger.warning("No pinned or sidecar checksum for %s; not seeding", candidate)
+            continue
+        return _install(candidate, expected, tool_dir(spec, key) / spec.name)
+    return None
+
+
+def fetch(spec: ToolSpec, key: tuple[str, str]) -> Path | None:
+    """Download the pinned release asset, verify it and install it into the cache."""
+    url = spec.urls[key]
+    staging = tool_dir(spec, key) / ".download"
+    staging.mkdir(parents=True, exist_ok=True)
+    try:
+        binary = staging / spec.name
+        if not download(url, binary):
+            return None
+        expected = spec.sha256.get(key)
+        if expected is None:
+            sidecar = staging / f"{spec.name}.sha256"
+            if not download(f"{url}.sha256", sidecar):
+                return None
+            expected = parse_sha256(sidecar.read_text(encoding="utf-8"))
+        if expected is None:
+            return None
+        return _install(binary, expected, tool_dir(spec, key) / spec.name)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def ensure_tool(name: str, seed_dir: Path | None = None) -> Path | None:
+    """Return a verified cached binary for ``name``, seeding or downloading it if needed."""
+    spec = PINNED_TOOLS.get(name)
+    key = platform_key()
+    if spec is None or key not in spec.urls:
+        return None
+    binary = cached_binary(spec, key)
+    if binary is None:
+        seed = seed_dir or (Path(os.environ[SEED_DIR_ENV]) if SEED_DIR_ENV in os.environ else None)
+        binary = seed_from(spec, key, seed) if seed else None
+    return binary or fetch(spec, key)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:  # pragma: no cover
+    """Parse CLI arguments."""
+    p = argparse.ArgumentParser(description="Populate the pinned tool binary cache")
+    p.add_argument("tools", nargs="*", default=sorted(PINNED_TOOLS), help="tools to provision")
+    p.add_argument(
+        "--seed-dir",
+        type=Path,
+        default=None,
+        help=f"install from local release assets instead of downloading (env: {SEED_DIR_ENV})",
+    )
+    return p.parse_args(argv)
+
+
+def main() -> None:  # pragma: no cover
+    """Provision the requested tools and print their cached paths."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    args = parse_args()
+    missing = False
+    for name in args.tools:
+        binary = ensure_tool(name, args.seed_dir)
+        if binary is None:
+            logger.error("Could not provision %s", name)
+            missing = True
+        else:
+            sys.stdout.write(f"{name}\t{binary}\n")
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()
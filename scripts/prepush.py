@@ -6,9 +6,9 @@ from __future__ import annotations
 import subprocess
 import sys
 
-from rich.console import Console
+from scripts.lib.console import LazyConsole
 
-console = Console()
+console = LazyConsole()
 
 
 def run(cmd: list[str], *, cwd: str | None = None) -> None:
@@ -4,14 +4,15 @@ import shutil
 import subprocess
 from pathlib import Path
 
-from rich.console import Console
-from rich.prompt import Confirm, Prompt
+from scripts.lib.console import LazyConsole
 
-console = Console()
+console = LazyConsole()
 
 
 def main() -> None:
     """Create SSH config entry and optional mutagen sync."""
+    from rich.prompt import Confirm, Prompt  # noqa: PLC0415 - keep rich off the import path
+
     console.rule("[bold blue]Hybrid Dev Setup")
     alias = Prompt.ask("Project Alias", default="epyc")
     ip = Prompt.ask("Remote IP")
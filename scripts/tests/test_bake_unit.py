@@ -0,0 +1,138 @@
+"""Unit tests for bake definition helpers."""
+
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from scripts.lib import bake
+
+
+def test_bake_definition_reads_targets(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Run bake --print with the given env and return its target map."""
+    seen: dict[str, object] = {}
+
+    def fake_run(cmd: list[str], **kwargs: object) -> subprocess.CompletedProcess[str]:
+        seen["cmd"] = cmd
+        seen["env"] = kwargs["env"]
+        payload = {"group": {"default": {}}, "target": {"image-noble-stable": {"tags": ["r:t"]}}}
+        return subprocess.CompletedProcess(cmd, 0, stdout=json.dumps(payload), stderr="")
+
+    monkeypatch.setattr(bake.subprocess, "run", fake_run)
+    targets = bake.bake_definition(["default"], env={"CONFIG_HASH": "abc"}, bake_file=Path("b.hcl"))
+    assert targets == {"image-noble-stable": {"tags": ["r:t"]}}
+    assert seen["cmd"] == ["docker", "buildx", "bake", "-f", "b.hcl", "default", "--print"]
+    assert seen["env"] == {"CONFIG_HASH": "abc"}
+
+
+RAWJSON = [
+    (
+        '{"vertexes": [{"digest": "d1", "name": "[image-a builder 1/2] RUN x", '
+        '"started": "2024-05-01T10:00:00.123456789Z"}]}\n'
+    ),
+    "not json\n",
+    (
+        '{"vertexes": [{"digest": "d1", "name": "[image-a builder 1/2] RUN x", '
+        '"started": "2024-05-01T10:00:00.123456789Z", '
+        '"completed": "2024-05-01T10:00:02.123456Z"}]}\n'
+    ),
+    (
+        '{"vertexes": [{"digest": "d2", "name": "[image-b runtime 2/2] COPY y", "cached": true, '
+        '"started": "2024-05-01T10:00:01Z", "completed": "2024-05-01T10:00:01Z"}]}\n'
+    ),
+    (
+        '{"vertexes": [{"digest": "d3", "name": "[internal] load | defs", '
+        '"completed": "2024-05-01T10:00:00Z"}], "statuses": null}\n'
+    ),
+    '{"vertexes": [{"digest": "d4", "name": "pending"}]}\n',
+]
+
+# A failing step: its output, the vertex error and bake's plain-text verdict.
+FAILURE = [
+    (
+        '{"vertexes": [{"digest": "d5", "name": "[image-a builder 2/2] RUN make"}], '
+        '"logs": [{"vertex": "d5", "stream": 2, "data": "bWFrZTogKioqIEVycm9yIDIK"}]}\n'
+    ),
+    '{"logs": [{"vertex": "d5", "data": "not base64!"}]}\n',
+    (
+        '{"vertexes": [{"digest": "d5", "name": "[image-a builder 2/2] RUN make", '
+        '"started": "2024-05-01T10:00:03Z", "completed": "2024-05-01T10:00:04Z", '
+        '"error": "process did not complete successfully: exit code: 2"}]}\n'
+    ),
+    "ERROR: failed to solve: process did not complete successfully: exit code: 2\n",
+]
+
+
+def test_vertex_steps_attribute_targets() -> None:
+    """Completed vertices become steps; prefixes pick the target, else shared or sole."""
+    vertices = bake.merge_vertices(RAWJSON)
+    steps = bake.vertex_steps(vertices, ["image-a", "image-b"])
+    assert steps == [
+        bake.Step("image-a", "[image-a builder 1/2] RUN x", 2.0, cached=False),
+        bake.Step("image-b", "[image-b runtime 2/2] COPY y", 0.0, cached=True),
+        bake.Step("", "[internal] load | defs", 0.0, cached=False),
+    ]
+    assert {s.target for s in bake.vertex_steps(vertices, ["image-b"])} == {"image-b"}
+
+
+def test_summarize_and_render() -> None:
+    """Summaries carry hit ratios, metadata digests and the slowest executed steps."""
+    steps = bake.vertex_steps(bake.merge_vertices(RAWJSON), ["image-a", "image-b"])
+    metadata = {"image-a": {"containerimage.digest": "sha256:a", "buildx.build.ref": "ref-a"}}
+    summary = bake.summarize(steps, metadata, top=1)
+    assert summary["targets"]["image-a"] == {
+        "steps": 1,
+        "cached": 0,
+        "executed_s": 2.0,
+        "cache_hit_ratio": 0.0,
+        "digest": "sha256:a",
+        "build_ref": "ref-a",
+    }
+    assert summary["targets"]["image-b"]["cache_hit_ratio"] == 1.0
+    assert "(shared)" in summary["targets"]
+    assert summary["slowest_steps"] == [
+        {"target": "image-a", "name": "[image-a builder 1/2] RUN x", "duration_s": 2.0},
+    ]
+    markdown = bake.render_markdown(summary)
+    assert "| image-b | 1 | 1 | 100% | 0.0s |" in markdown
+    assert "| `[image-a builder 1/2] RUN x` | image-a | 2.0s |" in markdown
+    assert "Slowest step" not in bake.render_markdown({**summary, "slowest_steps": []})
+
+
+class FakePopen:
+    """Popen stand-in that replays rawjson lines on stderr."""
+
+    def __init__(self, cmd: list[str], **_: object) -> None:
+        """Record the command."""
+        self.cmd = cmd
+        self.stderr = iter([*RAWJSON, *FAILURE])
+
+    def wait(self) -> int:
+        """Exit non-zero to show the code is passed through."""
+        return 3
+
+
+def test_stream_bake_logs_and_reports(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Raw progress is logged verbatim, completions are reported once, errors are echoed."""
+    monkeypatch.setattr(bake.subprocess, "Popen", FakePopen)
+    seen: list[str] = []
+    raw = tmp_path / "out" / "bake.rawjson"
+    code, vertices = bake.stream_bake(["bake"], {}, raw, lambda v: seen.append(v["digest"]))
+    assert code == 3  # noqa: PLR2004
+    assert raw.read_text(encoding="utf-8") == "".join([*RAWJSON, *FAILURE])
+    assert seen == ["d1", "d2", "d3", "d5"]
+    assert set(vertices) == {"d1", "d2", "d3", "d4", "d5"}
+    assert vertices["d5"]["error"].endswith("exit code: 2")
+    assert capsys.readouterr().err == (
+        "not json\n"
+        "make: *** Error 2\n"
+        "ERROR: [image-a builder 2/2] RUN make: "
+        "process did not complete successfully: exit code: 2\n"
+        "ERROR: failed to solve: process did not complete successfully: exit code: 2\n"
+    )
+    assert bake.stream_bake(["bake"], {}, raw)[0] == 3  # noqa: PLR2004
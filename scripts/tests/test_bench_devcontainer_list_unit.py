@@ -0,0 +1,36 @@
+"""Unit tests for the devcontainer listing benchmark helpers."""
+
+import pytest
+
+from scripts import bench_devcontainer_list
+
+
+def test_summarize_reports_slowdown() -> None:
+    """Median, p95 and slowdown relative to the smallest count."""
+    summary = bench_devcontainer_list.summarize({40: [22.0, 24.0, 60.0], 1: [20.0, 19.0, 21.0]})
+    assert list(summary) == [1, 40]
+    assert summary[1] == {"median_ms": 20.0, "p95_ms": 21.0, "slowdown": 1.0}
+    assert summary[40]["median_ms"] == 24.0  # noqa: PLR2004
+    assert summary[40]["slowdown"] == pytest.approx(1.2)
+    assert bench_devcontainer_list.summarize({}) == {}
+    assert bench_devcontainer_list.summarize({1: [0.0]})[1]["slowdown"] == 0.0
+
+
+def test_time_listing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Each sample times one listing of the benchmark label."""
+    labels: list[str] = []
+    monkeypatch.setattr(bench_devcontainer_list, "list_rows", labels.append)
+    samples = bench_devcontainer_list.time_listing("key=value", 3)
+    assert len(samples) == 3  # noqa: PLR2004
+    assert all(sample >= 0 for sample in samples)
+    assert labels == ["key=value"] * 3
+
+
+def test_print_summary(capsys: pytest.CaptureFixture[str]) -> None:
+    """The table lists each count with its slowdown."""
+    bench_devcontainer_list.print_summary(
+        bench_devcontainer_list.summarize({1: [10.0], 40: [12.0]}),
+    )
+    out = capsys.readouterr().out
+    assert "1.20x" in out
+    assert "40" in out
@@ -0,0 +1,33 @@
+"""Unit tests for the entrypoint start-up benchmark."""
+
+import pytest
+
+from scripts import bench_entrypoint
+
+
+def test_summarize_subtracts_direct_baseline() -> None:
+    """Overheads are medians relative to the direct exec, never negative."""
+    samples = {
+        "direct": [1.0, 1.0, 2.0],
+        "entrypoint.sh": [2.0, 3.0, 9.0],
+        "entrypoint.py": [30.0, 40.0, 50.0],
+        "faster": [0.5],
+    }
+    summary = bench_entrypoint.summarize(samples)
+    assert summary["entrypoint.sh"] == {
+        "min_ms": 2.0,
+        "median_ms": 3.0,
+        "p95_ms": 9.0,
+        "overhead_ms": 2.0,
+    }
+    assert summary["entrypoint.py"]["overhead_ms"] == 39.0  # noqa: PLR2004
+    assert summary["faster"]["overhead_ms"] == 0.0
+    assert bench_entrypoint.summarize({"x": [4.0]})["x"]["overhead_ms"] == 4.0  # noqa: PLR2004
+
+
+def test_print_summary(capsys: pytest.CaptureFixture[str]) -> None:
+    """Render one row per path."""
+    bench_entrypoint.print_summary(bench_entrypoint.summarize({"direct": [1.0], "sh": [2.5]}))
+    out = capsys.readouterr().out
+    assert "Entrypoint start-up latency" in out
+    assert "2.50" in out
@@ -0,0 +1,30 @@
+"""Start-up checks for the CLI entry points, measured with -X importtime."""
+
+import pytest
+
+from scripts import bench_startup
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:      3000 |       9000 |     rich.console
+import time:       500 |      12000 | scripts.build
+"""
+
+
+def test_parse_importtime_and_profile() -> None:
+    """Parse importtime rows and flag heavy modules."""
+    times = bench_startup.parse_importtime(SAMPLE)
+    assert times["scripts.build"] == (0.5, 12.0)
+    profile = bench_startup.profile_from("scripts.build", times, top=1)
+    assert profile.cumulative_ms == 12.0  # noqa: PLR2004
+    assert profile.heavy == ["rich.console"]
+    assert profile.top == [("rich.console", 3.0)]
+    assert bench_startup.over_budget(profile, budget_ms=50)
+    assert bench_startup.profile_from("missing", {}).cumulative_ms == 0.0
+
+
+@pytest.mark.parametrize("module", bench_startup.CLI_MODULES)
+def test_cli_imports_no_heavy_modules(module: str) -> None:
+    """No CLI pulls rich onto its start-up path (the ms budget is `pixi run bench-startup`)."""
+    profile = bench_startup.measure(module, runs=1)
+    assert not profile.heavy, f"{module} imports {profile.heavy[:3]} at start-up"
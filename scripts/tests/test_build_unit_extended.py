@@ -1,6 +1,10 @@
 """Additional unit tests for build helpers."""
 
+import argparse
+import json
+import subprocess
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
@@ -46,3 +50,425 @@ def test_calculate_hash(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None
     digest = build.calculate_hash({"focal": "sha256:x", "noble": "sha256:y"})
     expected_length = 12
     assert len(digest) == expected_length
+
+
+def _write(root: Path, files: dict[str, str]) -> None:
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def test_dockerfile_copy_sources(tmp_path: Path) -> None:
+    """Collect context sources from COPY/ADD, skipping stage copies, URLs and flags."""
+    dockerfile = tmp_path / "Dockerfile"
+    dockerfile.write_text(
+        "FROM x AS builder\n"
+        "COPY pixi.toml pixi.lock ./\n"
+        "COPY --from=builder /app/.pixi /app/.pixi\n"
+        "COPY --chmod=755 docker/entrypoint.py \\\n    /app/entrypoint.py\n"
+        'ADD ["conf/a b.ini", "/etc/"]\n'
+        "ADD https://example.com/tool.tgz /opt/\n"
+        'COPY ["broken", \n',
+        encoding="utf-8",
+    )
+    assert build.dockerfile_copy_sources(dockerfile) == [
+        "pixi.toml",
+        "pixi.lock",
+        "docker/entrypoint.py",
+        "conf/a b.ini",
+    ]
+
+
+def test_hash_inputs_expands_globs_and_dirs(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Directories and globs expand to files, honouring .dockerignore."""
+    _write(
+        tmp_path,
+        {
+            "pixi.toml": "t",
+            "docker/Dockerfile": "COPY conf/ /etc/conf\nCOPY *.cfg ./\nCOPY missing.txt /\n",
+            "conf/a.ini": "a",
+            "conf/__pycache__/x.pyc": "junk",
+            "one.cfg": "1",
+            ".dockerignore": "# comment\n__pycache__\n!keep\n",
+        },
+    )
+    monkeypatch.chdir(tmp_path)
+    assert build.hash_inputs() == [
+        Path("conf/a.ini"),
+        Path("docker/Dockerfile"),
+        Path("one.cfg"),
+        Path("pixi.toml"),
+    ]
+
+
+def test_hash_inputs_without_dockerfile(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without a Dockerfile or .dockerignore only the base inputs are hashed."""
+    _write(tmp_path, {"pixi.lock": "l"})
+    monkeypatch.chdir(tmp_path)
+    assert build.hash_inputs() == [Path("pixi.lock")]
+
+
+def test_calculate_hash_tracks_copied_files(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Editing a COPY'd file changes the hash; a digest cache gives the same result."""
+    _write(
+        tmp_path,
+        {
+            "pixi.toml": "t",
+            "docker/Dockerfile": "COPY docker/entrypoint.py /app/entrypoint.py\n",
+            "docker/entrypoint.py": "print('v1')",
+        },
+    )
+    monkeypatch.chdir(tmp_path)
+    digests = {"noble": "sha256:n"}
+    cache = build.FileDigestCache(tmp_path / "digests.json")
+    first = build.calculate_hash(digests)
+    assert build.calculate_hash(digests, cache) == first
+    (tmp_path / "docker/entrypoint.py").write_text("print('v2')", encoding="utf-8")
+    assert build.calculate_hash(digests, cache) != first
+
+
+@pytest.fixture
+def digest_lookups(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> list[str]:
+    """Record get_remote_digest calls; refs containing 'broken' fall back to latest."""
+    monkeypatch.setenv("PIXI_DEVCONTAINER_CACHE", str(tmp_path / "cache"))
+    calls: list[str] = []
+
+    def fake_lookup(image: str) -> str:
+        calls.append(image)
+        return "latest" if "broken" in image else f"sha256:{image.rsplit(':', 1)[-1]}"
+
+    monkeypatch.setattr(build, "get_remote_digest", fake_lookup)
+    return calls
+
+
+def test_resolve_digests_caches_within_ttl(digest_lookups: list[str]) -> None:
+    """Resolved digests are reused until the TTL expires; latest is never cached."""
+    images = {"noble": "ghcr.io/x/pixi:noble", "bad": "ghcr.io/x/broken:1"}
+    first = build.resolve_digests(images)
+    assert first == {"noble": "sha256:noble", "bad": "latest"}
+    assert sorted(digest_lookups) == ["ghcr.io/x/broken:1", "ghcr.io/x/pixi:noble"]
+
+    digest_lookups.clear()
+    assert build.resolve_digests(images) == first
+    assert digest_lookups == ["ghcr.io/x/broken:1"]
+
+    digest_lookups.clear()
+    build.resolve_digests(images, ttl=0)
+    assert sorted(digest_lookups) == ["ghcr.io/x/broken:1", "ghcr.io/x/pixi:noble"]
+
+
+def test_resolve_digests_offline_file_and_mirror(digest_lookups: list[str], tmp_path: Path) -> None:
+    """Offline entries (by ref or key) skip lookups; the rest query the mirror."""
+    digest_file = tmp_path / "digests.json"
+    digest_file.write_text(
+        '{"ghcr.io/x/pixi:focal": "sha256:f", "jammy": "sha256:j"}',
+        encoding="utf-8",
+    )
+    images = {
+        "focal": "ghcr.io/x/pixi:focal",
+        "jammy": "ghcr.io/x/pixi:jammy",
+        "noble": "ghcr.io/x/pixi:noble",
+    }
+    resolved = build.resolve_digests(images, digest_file=digest_file, mirror="localhost:5000/")
+    assert resolved == {"focal": "sha256:f", "jammy": "sha256:j", "noble": "sha256:noble"}
+    assert digest_lookups == ["localhost:5000/x/pixi:noble"]
+    assert build.resolve_digests({"focal": images["focal"]}, digest_file=digest_file) == {
+        "focal": "sha256:f",
+    }
+    assert digest_lookups == ["localhost:5000/x/pixi:noble"]
+
+
+def test_resolve_digests_cache_keeps_mirror_and_upstream_apart(digest_lookups: list[str]) -> None:
+    """A digest resolved through a mirror is cached under the mirror ref only."""
+    images = {"noble": "ghcr.io/x/pixi:noble"}
+    build.resolve_digests(images, mirror="localhost:5000")
+    assert build.resolve_digests(images) == {"noble": "sha256:noble"}
+    assert digest_lookups == ["localhost:5000/x/pixi:noble", "ghcr.io/x/pixi:noble"]
+    digest_lookups.clear()
+    build.resolve_digests(images, mirror="localhost:5000")
+    build.resolve_digests(images)
+    assert digest_lookups == []
+
+
+def test_resolve_digests_strict(digest_lookups: list[str]) -> None:
+    """Strict mode refuses to fall back to latest."""
+    with pytest.raises(build.DigestError, match="bad"):
+        build.resolve_digests({"bad": "ghcr.io/x/broken:1"}, strict=True)
+    assert digest_lookups == ["ghcr.io/x/broken:1"]
+
+
+def test_mirror_ref_passthrough() -> None:
+    """Without a mirror the ref is unchanged."""
+    assert build.mirror_ref("ghcr.io/x/pixi:noble", None) == "ghcr.io/x/pixi:noble"
+
+
+PLAN = {
+    "image-focal-stable": {"tags": ["reg/cpp:focal-stable-h1", "reg/cpp:focal-stable-latest"]},
+    "image-noble-stable": {"tags": ["reg/cpp:noble-stable-h1", "reg/cpp:noble-stable-latest"]},
+    "artifact-noble-stable": {"tags": []},
+}
+
+
+def test_published_targets_checks_hash_tags(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Only targets whose hash tag exists count as published; tagless targets never do."""
+    inspected: list[str] = []
+
+    def fake_run(cmd: list[str], **_: object) -> subprocess.CompletedProcess[str]:
+        inspected.append(cmd[-1])
+        return subprocess.CompletedProcess(cmd, 0 if "noble" in cmd[-1] else 1, "", "")
+
+    monkeypatch.setattr(build.subprocess, "run", fake_run)
+    assert build.published_targets(PLAN, "h1") == {"image-noble-stable"}
+    assert sorted(inspected) == ["reg/cpp:focal-stable-h1", "reg/cpp:noble-stable-h1"]
+    assert build.published_targets({"artifact": {"tags": []}}, "h1") == set()
+
+
+def test_retag_copies_manifest(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Re-tag -latest from the hash tag with imagetools create."""
+    calls: list[list[str]] = []
+
+    def fake_run(cmd: list[str], **_: object) -> subprocess.CompletedProcess[str]:
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(build.subprocess, "run", fake_run)
+    assert build.retag(PLAN["image-noble-stable"], "h1")
+    assert calls == [
+        [
+            "docker",
+            "buildx",
+            "imagetools",
+            "create",
+            "--tag",
+            "reg/cpp:noble-stable-latest",
+            "reg/cpp:noble-stable-h1",
+        ],
+    ]
+    assert build.retag(PLAN["artifact-noble-stable"], "h1")
+    assert build.retag({"tags": ["reg/cpp:x-h1"]}, "h1")
+    assert len(calls) == 1
+
+
+def test_split_and_select_targets() -> None:
+    """Parse BUILD_TARGETS, validate against the plan and default per mode."""
+    requested = build.split_targets(" image-noble-stable,artifact-noble-stable  image-noble-stable")
+    assert build.select_targets(requested, PLAN, push=True) == [
+        "image-noble-stable",
+        "artifact-noble-stable",
+    ]
+    assert build.select_targets([], PLAN, push=True) == list(PLAN)
+    assert build.select_targets([], PLAN, push=False) == [
+        "image-focal-stable",
+        "image-noble-stable",
+    ]
+    with pytest.raises(build.TargetError, match="image-jammy-stable"):
+        build.select_targets(["image-jammy-stable"], PLAN, push=True)
+
+
+def test_group_and_invocations() -> None:
+    """Targets of one variant share an invocation; local builds load tagged images."""
+    groups = build.group_independent(
+        ["image-focal-stable", "image-noble-stable", "artifact-noble-stable", "solo"],
+    )
+    assert groups == [
+        ["image-focal-stable"],
+        ["image-noble-stable", "artifact-noble-stable"],
+        ["solo"],
+    ]
+    plan = {**PLAN, "solo": {}}
+    assert build.bake_invocations(groups[1:], plan, push=True) == [
+        ["image-noble-stable", "artifact-noble-stable", "--push"],
+        ["solo", "--push"],
+    ]
+    assert build.bake_invocations(groups[1:2], plan, push=False) == [
+        [
+            "image-noble-stable",
+            "artifact-noble-stable",
+            "--set",
+            "*.platforms=linux/amd64",
+            "--set",
+            "image-noble-stable.output=type=docker",
+        ],
+    ]
+
+
+def test_run_bakes_reports_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Each invocation runs; parallel runs use plain progress; any failure fails the batch."""
+    calls: list[list[str]] = []
+
+    def fake_run(cmd: list[str], **_: object) -> subprocess.CompletedProcess[str]:
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 1 if "bad" in cmd else 0)
+
+    monkeypatch.setattr(build.subprocess, "run", fake_run)
+    assert build.run_bakes([["a"]], {})
+    assert calls == [[*build.bake_command(), "a"]]
+    calls.clear()
+    assert not build.run_bakes([["a"], ["bad"]], {}, jobs=4)
+    assert sorted(calls) == [
+        [*build.bake_command(), "a", "--progress=plain"],
+        [*build.bake_command(), "bad", "--progress=plain"],
+    ]
+
+
+def test_skip_published(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Published targets are re-tagged and dropped from the bake list."""
+    monkeypatch.setattr(build, "published_targets", lambda targets, _: set(targets) & {"a", "b"})
+    retags = iter([True, False])
+    monkeypatch.setattr(build, "retag", lambda *_: next(retags))
+    plan = {"a": {"tags": []}, "b": {"tags": []}, "c": {"tags": []}}
+    assert build.skip_published(plan, ["a", "b", "c"], "h1") == ["c"]
+
+
+def test_run_bakes_collects_telemetry(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """With a telemetry dir, bakes stream rawjson and the summary is published."""
+    step_summary = tmp_path / "step-summary.md"
+    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(step_summary))
+    telemetry = tmp_path / "telemetry"
+    telemetry.mkdir()
+    (telemetry / "bake-9.metadata.json").write_text("{}", encoding="utf-8")
+    commands: list[list[str]] = []
+
+    def fake_stream(
+        cmd: list[str],
+        _env: dict[str, str],
+        raw: Path,
+        on_step: object,
+    ) -> tuple[int, dict[str, dict]]:
+        commands.append(cmd)
+        build.print_step({"name": "[x] RUN y", "cached": True})
+        assert callable(on_step)
+        metadata = Path(cmd[cmd.index("--metadata-file") + 1])
+        body = '{"image-a": {"containerimage.digest": "sha256:a"}}' if "image-a" in cmd else "{bad"
+        metadata.write_text(body, encoding="utf-8")
+        raw.write_text("", encoding="utf-8")
+        vertex = {
+            "name": f"[{cmd[5]} builder 1/1] RUN x",
+            "started": "2024-05-01T10:00:00Z",
+            "completed": "2024-05-01T10:00:04Z",
+        }
+        return 0, {"d": vertex}
+
+    monkeypatch.setattr(build, "stream_bake", fake_stream)
+    assert build.run_bakes([["image-a", "--push"], ["image-b", "--push"]], {}, 2, telemetry)
+    assert all("--progress=rawjson" in cmd for cmd in commands)
+    assert not (telemetry / "bake-9.metadata.json").exists()
+    summary = json.loads((telemetry / "summary.json").read_text(encoding="utf-8"))
+    assert summary["targets"]["image-a"]["digest"] == "sha256:a"
+    assert summary["targets"]["image-b"]["executed_s"] == 4.0  # noqa: PLR2004
+    assert "### Bake telemetry" in step_summary.read_text(encoding="utf-8")
+
+
+def test_print_step_marks_failed_vertices(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Vertices carrying an error are shown as ERROR, never as DONE."""
+    printed: list[tuple[str, object]] = []
+    monkeypatch.setattr(
+        build,
+        "console",
+        SimpleNamespace(print=lambda text, **kw: printed.append((text, kw["style"]))),
+    )
+    build.print_step({"name": "RUN make", "error": "exit code: 2"})
+    build.print_step({"name": "RUN ok"})
+    assert printed == [("  ERROR  RUN make", "red"), ("  DONE   RUN ok", None)]
+
+
+def test_default_telemetry_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Prefer the explicit env, then the CI artifacts dir, then the user cache."""
+    monkeypatch.setenv("PIXI_DEVCONTAINER_CACHE", str(tmp_path))
+    monkeypatch.delenv("BUILD_TELEMETRY_DIR", raising=False)
+    monkeypatch.delenv("ARTIFACTS_DIR", raising=False)
+    assert build.default_telemetry_dir() == tmp_path / "build" / "telemetry"
+    monkeypatch.setenv("ARTIFACTS_DIR", "/art")
+    assert build.default_telemetry_dir() == Path("/art/telemetry")
+    monkeypatch.setenv("BUILD_TELEMETRY_DIR", "/tel")
+    assert build.default_telemetry_dir() == Path("/tel")
+
+
+def test_publish_telemetry_outside_actions(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Outside GitHub Actions only summary.json is written."""
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    assert build.publish_telemetry(tmp_path, []) == {"targets": {}, "slowest_steps": []}
+    assert (tmp_path / "summary.json").is_file()
+
+
+def test_bake_invocations_apply_overrides() -> None:
+    """Per-target overrides land in the invocation that builds the target."""
+    overrides = {"image-noble-stable": ["--set", "image-noble-stable.cache-from=x"]}
+    invocations = build.bake_invocations(
+        [["image-focal-stable"], ["image-noble-stable"]],
+        PLAN,
+        push=True,
+        overrides=overrides,
+    )
+    assert invocations == [
+        ["image-focal-stable", "--push"],
+        ["image-noble-stable", "--push", "--set", "image-noble-stable.cache-from=x"],
+    ]
+
+
+def test_layer_snapshot_and_delta(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Snapshot -latest before baking, then report what the new hash tag adds."""
+    layers = {
+        "reg/cpp:noble-stable-latest": [{"digest": "sha256:tool", "size": 3 * 1024**2}],
+        "reg/cpp:noble-stable-h1": [
+            {"digest": "sha256:tool", "size": 3 * 1024**2},
+            {"digest": "sha256:rest", "size": 1024**2},
+        ],
+    }
+    monkeypatch.setattr(build, "manifest_layers", layers.get)
+    plan = {**PLAN, "single": {"tags": ["reg/cpp:single-h1"]}}
+    previous = build.snapshot_layers(plan, list(plan), "h1")
+    assert previous == {
+        "image-focal-stable": None,
+        "image-noble-stable": layers["reg/cpp:noble-stable-latest"],
+    }
+    assert build.snapshot_layers(plan, ["artifact-noble-stable"], "h1") == {}
+
+    deltas = build.report_layer_deltas(plan, previous, "h1", tmp_path)
+    assert list(deltas) == ["image-noble-stable"]
+    assert deltas["image-noble-stable"]["new_bytes"] == 1024**2
+    saved = json.loads((tmp_path / "layer-delta.json").read_text(encoding="utf-8"))
+    assert saved == deltas
+    assert build.report_layer_deltas(plan, {}, "h1", tmp_path) == {}
+
+
+@pytest.mark.parametrize(
+    ("backend", "driver", "expected"),
+    [
+        ("local", "docker", {}),
+        ("local", "docker-container", {"image-a": 4}),
+        ("registry", "docker", {"image-a": 2}),
+        ("gha", None, {}),
+    ],
+)
+def test_cache_overrides_follow_builder_driver(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    backend: str,
+    driver: str | None,
+    expected: dict[str, int],
+) -> None:
+    """A docker driver builder gets no cache-to, which it would reject; gha is not inspected."""
+    inspected: list[bool] = []
+
+    def builder_driver() -> str | None:
+        inspected.append(True)
+        return driver
+
+    monkeypatch.setattr(build.buildkit_cache, "builder_driver", builder_driver)
+    args = argparse.Namespace(cache_backend=backend, cache_dir=tmp_path, cache_registry="reg/cache")
+    overrides = build.cache_overrides(["image-a"], args)
+    assert {name: len(sets) for name, sets in overrides.items()} == expected
+    exports = any("cache-to" in arg for sets in overrides.values() for arg in sets)
+    assert exports is (driver == "docker-container")
+    assert inspected == ([] if backend == "gha" else [True])
@@ -0,0 +1,119 @@
+"""Unit tests for BuildKit cache backend selection and pruning."""
+
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from scripts.lib import buildkit_cache
+
+
+def test_select_backend() -> None:
+    """Explicit choice wins, then Actions, then a configured registry, then local."""
+    assert (
+        buildkit_cache.select_backend({"BUILD_CACHE_BACKEND": "local", "GITHUB_ACTIONS": "true"})
+        == "local"
+    )
+    assert (
+        buildkit_cache.select_backend({"BUILD_CACHE_BACKEND": "bogus", "GITHUB_ACTIONS": "true"})
+        == "gha"
+    )
+    assert buildkit_cache.select_backend({"BUILD_CACHE_REGISTRY": "localhost:5000/c"}) == "registry"
+    assert buildkit_cache.select_backend({}) == "local"
+
+
+def test_cache_overrides_per_backend(tmp_path: Path) -> None:
+    """Local caches are per target, registry ones per variant; gha needs no overrides."""
+    targets = ["image-noble-stable", "artifact-noble-stable"]
+    local = buildkit_cache.cache_overrides(targets, "local", cache_dir=tmp_path)
+    location = tmp_path / "artifact-noble-stable"
+    assert local["artifact-noble-stable"] == [
+        "--set",
+        f"artifact-noble-stable.cache-from=type=local,src={location}",
+        "--set",
+        f"artifact-noble-stable.cache-to=type=local,dest={location},mode=max",
+    ]
+    assert f"dest={tmp_path / 'image-noble-stable'}," in local["image-noble-stable"][3]
+    registry = buildkit_cache.cache_overrides(
+        ["image-noble-stable"],
+        "registry",
+        cache_dir=tmp_path,
+        registry="localhost:5000/cache",
+    )
+    assert registry["image-noble-stable"][1] == (
+        "image-noble-stable.cache-from=type=registry,ref=localhost:5000/cache:build-noble-stable"
+    )
+    assert buildkit_cache.cache_overrides(targets, "gha", cache_dir=tmp_path) == {}
+    assert buildkit_cache.cache_overrides(targets, "registry", cache_dir=tmp_path) == {}
+    assert buildkit_cache.cache_scope("solo") == "build-solo"
+
+
+def test_cache_overrides_without_export(tmp_path: Path) -> None:
+    """On the docker driver nothing is exported; registry caches are still imported."""
+    targets = ["image-noble-stable"]
+    local = buildkit_cache.cache_overrides(targets, "local", cache_dir=tmp_path, export=False)
+    assert local == {}
+    registry = buildkit_cache.cache_overrides(
+        targets,
+        "registry",
+        cache_dir=tmp_path,
+        registry="localhost:5000/cache",
+        export=False,
+    )
+    assert registry == {
+        "image-noble-stable": [
+            "--set",
+            "image-noble-stable.cache-from=type=registry,ref=localhost:5000/cache:build-noble-stable",
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    ("returncode", "stdout", "driver"),
+    [
+        (0, "Name:          default\nDriver:        docker\n\nNodes:\n", "docker"),
+        (0, "Name:   ci\nDriver: docker-container\n", "docker-container"),
+        (0, "Name: odd\n", None),
+        (1, "", None),
+    ],
+)
+def test_builder_driver(
+    monkeypatch: pytest.MonkeyPatch,
+    returncode: int,
+    stdout: str,
+    driver: str | None,
+) -> None:
+    """The driver comes from ``docker buildx inspect``; only ``docker`` blocks exports."""
+
+    def fake_run(cmd: list[str], **_kwargs: object) -> subprocess.CompletedProcess[str]:
+        assert cmd == ["docker", "buildx", "inspect"]
+        return subprocess.CompletedProcess(cmd, returncode, stdout, "")
+
+    monkeypatch.setattr(buildkit_cache.subprocess, "run", fake_run)
+    assert buildkit_cache.builder_driver() == driver
+    assert buildkit_cache.can_export(driver) is (driver != "docker")
+
+
+def _scope(root: Path, name: str, size: int, mtime: int, *, index: bool = True) -> Path:
+    path = root / name / "blobs"
+    path.mkdir(parents=True)
+    (path / "blob").write_bytes(b"x" * size)
+    marker = root / name / "index.json" if index else root / name
+    if index:
+        marker.write_text("{}", encoding="utf-8")
+    os.utime(marker, (mtime, mtime))
+    return root / name
+
+
+def test_prune_drops_least_recently_exported(tmp_path: Path) -> None:
+    """Oldest scopes go first until the directory fits; missing dirs are a no-op."""
+    old = _scope(tmp_path, "build-focal-stable", 600, 1_000)
+    bare = _scope(tmp_path, "build-jammy-stable", 600, 2_000, index=False)
+    new = _scope(tmp_path, "build-noble-stable", 600, 3_000)
+    (tmp_path / "stray.txt").write_text("ignored", encoding="utf-8")
+    assert buildkit_cache.prune(tmp_path, max_bytes=700) == [old, bare]
+    assert new.is_dir()
+    assert buildkit_cache.prune(tmp_path, max_bytes=700) == []
+    assert buildkit_cache.prune(tmp_path, max_bytes=0) == [new]
+    assert buildkit_cache.prune(tmp_path / "missing") == []
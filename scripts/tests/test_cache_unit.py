@@ -0,0 +1,112 @@
+"""Unit tests for the shared on-disk caches."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from scripts.lib import cache
+
+
+def test_user_cache_dir_override(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Explicit override wins over XDG and home."""
+    monkeypatch.setenv(cache.CACHE_HOME_ENV, str(tmp_path))
+    assert cache.user_cache_dir("a", "b") == tmp_path / "a" / "b"
+
+
+def test_user_cache_dir_xdg(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Fall back to $XDG_CACHE_HOME/pixi-devcontainer."""
+    monkeypatch.delenv(cache.CACHE_HOME_ENV, raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert cache.user_cache_dir() == tmp_path / "pixi-devcontainer"
+
+
+def test_user_cache_dir_home(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Default to ~/.cache/pixi-devcontainer."""
+    monkeypatch.delenv(cache.CACHE_HOME_ENV, raising=False)
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    monkeypatch.setattr(cache.Path, "home", lambda: tmp_path)
+    assert cache.user_cache_dir("x") == tmp_path / ".cache" / "pixi-devcontainer" / "x"
+
+
+def test_key_tracks_inputs(tmp_path: Path) -> None:
+    """Key changes with file content, tool version and command."""
+    src = tmp_path / "a.py"
+    src.write_text("one", encoding="utf-8")
+    missing = tmp_path / "gone.py"
+    first = cache.ResultCache.key(["ruff"], "1.0", [src, missing])
+    assert first == cache.ResultCache.key(["ruff"], "1.0", [missing, src])
+    assert first != cache.ResultCache.key(["ruff"], "1.1", [src, missing])
+    assert first != cache.ResultCache.key(["ruff", "."], "1.0", [src, missing])
+    src.write_text("two", encoding="utf-8")
+    assert first != cache.ResultCache.key(["ruff"], "1.0", [src, missing])
+
+
+def test_put_get_clear(tmp_path: Path) -> None:
+    """Stored results replay until cleared."""
+    store = cache.ResultCache(tmp_path / "results")
+    assert store.get("k") is None
+    store.put("k", cache.CachedResult(success=False, output="boom"))
+    assert store.get("k") == cache.CachedResult(success=False, output="boom")
+    assert store.clear() == 1
+    assert store.get("k") is None
+
+
+def test_evict_drops_least_recently_used(tmp_path: Path) -> None:
+    """Eviction keeps the most recently used entries within the size cap."""
+    store = cache.ResultCache(tmp_path, max_bytes=10**6)
+    for index, key in enumerate(["old", "mid", "new"]):
+        store.put(key, cache.CachedResult(success=True, output="x" * 100))
+        os.utime(tmp_path / f"{key}.json", (index, index))
+    store.get("old")
+    assert store.evict() == 0
+    store.max_bytes = sum((tmp_path / f"{key}.json").stat().st_size for key in ["old", "new"])
+    assert store.evict() == 1
+    assert store.get("mid") is None
+    assert store.get("old") is not None
+    assert store.get("new") is not None
+
+
+def test_evict_empty_cache(tmp_path: Path) -> None:
+    """Evicting a missing cache directory is a no-op."""
+    assert cache.ResultCache(tmp_path / "absent", max_bytes=0).evict() == 0
+
+
+def test_file_digest_cache_reuses_unchanged_files(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Digests persist across instances and are recomputed only when size/mtime change."""
+    src = tmp_path / "pixi.lock"
+    src.write_text("lock", encoding="utf-8")
+    os.utime(src, (1_000_000, 1_000_000))
+    store = tmp_path / "digests.json"
+
+    first = cache.FileDigestCache(store)
+    expected = cache.hash_file(src)
+    assert first.digest(src) == expected
+    first.save()
+    first.save()  # clean: no rewrite needed
+
+    calls: list[Path] = []
+    monkeypatch.setattr(cache, "hash_file", lambda p: calls.append(p) or "rehashed")
+    second = cache.FileDigestCache(store)
+    assert second.digest(src) == expected
+    assert calls == []
+
+    src.write_text("lock-changed", encoding="utf-8")
+    os.utime(src, (1_000_100, 1_000_100))
+    assert second.digest(src) == "rehashed"
+    assert calls == [src]
+
+
+def test_file_digest_cache_skips_racy_files(tmp_path: Path) -> None:
+    """Files modified just now are hashed but not memoised; corrupt stores start empty."""
+    store = tmp_path / "digests.json"
+    store.write_text("{not json", encoding="utf-8")
+    src = tmp_path / "fresh.txt"
+    src.write_text("x", encoding="utf-8")
+    digests = cache.FileDigestCache(store)
+    assert digests.digest(src) == cache.hash_file(src)
+    assert digests.entries == {}
+    assert not digests.dirty
@@ -0,0 +1,17 @@
+"""Unit tests for the lazily constructed console."""
+
+import io
+
+from scripts.lib.console import LazyConsole
+
+
+def test_console_builds_on_first_use() -> None:
+    """Nothing is constructed until an attribute is used; writes are forwarded."""
+    console = LazyConsole(width=40)
+    assert not console.loaded
+    buffer = io.StringIO()
+    console.file = buffer
+    assert console.loaded
+    console.print("hello")
+    assert buffer.getvalue() == "hello\n"
+    assert console.width == 40  # noqa: PLR2004
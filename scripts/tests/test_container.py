@@ -40,6 +40,21 @@ def test_entrypoint_exists(host: testinfra.host.Host) -> None:
     assert entrypoint.exists
 
 
+def test_shell_entrypoint_exists(host: testinfra.host.Host) -> None:
+    """Verify the zero-parse entrypoint and its pre-rendered environment exist."""
+    assert host.file("/app/entrypoint.sh").mode & 0o111
+    env_sh = host.file("/app/pixi_env.sh")
+    assert env_sh.exists
+    assert env_sh.size > 0
+
+
+def test_shell_entrypoint_loads_env(host: testinfra.host.Host) -> None:
+    """Verify entrypoint.sh puts the pixi environment on PATH without Python."""
+    cmd = host.run("/app/entrypoint.sh cmake --version")
+    assert cmd.rc == 0
+    assert "cmake version" in cmd.stdout.lower()
+
+
 def test_environment_pack_exists(host: testinfra.host.Host) -> None:
     """Verify the pixi-pack tarball was generated."""
     pack = host.file("/app/environment.tar.gz")
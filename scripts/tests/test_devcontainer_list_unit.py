@@ -0,0 +1,365 @@
+"""Unit tests for the devcontainer listing."""
+
+from __future__ import annotations
+
+import io
+import json
+import subprocess
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+
+from scripts import devcontainer_list
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+def container(n: int) -> dict:
+    """Return ``docker inspect`` output for one fake devcontainer."""
+    return {
+        "Name": f"/dev{n}",
+        "State": {"Status": "running"},
+        "Config": {"User": "vscode"},
+        "NetworkSettings": {
+            "Ports": {"22/tcp": [{"HostIp": "127.0.0.1", "HostPort": str(2200 + n)}]},
+        },
+    }
+
+
+def fake_docker(monkeypatch: pytest.MonkeyPatch, count: int, missing: int = 0) -> list[list[str]]:
+    """Pretend ``count`` devcontainers exist; ``missing`` of them vanish before inspect."""
+    calls: list[list[str]] = []
+
+    def check_output(cmd: list[str], **_kwargs: object) -> str:
+        calls.append(cmd)
+        return "".join(f'"id{n}"\n' for n in range(count)) + "\n"
+
+    def run(cmd: list[str], **_kwargs: object) -> SimpleNamespace:
+        calls.append(cmd)
+        found = [container(int(cid[2:])) for cid in cmd[2:]][missing:]
+        return SimpleNamespace(returncode=1 if missing else 0, stdout=json.dumps(found))
+
+    monkeypatch.setattr(devcontainer_list.subprocess, "check_output", check_output)
+    monkeypatch.setattr(devcontainer_list.subprocess, "run", run)
+    return calls
+
+
+@pytest.mark.parametrize("count", [1, 10, 40])
+def test_listing_uses_two_docker_calls(monkeypatch: pytest.MonkeyPatch, count: int) -> None:
+    """One ``docker ps`` plus one multi-id ``docker inspect``, whatever the count."""
+    calls = fake_docker(monkeypatch, count)
+    rows = devcontainer_list.list_rows()
+    assert len(rows) == count
+    assert rows[0] == "dev0\trunning\tvscode\t127.0.0.1:2200->22/tcp"
+    assert len(calls) == 2  # noqa: PLR2004
+    assert calls[0][-3:] == ["label=devcontainer.local_folder", "--format", "{{json .ID}}"]
+    assert calls[1][1:] == ["inspect", *(f"id{n}" for n in range(count))]
+
+
+def test_inspect_keeps_containers_that_still_exist(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A container removed between ps and inspect does not hide the others."""
+    fake_docker(monkeypatch, 3, missing=1)
+    assert [row.split("\t")[0] for row in devcontainer_list.list_rows()] == ["dev1", "dev2"]
+
+
+def test_inspect_edge_cases(monkeypatch: pytest.MonkeyPatch) -> None:
+    """No ids means no docker call; unparsable output yields nothing."""
+    calls: list[list[str]] = []
+
+    def run(cmd: list[str], **_kwargs: object) -> SimpleNamespace:
+        calls.append(cmd)
+        return SimpleNamespace(returncode=1, stdout="Error: no such object")
+
+    monkeypatch.setattr(devcontainer_list.subprocess, "run", run)
+    assert devcontainer_list.inspect_containers([]) == []
+    assert calls == []
+    assert devcontainer_list.inspect_containers(["gone"]) == []
+
+
+def test_container_row_defaults() -> None:
+    """Missing fields render as placeholders."""
+    assert devcontainer_list.container_row({}) == "\tunknown\tn/a\tn/a"
+    assert devcontainer_list.render_ports({"22/tcp": None}) == "n/a"
+
+
+def test_main_lists_rows(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Main prints a header and one row per devcontainer."""
+    monkeypatch.setattr(devcontainer_list.shutil, "which", lambda _name: "/usr/bin/docker")
+    fake_docker(monkeypatch, 2)
+    devcontainer_list.main([])
+    out = capsys.readouterr().out.splitlines()
+    assert out[1] == "name\tstatus\tuser\tports"
+    assert out[2].startswith("dev0\t")
+    assert len(out) == 4  # noqa: PLR2004
+
+
+def test_main_without_containers(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Main reports when nothing matches."""
+    monkeypatch.setattr(devcontainer_list.shutil, "which", lambda _name: "/usr/bin/docker")
+    fake_docker(monkeypatch, 0)
+    devcontainer_list.main([])
+    assert "No devcontainer containers found" in capsys.readouterr().out
+    devcontainer_list.main(["--json"])
+    assert json.loads(capsys.readouterr().out) == []
+
+
+def test_main_without_docker(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Main exits when docker is missing."""
+    monkeypatch.setattr(devcontainer_list.shutil, "which", lambda _name: None)
+    with pytest.raises(SystemExit):
+        devcontainer_list.main([])
+
+
+def test_get_ids_propagates_docker_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failing ``docker ps`` is not swallowed."""
+
+    def check_output(cmd: list[str], **_kwargs: object) -> str:
+        raise subprocess.CalledProcessError(1, cmd)
+
+    monkeypatch.setattr(devcontainer_list.subprocess, "check_output", check_output)
+    with pytest.raises(subprocess.CalledProcessError):
+        devcontainer_list.get_devcontainer_ids()
+
+
+STATS = {
+    "ID": "abc123def456",
+    "Container": "abc123def456",
+    "CPUPerc": "153.20%",
+    "MemUsage": "2.1GiB / 15.5GiB",
+    "MemPerc": "13.55%",
+    "BlockIO": "1.2GB / 350MB",
+}
+NOW = datetime(2026, 1, 2, 3, 4, 5, tzinfo=UTC)
+
+
+def stats_entry() -> dict:
+    """Return an inspected running devcontainer with an 8g shm."""
+    return {
+        **container(0),
+        "Id": "abc123def456" + "0" * 52,
+        "State": {
+            "Status": "running",
+            "Running": True,
+            "StartedAt": "2026-01-02T01:00:00.123456789Z",
+        },
+        "HostConfig": {"ShmSize": 8 * 1024**3},
+    }
+
+
+def test_container_record_with_stats() -> None:
+    """Stats columns are matched by id prefix and formatted compactly."""
+    record = devcontainer_list.container_record(stats_entry(), [{"ID": "zzz"}, STATS], NOW)
+    assert record == {
+        "name": "dev0",
+        "status": "running",
+        "user": "vscode",
+        "ports": "127.0.0.1:2200->22/tcp",
+        "cpu": "153.20%",
+        "memory": "2.1GiB / 15.5GiB (13.55%)",
+        "block_io": "1.2GB / 350MB",
+        "uptime": "2h04m",
+        "shm": "8GiB",
+    }
+
+
+def test_container_record_without_matching_stats() -> None:
+    """Containers missing from the stats frame get placeholders."""
+    entry = container(1) | {"State": {"Status": "exited", "Running": False}}
+    record = devcontainer_list.container_record(entry, [STATS], NOW)
+    assert [record[key] for key in devcontainer_list.STATS_COLUMNS] == ["-"] * 5
+
+
+@pytest.mark.parametrize(
+    ("started", "expected"),
+    [
+        ("2026-01-02T03:00:05Z", "4m"),
+        ("2025-12-30T01:00:00Z", "3d2h"),
+        ("2026-01-02T04:00:00Z", "0m"),
+    ],
+)
+def test_uptime(started: str, expected: str) -> None:
+    """Uptime is rendered at the coarsest useful precision."""
+    assert devcontainer_list.uptime({"Running": True, "StartedAt": started}, NOW) == expected
+
+
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [(512, "512B"), (1536, "1.5KiB"), (64 * 1024**2, "64MiB"), (3 * 1024**4, "3.0TiB")],
+)
+def test_human_bytes(size: int, expected: str) -> None:
+    """Byte counts use binary units."""
+    assert devcontainer_list.human_bytes(size) == expected
+
+
+def test_stats_frames_split_on_refresh() -> None:
+    """Streamed lines are grouped per refresh, by screen clear or a repeated container."""
+    line = json.dumps(STATS)
+    other = json.dumps(STATS | {"ID": "fff"})
+    lines = [
+        f"\x1b[2J\x1b[H{line}",
+        other,
+        f"\x1b[2J\x1b[H{line}",
+        "not json",
+        other,
+        line,
+        "",
+    ]
+    frames = list(devcontainer_list.stats_frames(lines))
+    assert [[s["ID"] for s in frame] for frame in frames] == [
+        ["abc123def456", "fff"],
+        ["abc123def456", "fff"],
+        ["abc123def456"],
+    ]
+    assert list(devcontainer_list.stats_frames([])) == []
+
+
+def test_snapshot_stats_is_one_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    """All containers are sampled by a single ``docker stats --no-stream``."""
+    calls: list[list[str]] = []
+
+    def run(cmd: list[str], **_kwargs: object) -> SimpleNamespace:
+        calls.append(cmd)
+        return SimpleNamespace(returncode=0, stdout=json.dumps(STATS) + "\n\n")
+
+    monkeypatch.setattr(devcontainer_list.subprocess, "run", run)
+    assert devcontainer_list.snapshot_stats(["a", "b"]) == [STATS]
+    assert devcontainer_list.snapshot_stats([]) == []
+    assert calls == [
+        [devcontainer_list.DOCKER, "stats", "--no-stream", "--format", "{{json .}}", "a", "b"],
+    ]
+    assert "--no-stream" not in devcontainer_list.stats_command(["a"], stream=True)
+
+
+def test_main_stats_json(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """--stats --json prints one array with the stats columns."""
+    monkeypatch.setattr(devcontainer_list.shutil, "which", lambda _name: "/usr/bin/docker")
+    monkeypatch.setattr(devcontainer_list, "get_devcontainer_ids", lambda: ["abc"])
+    monkeypatch.setattr(devcontainer_list, "inspect_containers", lambda _ids: [stats_entry()])
+    monkeypatch.setattr(devcontainer_list, "snapshot_stats", lambda _ids: [STATS])
+    devcontainer_list.main(["--stats", "--json"])
+    records = json.loads(capsys.readouterr().out)
+    assert records[0]["cpu"] == "153.20%"
+    assert records[0]["shm"] == "8GiB"
+
+
+def test_emit_watch_frames(capsys: pytest.CaptureFixture[str]) -> None:
+    """Watch frames redraw in place on a terminal and are JSON lines otherwise."""
+    record = devcontainer_list.container_record(stats_entry(), [STATS], NOW)
+
+    class Terminal(io.StringIO):
+        def isatty(self) -> bool:
+            return True
+
+    screen = Terminal()
+    devcontainer_list.emit([record], devcontainer_list.parse_args(["--watch"]), screen)
+    text = screen.getvalue()
+    assert text.startswith(devcontainer_list.CLEAR_SCREEN)
+    assert "\tcpu\tmemory\tblock_io\tuptime\tshm" in text
+    piped = io.StringIO()
+    devcontainer_list.emit([record], devcontainer_list.parse_args(["--watch", "--json"]), piped)
+    assert json.loads(piped.getvalue().splitlines()[0])[0]["uptime"] == "2h04m"
+    plain = io.StringIO()
+    devcontainer_list.emit([record], devcontainer_list.parse_args(["--watch"]), plain)
+    assert not plain.getvalue().startswith(devcontainer_list.CLEAR_SCREEN)
+    assert capsys.readouterr().out == ""
+
+
+def test_container_states_and_refresh(monkeypatch: pytest.MonkeyPatch) -> None:
+    """One labelled ``docker ps`` gives the current state; vanished containers drop out."""
+    calls: list[list[str]] = []
+
+    def check_output(cmd: list[str], **_kwargs: object) -> str:
+        calls.append(cmd)
+        return "abc123def456 exited\n\n"
+
+    monkeypatch.setattr(devcontainer_list.subprocess, "check_output", check_output)
+    states = devcontainer_list.container_states()
+    assert states == {"abc123def456": "exited"}
+    assert calls[0][2:] == [
+        "-a",
+        "--filter",
+        "label=devcontainer.local_folder",
+        "--format",
+        "{{.ID}} {{.State}}",
+    ]
+    gone = {**container(1), "Id": "fff" + "0" * 61}
+    fresh = devcontainer_list.refresh_entries([stats_entry(), gone], states)
+    assert [entry["State"]["Status"] for entry in fresh] == ["exited"]
+    assert devcontainer_list.container_record(fresh[0], [STATS], NOW)["uptime"] == "-"
+
+
+def test_watch_records_follow_docker_ps(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Every frame re-reads the states; a new container restarts the stream, none ends it."""
+    first = stats_entry()
+    second = {**stats_entry(), "Name": "/dev1", "Id": "def456abc123" + "0" * 52}
+    ticks = iter(
+        [
+            {"abc123def456": "running"},
+            {"abc123def456": "paused"},
+            {"abc123def456": "paused", "def456abc123": "running"},
+            {"def456abc123": "running"},
+            {},
+        ],
+    )
+    streams: list[list[str]] = []
+
+    def stream(ids: list[str]) -> Iterator[list[dict]]:
+        streams.append(ids)
+        while True:
+            yield [STATS]
+
+    monkeypatch.setattr(devcontainer_list, "container_states", lambda _label: next(ticks))
+    monkeypatch.setattr(
+        devcontainer_list,
+        "inspect_containers",
+        lambda ids: [entry for entry in (first, second) if entry["Id"][:12] in ids],
+    )
+    frames = list(devcontainer_list.watch_records([first], stream=stream))
+    assert [[r["status"] for r in records] for records in frames] == [
+        ["running"],
+        ["paused"],
+        ["paused"],
+        ["running"],
+    ]
+    assert frames[3][0]["name"] == "dev1"
+    assert streams == [[first["Id"]], [first["Id"], second["Id"]], [second["Id"]]]
+
+
+def test_main_watch_json_without_containers(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """With nothing matching, --watch --json prints nothing and never streams stats."""
+    monkeypatch.setattr(devcontainer_list.shutil, "which", lambda _name: "/usr/bin/docker")
+    calls = fake_docker(monkeypatch, 0)
+    devcontainer_list.main(["--watch", "--json"])
+    assert capsys.readouterr().out == ""
+    assert [cmd[1] for cmd in calls] == ["ps"]
+
+
+def test_main_watch_streams_frames(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """--watch --json prints one JSON line per frame until the stream ends."""
+    monkeypatch.setattr(devcontainer_list.shutil, "which", lambda _name: "/usr/bin/docker")
+    monkeypatch.setattr(devcontainer_list, "get_devcontainer_ids", lambda: ["abc"])
+    monkeypatch.setattr(devcontainer_list, "inspect_containers", lambda _ids: [stats_entry()])
+    monkeypatch.setattr(devcontainer_list, "container_states", lambda _label: {"abc123": "running"})
+    monkeypatch.setattr(devcontainer_list, "stream_stats", lambda _ids: iter([[STATS], [STATS]]))
+    devcontainer_list.main(["--watch", "--json"])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2  # noqa: PLR2004
+    assert json.loads(lines[0])[0]["cpu"] == "153.20%"
@@ -0,0 +1,123 @@
+"""Unit tests for the GitHub Actions history CLI helpers."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from scripts import gha_history
+from scripts.lib.run_history import RunHistory
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def fake_pages(monkeypatch: pytest.MonkeyPatch, pages: dict[str, list[dict]]) -> list[tuple]:
+    """Serve ``pages[path][page - 1]`` from ``api_get`` and record each call."""
+    calls: list[tuple] = []
+
+    def get(path: str, _token: str, params: dict[str, str]) -> dict:
+        calls.append((path, params))
+        page = int(params["page"]) - 1
+        return pages[path][page] if page < len(pages[path]) else {}
+
+    monkeypatch.setattr(gha_history, "api_get", get)
+    return calls
+
+
+def test_paginate_follows_pages_and_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Full pages are followed until the limit or the total count is reached."""
+    monkeypatch.setattr(gha_history, "PAGE_SIZE", 2)
+    calls = fake_pages(
+        monkeypatch,
+        {
+            "/runs": [
+                {"total_count": 5, "items": [{"id": 1}, {"id": 2}]},
+                {"total_count": 5, "items": [{"id": 3}, {"id": 4}]},
+                {"total_count": 5, "items": [{"id": 5}]},
+            ],
+            "/exact": [{"total_count": 2, "items": [{"id": 1}, {"id": 2}]}],
+        },
+    )
+    assert [i["id"] for i in gha_history.paginate("/runs", "t", "items")] == [1, 2, 3, 4, 5]
+    assert len(calls) == 3  # noqa: PLR2004
+    assert calls[1] == ("/runs", {"per_page": "2", "page": "2"})
+    calls.clear()
+    limited = gha_history.paginate("/runs", "t", "items", 3, {"status": "completed"})
+    assert [i["id"] for i in limited] == [1, 2, 3]
+    assert calls[0][1] == {"status": "completed", "per_page": "2", "page": "1"}
+    calls.clear()
+    assert len(gha_history.paginate("/exact", "t", "items")) == 2  # noqa: PLR2004
+    assert len(calls) == 1
+
+
+def test_sync_appends_only_new_completed_runs(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Known runs are skipped and jobs are fetched only for new ones."""
+    calls = fake_pages(
+        monkeypatch,
+        {
+            "/repos/o/r/actions/runs": [
+                {
+                    "total_count": 3,
+                    "workflow_runs": [
+                        {"id": 3, "status": "completed", "path": "ci.yml"},
+                        {"id": 2, "status": "in_progress", "path": "ci.yml"},
+                        {"id": 1, "status": "completed", "path": "ci.yml"},
+                    ],
+                },
+            ],
+            "/repos/o/r/actions/runs/3/jobs": [{"total_count": 1, "jobs": [{"id": 30}]}],
+        },
+    )
+    history = RunHistory(tmp_path / "history.sqlite")
+    history.add("o/r", {"id": 1, "path": "ci.yml"}, [])
+    assert gha_history.sync(history, "o/r", "t", 10) == 1
+    assert history.known([1, 2, 3]) == {1, 3}
+    assert [path for path, _ in calls] == [
+        "/repos/o/r/actions/runs",
+        "/repos/o/r/actions/runs/3/jobs",
+    ]
+    calls.clear()
+    assert gha_history.sync(history, "o/r", "t", 10) == 0
+    assert [path for path, _ in calls] == ["/repos/o/r/actions/runs"]
+    history.close()
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, "-"), (42.4, "42s"), (65, "1m05s"), (3600, "60m00s")],
+)
+def test_format_seconds(value: float | None, expected: str) -> None:
+    """Durations render compactly."""
+    assert gha_history.format_seconds(value) == expected
+
+
+def test_print_report(capsys: pytest.CaptureFixture[str]) -> None:
+    """The report renders the headline, job table and slowest steps."""
+    gha_history.print_report(
+        {
+            "workflow": "ci.yml",
+            "runs": 2,
+            "duration": {"p50_s": 600.0, "p95_s": 700.0},
+            "queue": {"p50_s": 4.0, "p95_s": None},
+            "jobs": [
+                {
+                    "name": "build",
+                    "count": 2,
+                    "duration": {"p50_s": 500.0, "p95_s": 650.0},
+                    "queue": {"p50_s": 3.0, "p95_s": 9.0},
+                },
+            ],
+            "slowest_steps": [
+                {"job": "build", "step": "bake", "count": 2, "p50_s": 400.0, "p95_s": 600.0},
+            ],
+        },
+    )
+    out = capsys.readouterr().out
+    assert "last 2 runs: p50 10m00s, p95 11m40s" in out
+    assert "build" in out
+    assert "bake" in out
@@ -1,11 +1,16 @@
 """Unit tests for GitHub Actions monitor utilities."""
 
+import http.client
 import json
+import random
+import sys
+import threading
 from pathlib import Path
 
 import pytest
 
 from scripts import gha_monitor
+from scripts.lib.github_api import Response
 
 
 def test_default_repo_parses_https(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -66,36 +71,511 @@ def test_git_wrapper(monkeypatch: pytest.MonkeyPatch) -> None:
     assert gha_monitor.git(["echo"]) == "value"
 
 
+class FakeClock:
+    """Stand-in for the ``time`` module that advances only when slept."""
+
+    def __init__(self) -> None:
+        """Start at t=0 with no sleeps."""
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        """Return the fake clock."""
+        return self.now
+
+    def time(self) -> float:
+        """Return the fake wall clock."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clock instead of sleeping."""
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeStop(threading.Event):
+    """Stop event whose waits advance a ``FakeClock`` instead of blocking."""
+
+    def __init__(self, clock: FakeClock) -> None:
+        """Wrap ``clock``."""
+        super().__init__()
+        self.clock = clock
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Sleep on the fake clock unless already stopped; return whether stopped."""
+        if not self.is_set():
+            self.clock.sleep(timeout or 0)
+        return self.is_set()
+
+
+def freeze_time(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    """Replace the monitor's clock and stop event with fakes that never block."""
+    clock = FakeClock()
+    monkeypatch.setattr(gha_monitor, "time", clock)
+    monkeypatch.setattr(gha_monitor, "_stop", FakeStop(clock))
+    return clock
+
+
+def fake_api(
+    monkeypatch: pytest.MonkeyPatch,
+    runs: list[dict],
+    jobs: list[dict] | None = None,
+    headers: dict[str, str] | None = None,
+) -> FakeClock:
+    """Serve ``runs`` in order (the last repeats) and a fixed jobs list; freeze time."""
+    pending = iter(runs)
+    last: list[dict] = []
+
+    def request(path: str, *_args: object, **_kwargs: object) -> Response:
+        if path.endswith("/jobs"):
+            return Response(200, {"jobs": jobs or []})
+        last[:] = [next(pending, last[0] if last else {})]
+        return Response(200, last[0], headers or {})
+
+    monkeypatch.setattr(gha_monitor, "api_request", request)
+    return freeze_time(monkeypatch)
+
+
+NO_JITTER = gha_monitor.PollPolicy(min_interval=2, max_interval=10, jitter=0)
+
+
 def test_watch_run_success(monkeypatch: pytest.MonkeyPatch) -> None:
     """Succeed when watched run completes successfully."""
-    calls = iter(
+    clock = fake_api(
+        monkeypatch,
         [
             {"status": "in_progress", "conclusion": None},
             {"status": "completed", "conclusion": "success"},
         ],
     )
-    monkeypatch.setattr(gha_monitor, "api_get", lambda *_, **__: next(calls))
-    monkeypatch.setattr(
-        gha_monitor,
-        "time",
-        type("T", (), {"sleep": lambda *_args, **_kwargs: None})(),
-    )
-    gha_monitor.watch_run("owner/repo", 1, "t", interval=0)
+    gha_monitor.watch_run("owner/repo", 1, "t", NO_JITTER)
+    assert clock.sleeps == [2]
 
 
 def test_watch_run_failure(monkeypatch: pytest.MonkeyPatch) -> None:
     """Exit non-zero when watched run fails."""
-    calls = iter(
+    fake_api(
+        monkeypatch,
         [
             {"status": "in_progress", "conclusion": None},
             {"status": "completed", "conclusion": "failure"},
         ],
     )
-    monkeypatch.setattr(gha_monitor, "api_get", lambda *_, **__: next(calls))
+    with pytest.raises(SystemExit):
+        gha_monitor.watch_run("owner/repo", 1, "t", NO_JITTER)
+
+
+def test_watch_run_backs_off_until_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unchanged polls back off to the ceiling, and the deadline ends the watch."""
+    policy = gha_monitor.PollPolicy(min_interval=2, max_interval=10, jitter=0, timeout=30)
+    clock = fake_api(monkeypatch, [{"status": "queued", "conclusion": None}])
+    with pytest.raises(SystemExit) as excinfo:
+        gha_monitor.watch_run("owner/repo", 1, "t", policy)
+    assert excinfo.value.code == gha_monitor.EXIT_TIMEOUT
+    assert clock.sleeps == [2, 3, 4.5, 6.75, 10, 3.75]
+
+
+def test_watch_run_resets_backoff_on_progress(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A status change drops the delay back to the minimum."""
+    clock = fake_api(
+        monkeypatch,
+        [
+            {"status": "queued", "conclusion": None},
+            {"status": "queued", "conclusion": None},
+            {"status": "in_progress", "conclusion": None},
+            {"status": "completed", "conclusion": "success"},
+        ],
+    )
+    gha_monitor.watch_run("owner/repo", 1, "t", NO_JITTER)
+    assert clock.sleeps == [2, 3, 2]
+
+
+def test_watch_run_respects_rate_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Low remaining quota stretches the delay to the window reset."""
+    clock = fake_api(
+        monkeypatch,
+        [
+            {"status": "in_progress", "conclusion": None},
+            {"status": "completed", "conclusion": "success"},
+        ],
+        headers={"x-ratelimit-remaining": "1", "x-ratelimit-reset": "60"},
+    )
+    gha_monitor.watch_run("owner/repo", 1, "t", NO_JITTER)
+    assert clock.sleeps == [60]
+
+
+def test_next_delay_jitter() -> None:
+    """Jitter keeps delays within the configured band around the backoff."""
+    policy = gha_monitor.PollPolicy(min_interval=2, max_interval=30, jitter=0.2)
+    rng = random.Random(0)  # noqa: S311 - deterministic jitter
+    delays = [gha_monitor.next_delay(policy, 10, rng) for _ in range(50)]
+    assert all(24 <= delay <= 36 for delay in delays)  # noqa: PLR2004
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({}, 0.0),
+        ({"retry-after": "7"}, 7.0),
+        ({"x-ratelimit-remaining": "100", "x-ratelimit-reset": "1200"}, 2.0),
+        ({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "1300"}, 300.0),
+        ({"x-ratelimit-remaining": "3", "x-ratelimit-reset": "900"}, 0.0),
+    ],
+)
+def test_rate_limit_delay(headers: dict[str, str], expected: float) -> None:
+    """Retry-After wins, low quota waits for the reset, otherwise quota is spread out."""
+    assert gha_monitor.rate_limit_delay(headers, 1000.0) == expected
+
+
+def test_job_progress_and_changes(caplog: pytest.LogCaptureFixture) -> None:
+    """Jobs are summarized with their current step and only changes are logged."""
+    jobs = [
+        {
+            "name": "build",
+            "status": "in_progress",
+            "steps": [
+                {"name": "checkout", "status": "completed"},
+                {"name": "bake", "status": "in_progress"},
+                {"name": "push", "status": "queued"},
+            ],
+        },
+        {"name": "lint", "status": "completed", "conclusion": "success", "steps": []},
+        {"id": 9, "status": "queued", "steps": [{"name": "setup", "status": "queued"}]},
+    ]
+    progress = gha_monitor.job_progress(jobs)
+    assert progress == {
+        "build": "in_progress [1/3] bake",
+        "lint": "success",
+        "9": "queued [0/1]",
+    }
+    caplog.set_level("INFO")
+    assert gha_monitor.log_changes({"lint": "success"}, progress)
+    assert "lint" not in caplog.text
+    assert "build: in_progress [1/3] bake" in caplog.text
+    assert not gha_monitor.log_changes(progress, progress)
+
+
+def test_watch_run_fetches_jobs(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Job progress is fetched with the run on every poll."""
+    fake_api(
+        monkeypatch,
+        [{"status": "completed", "conclusion": "success"}],
+        jobs=[{"name": "build", "status": "completed", "conclusion": "success"}],
+    )
+    run, jobs, _ = gha_monitor.fetch_progress("owner/repo", 1, "t")
+    assert run["conclusion"] == "success"
+    assert jobs == {"build": "success"}
+
+
+def test_api_request_waits_out_rate_limit(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Rate-limited requests sleep for Retry-After and retry."""
+    monkeypatch.setenv("PIXI_DEVCONTAINER_CACHE", str(tmp_path))
+    monkeypatch.setattr(gha_monitor, "_clients", {})
+    clock = freeze_time(monkeypatch)
+    outcomes = iter(
+        [
+            gha_monitor.GitHubAPIError(429, "slow down", {"retry-after": "5"}),
+            Response(200, {"ok": True}),
+        ],
+    )
+
+    def request(*_args: object, **_kwargs: object) -> Response:
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(gha_monitor.GitHubClient, "request", request)
+    assert gha_monitor.api_get("/a", "t") == {"ok": True}
+    assert clock.sleeps == [5]
+
+
+def test_api_request_gives_up_on_persistent_rate_limit(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Exit once the retry budget is spent."""
+    monkeypatch.setenv("PIXI_DEVCONTAINER_CACHE", str(tmp_path))
+    monkeypatch.setattr(gha_monitor, "_clients", {})
+    clock = freeze_time(monkeypatch)
+
+    def request(*_args: object, **_kwargs: object) -> Response:
+        raise gha_monitor.GitHubAPIError(
+            403,
+            "API rate limit exceeded",
+            {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "60"},
+        )
+
+    monkeypatch.setattr(gha_monitor.GitHubClient, "request", request)
+    with pytest.raises(SystemExit, match="rate limit exceeded"):
+        gha_monitor.api_get("/a", "t")
+    assert clock.sleeps == [60, 0, 0]
+
+
+def test_api_request_stops_waiting_when_interrupted(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """A stopped watch does not sit out a rate-limit window."""
+    monkeypatch.setenv("PIXI_DEVCONTAINER_CACHE", str(tmp_path))
+    monkeypatch.setattr(gha_monitor, "_clients", {})
+    stopped = threading.Event()
+    stopped.set()
+    monkeypatch.setattr(gha_monitor, "_stop", stopped)
+
+    def request(*_args: object, **_kwargs: object) -> Response:
+        raise gha_monitor.GitHubAPIError(429, "slow down", {"retry-after": "3600"})
+
+    monkeypatch.setattr(gha_monitor.GitHubClient, "request", request)
+    with pytest.raises(SystemExit, match="Interrupted"):
+        gha_monitor.api_get("/a", "t")
+
+
+def test_api_get_shares_client(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """One pooled client per token, closed (and its ETags saved) by close_clients."""
+    monkeypatch.setenv("PIXI_DEVCONTAINER_CACHE", str(tmp_path))
+    monkeypatch.setattr(gha_monitor, "_clients", {})
+    calls: list[tuple] = []
     monkeypatch.setattr(
-        gha_monitor,
-        "time",
-        type("T", (), {"sleep": lambda *_args, **_kwargs: None})(),
+        gha_monitor.GitHubClient,
+        "request",
+        lambda _self, path, params=None: (
+            calls.append((path, params)) or Response(200, {"ok": True})
+        ),
     )
-    with pytest.raises(SystemExit):
-        gha_monitor.watch_run("owner/repo", 1, "t", interval=0)
+    assert gha_monitor.api_get("/a", "t") == {"ok": True}
+    assert gha_monitor.api_get("/b", "t", {"x": "1"}) == {"ok": True}
+    assert calls == [("/a", None), ("/b", {"x": "1"})]
+    assert list(gha_monitor._clients) == ["t"]  # noqa: SLF001
+    gha_monitor.close_clients()
+    assert gha_monitor._clients == {}  # noqa: SLF001
+
+
+def test_api_get_exits_on_error(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """API errors end the CLI with the status and body."""
+    monkeypatch.setenv("PIXI_DEVCONTAINER_CACHE", str(tmp_path))
+    monkeypatch.setattr(gha_monitor, "_clients", {})
+
+    def fail(*_args: object, **_kwargs: object) -> Response:
+        raise gha_monitor.GitHubAPIError(403, "forbidden")
+
+    monkeypatch.setattr(gha_monitor.GitHubClient, "request", fail)
+    with pytest.raises(SystemExit, match="GitHub API error 403: forbidden"):
+        gha_monitor.api_get("/a", "t")
+
+
+@pytest.mark.parametrize(
+    ("conclusions", "expected"),
+    [
+        ([], 0),
+        (["success", "success"], 0),
+        (["success", gha_monitor.TIMED_OUT], gha_monitor.EXIT_TIMEOUT),
+        (["failure", gha_monitor.TIMED_OUT], 1),
+        (["success", "cancelled"], 1),
+        (["error"], 1),
+    ],
+)
+def test_exit_code(conclusions: list[str], expected: int) -> None:
+    """Any failure wins over a timeout, which wins over success."""
+    assert gha_monitor.exit_code(conclusions) == expected
+
+
+def test_run_summary() -> None:
+    """Board lines show the run state, finished jobs and the active step."""
+    jobs = {"lint": "success", "build": "in_progress [1/3] bake", "push": "queued"}
+    assert (
+        gha_monitor.run_summary({"status": "in_progress"}, jobs)
+        == "in_progress 1/3 jobs | build: in_progress [1/3] bake"
+    )
+    assert gha_monitor.run_summary({"status": "completed", "conclusion": "failure"}, {}) == (
+        "failure"
+    )
+    assert gha_monitor.run_summary({}, {}) == "unknown"
+
+
+def test_status_board_refresh_and_log(caplog: pytest.LogCaptureFixture) -> None:
+    """Changed rows redraw the board, or are logged when there is no live display."""
+    frames: list[str] = []
+    board = gha_monitor.StatusBoard(["main ci.yml", "dev"], refresh=frames.append)
+    board.update("dev", "in_progress")
+    board.update("dev", "in_progress")
+    assert frames == ["main ci.yml  pending\ndev          in_progress"]
+    caplog.set_level("INFO")
+    plain = gha_monitor.StatusBoard(["dev"])
+    plain.reporter("dev")({"status": "queued"}, {})
+    assert "dev: queued" in caplog.text
+    assert gha_monitor.StatusBoard([]).render() == ""
+
+
+def test_watch_runs_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    """All runs are polled in parallel and folded into one exit code."""
+    sequences = {
+        "1": iter([{"status": "completed", "conclusion": "success"}]),
+        "2": iter([{"status": "completed", "conclusion": "failure"}]),
+        "3": iter([{"status": "queued", "conclusion": None}] * 10),
+    }
+
+    def request(path: str, *_args: object, **_kwargs: object) -> Response:
+        if path.endswith("/jobs"):
+            return Response(200, {"jobs": []})
+        return Response(200, next(sequences[path.rsplit("/", 1)[-1]]))
+
+    monkeypatch.setattr(gha_monitor, "api_request", request)
+    freeze_time(monkeypatch)
+    board = gha_monitor.StatusBoard(["a", "b", "c"])
+    policy = gha_monitor.PollPolicy(min_interval=1, max_interval=1, jitter=0, timeout=3)
+    code = gha_monitor.watch_runs("o/r", {"a": 1, "b": 2, "c": 3}, "t", policy, board)
+    assert code == 1
+    assert board.rows == {"a": "success", "b": "failure", "c": gha_monitor.TIMED_OUT}
+
+
+def test_watch_runs_reports_api_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A fatal API error marks its row instead of killing the other watchers."""
+
+    def request(*_args: object, **_kwargs: object) -> Response:
+        sys.exit("GitHub API error 404: Not Found")
+
+    monkeypatch.setattr(gha_monitor, "api_request", request)
+    board = gha_monitor.StatusBoard(["a"])
+    code = gha_monitor.watch_runs("o/r", {"a": 1}, "t", gha_monitor.PollPolicy(), board)
+    assert code == 1
+    assert board.rows == {"a": "error"}
+
+
+@pytest.mark.parametrize(
+    "error",
+    [TimeoutError("timed out"), ConnectionRefusedError(), http.client.IncompleteRead(b"")],
+)
+def test_watch_runs_reports_network_errors(
+    monkeypatch: pytest.MonkeyPatch,
+    error: Exception,
+) -> None:
+    """A socket or HTTP failure in one poller marks its row; the others finish."""
+
+    def request(path: str, *_args: object, **_kwargs: object) -> Response:
+        if "/runs/1" in path:
+            raise error
+        return Response(200, {"status": "completed", "conclusion": "success"})
+
+    monkeypatch.setattr(gha_monitor, "api_request", request)
+    freeze_time(monkeypatch)
+    board = gha_monitor.StatusBoard(["a", "b"])
+    code = gha_monitor.watch_runs("o/r", {"a": 1, "b": 2}, "t", NO_JITTER, board)
+    assert code == 1
+    assert board.rows == {"a": "error", "b": "success"}
+
+
+def test_watch_runs_stops_pollers_when_one_raises(monkeypatch: pytest.MonkeyPatch) -> None:
+    """An unexpected poller error wakes the sleeping pollers before it propagates."""
+    fake_api(monkeypatch, [{"status": "in_progress"}])
+    monkeypatch.setattr(gha_monitor, "_stop", threading.Event())
+    polling, finished = threading.Event(), threading.Event()
+    results: list[str] = []
+    poll_run = gha_monitor.poll_run
+
+    def note(run: dict, jobs: dict[str, str]) -> None:
+        _ = run, jobs
+        polling.set()
+
+    def fail_or_poll(
+        repo: str,
+        run_id: int,
+        token: str,
+        policy: gha_monitor.PollPolicy,
+        _report: object,
+    ) -> str:
+        if run_id == 1:
+            polling.wait(5)
+            message = "unexpected payload"
+            raise ValueError(message)
+        results.append(poll_run(repo, run_id, token, policy, note))
+        finished.set()
+        return results[-1]
+
+    monkeypatch.setattr(gha_monitor, "_poll_row", fail_or_poll)
+    policy = gha_monitor.PollPolicy(min_interval=60, max_interval=60, jitter=0)
+    board = gha_monitor.StatusBoard(["broken", "slow"])
+    with pytest.raises(ValueError, match="unexpected payload"):
+        gha_monitor.watch_runs("o/r", {"broken": 1, "slow": 2}, "t", policy, board)
+    assert finished.wait(5)
+    assert results == [gha_monitor.INTERRUPTED]
+
+
+def test_watch_runs_stops_pollers_on_interrupt(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Ctrl-C wakes sleeping pollers instead of waiting out their delays."""
+    fake_api(monkeypatch, [{"status": "in_progress"}])
+    monkeypatch.setattr(gha_monitor, "_stop", threading.Event())
+    polling, finished = threading.Event(), threading.Event()
+    results: list[str] = []
+    poll_run = gha_monitor.poll_run
+
+    def note(run: dict, jobs: dict[str, str]) -> None:
+        _ = run, jobs
+        polling.set()
+
+    def interrupt_or_poll(
+        repo: str,
+        run_id: int,
+        token: str,
+        policy: gha_monitor.PollPolicy,
+        _report: object,
+    ) -> str:
+        if run_id == 1:
+            polling.wait(5)
+            raise KeyboardInterrupt
+        results.append(poll_run(repo, run_id, token, policy, note))
+        finished.set()
+        return results[-1]
+
+    monkeypatch.setattr(gha_monitor, "_poll_row", interrupt_or_poll)
+    policy = gha_monitor.PollPolicy(min_interval=60, max_interval=60, jitter=0)
+    board = gha_monitor.StatusBoard(["ctrl-c", "slow"])
+    with pytest.raises(KeyboardInterrupt):
+        gha_monitor.watch_runs("o/r", {"ctrl-c": 1, "slow": 2}, "t", policy, board)
+    assert finished.wait(5)
+    assert results == [gha_monitor.INTERRUPTED]
+
+
+def test_resolve_runs(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    """Every branch x workflow pair is looked up; missing runs are skipped with a warning."""
+    calls: list[tuple] = []
+
+    def latest(repo: str, branch: str, token: str, workflow: str | None) -> dict | None:
+        calls.append((repo, branch, token, workflow))
+        return None if branch == "gone" else {"id": len(branch)}
+
+    monkeypatch.setattr(gha_monitor, "latest_run", latest)
+    runs = gha_monitor.resolve_runs("o/r", ["main", "gone"], ["ci.yml", "renovate.yml"], "t")
+    assert runs == {"main ci.yml": {"id": 4}, "main renovate.yml": {"id": 4}}
+    assert len(calls) == 4  # noqa: PLR2004
+    assert "No workflow runs found for o/r@gone ci.yml" in caplog.text
+    assert gha_monitor.resolve_runs("o/r", ["main"], None, "t") == {"main": {"id": 4}}
+
+
+def test_latest_run_for_workflow(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Workflow lookups use the per-workflow endpoint without the push filter."""
+    seen: list[tuple] = []
+
+    def get(path: str, _token: str, params: dict[str, str]) -> dict:
+        seen.append((path, params))
+        return {"workflow_runs": []}
+
+    monkeypatch.setattr(gha_monitor, "api_get", get)
+    assert gha_monitor.latest_run("o/r", "main", "t", "renovate.yml") is None
+    assert seen == [
+        ("/repos/o/r/actions/workflows/renovate.yml/runs", {"branch": "main", "per_page": "1"}),
+    ]
+
+
+def test_progress_log_reports_job_changes_only(caplog: pytest.LogCaptureFixture) -> None:
+    """The single-run log repeats the run status only when it changes."""
+    caplog.set_level("INFO")
+    log = gha_monitor.ProgressLog()
+    log({"status": "in_progress"}, {"build": "in_progress [0/2] setup"})
+    log({"status": "in_progress"}, {"build": "in_progress [1/2] bake"})
+    assert caplog.text.count("Status: in_progress") == 1
+    assert "build: in_progress [1/2] bake" in caplog.text
@@ -0,0 +1,320 @@
+"""Unit tests for the pooled GitHub API client, run against a local stand-in server."""
+
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING
+
+import pytest
+
+from scripts.lib import github_api
+
+if TYPE_CHECKING:
+    import ssl
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+class StandIn(ThreadingHTTPServer):
+    """Minimal api.github.com stand-in serving canned JSON with ETags."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        """Bind to an ephemeral loopback port."""
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.routes: dict[str, tuple[str | None, dict]] = {}
+        self.log: list[dict] = []
+        # Paths whose connection is dropped after the response without a
+        # ``Connection: close`` header, like an idle keep-alive timeout.
+        self.drop_after: set[str] = set()
+        # Paths answered with ``Connection: close``.
+        self.close_after: set[str] = set()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the stand-in."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serve ``StandIn.routes`` and honour ``If-None-Match``."""
+
+    protocol_version = "HTTP/1.1"
+    server: StandIn
+
+    def do_GET(self) -> None:
+        """Answer 200, 304 or 404 for the requested path."""
+        self.server.log.append(
+            {
+                "path": self.path,
+                "port": self.client_address[1],
+                "if_none_match": self.headers.get("If-None-Match"),
+                "authorization": self.headers.get("Authorization"),
+            },
+        )
+        route = self.server.routes.get(self.path)
+        if route is None:
+            self._reply(404, b'{"message": "Not Found"}')
+        elif route[0] is not None and self.headers.get("If-None-Match") == route[0]:
+            self._reply(304, b"", etag=route[0])
+        else:
+            self._reply(200, json.dumps(route[1]).encode(), etag=route[0])
+        if self.path in self.server.drop_after:
+            self.close_connection = True
+
+    def _reply(self, status: int, body: bytes, etag: str | None = None) -> None:
+        self.send_response(status)
+        if self.path in self.server.close_after:
+            self.send_header("Connection", "close")
+        if etag:
+            self.send_header("ETag", etag)
+        if status != 304:  # noqa: PLR2004
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args: object) -> None:
+        """Keep test output quiet."""
+
+
+@pytest.fixture
+def server() -> Iterator[StandIn]:
+    """Run the stand-in on a background thread."""
+    stand_in = StandIn()
+    thread = threading.Thread(target=stand_in.serve_forever, daemon=True)
+    thread.start()
+    yield stand_in
+    stand_in.shutdown()
+    stand_in.server_close()
+
+
+@pytest.fixture
+def client(server: StandIn, tmp_path: Path) -> Iterator[github_api.GitHubClient]:
+    """Client pointed at the stand-in with a temporary ETag cache."""
+    api = github_api.GitHubClient("t", base_url=server.url, etag_path=tmp_path / "etags.json")
+    yield api
+    api.close()
+
+
+def test_reuses_connection_and_revalidates(
+    server: StandIn,
+    client: github_api.GitHubClient,
+) -> None:
+    """Repeated polls share one connection and unchanged resources come back as 304."""
+    server.routes["/repos/o/r/actions/runs/1"] = ('"v1"', {"status": "queued"})
+    first = client.request("/repos/o/r/actions/runs/1")
+    second = client.request("/repos/o/r/actions/runs/1")
+    assert first.status == 200  # noqa: PLR2004
+    assert not first.cached
+    assert second.status == github_api.NOT_MODIFIED
+    assert second.cached
+    assert second.data == {"status": "queued"}
+    assert client.connections_opened == 1
+    assert len({entry["port"] for entry in server.log}) == 1
+    assert [entry["if_none_match"] for entry in server.log] == [None, '"v1"']
+    assert server.log[0]["authorization"] == "Bearer t"
+
+
+def test_changed_resource_replaces_cached_body(
+    server: StandIn,
+    client: github_api.GitHubClient,
+) -> None:
+    """A new ETag returns the fresh body and is remembered."""
+    server.routes["/runs?per_page=1"] = ('"v1"', {"n": 1})
+    assert client.get("/runs", {"per_page": "1"}) == {"n": 1}
+    server.routes["/runs?per_page=1"] = ('"v2"', {"n": 2})
+    assert client.get("/runs", {"per_page": "1"}) == {"n": 2}
+    assert client.request("/runs", {"per_page": "1"}).cached
+
+
+def test_etags_persist_across_clients(server: StandIn, tmp_path: Path) -> None:
+    """The ETag cache is written on close and reused by the next process."""
+    server.routes["/runs"] = ('"v1"', {"n": 1})
+    etags = tmp_path / "etags.json"
+    first = github_api.GitHubClient("t", base_url=server.url, etag_path=etags)
+    first.get("/runs")
+    first.close()
+    second = github_api.GitHubClient("t", base_url=server.url, etag_path=etags)
+    response = second.request("/runs")
+    second.close()
+    assert response.cached
+    assert response.data == {"n": 1}
+
+
+def test_save_skips_clean_cache(server: StandIn, client: github_api.GitHubClient) -> None:
+    """Responses without an ETag are not cached and nothing is written."""
+    server.routes["/plain"] = (None, {"n": 1})
+    assert client.get("/plain") == {"n": 1}
+    client.save()
+    assert not client.etag_path.exists()
+
+
+def test_etag_cache_is_bounded(
+    server: StandIn,
+    client: github_api.GitHubClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The oldest entries are dropped beyond ``MAX_ETAG_ENTRIES``."""
+    monkeypatch.setattr(github_api, "MAX_ETAG_ENTRIES", 2)
+    for n in range(3):
+        server.routes[f"/r{n}"] = (f'"{n}"', {"n": n})
+        client.get(f"/r{n}")
+    client.save()
+    stored = json.loads(client.etag_path.read_text(encoding="utf-8"))
+    assert sorted(stored) == [f"{client.base.netloc}/r1", f"{client.base.netloc}/r2"]
+
+
+def test_error_status_raises(client: github_api.GitHubClient) -> None:
+    """Error responses raise with status and body."""
+    with pytest.raises(github_api.GitHubAPIError) as excinfo:
+        client.get("/missing")
+    assert excinfo.value.status == 404  # noqa: PLR2004
+    assert "Not Found" in excinfo.value.body
+
+
+def test_retries_connection_closed_by_server(
+    server: StandIn,
+    client: github_api.GitHubClient,
+) -> None:
+    """A pooled connection the server dropped is replaced transparently."""
+    server.routes["/runs"] = (None, {"n": 1})
+    server.drop_after.add("/runs")
+    assert client.get("/runs") == {"n": 1}
+    assert client.get("/runs") == {"n": 1}
+    assert client.connections_opened == 2  # noqa: PLR2004
+
+
+def test_connection_close_is_not_pooled(
+    server: StandIn,
+    client: github_api.GitHubClient,
+) -> None:
+    """Connections the server announces it will close are not returned to the pool."""
+    server.routes["/bye"] = (None, {"n": 1})
+    server.close_after.add("/bye")
+    client.get("/bye")
+    assert client._idle.empty()  # noqa: SLF001
+
+
+class FakeConnection(http.client.HTTPSConnection):
+    """Connection double that fails every request."""
+
+    def __init__(self, error: BaseException) -> None:
+        """Raise ``error`` from ``request``; nothing is connected."""
+        super().__init__("api.github.com")
+        self.error = error
+        self.closed = False
+
+    def request(self, *_args: object, **_kwargs: object) -> None:
+        """Fail the request."""
+        raise self.error
+
+    def close(self) -> None:
+        """Record the close."""
+        self.closed = True
+
+
+def test_stale_connection_retried_once(
+    client: github_api.GitHubClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A second stale-connection failure propagates."""
+    conns = [FakeConnection(ConnectionResetError()) for _ in range(2)]
+    pending = iter(conns)
+    monkeypatch.setattr(client, "_connect", lambda: next(pending))
+    with pytest.raises(ConnectionResetError):
+        client.get("/runs")
+    assert all(conn.closed for conn in conns)
+
+
+def test_other_errors_close_connection(
+    client: github_api.GitHubClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Timeouts and other failures are not retried and never return the connection."""
+    conn = FakeConnection(TimeoutError())
+    monkeypatch.setattr(client, "_connect", lambda: conn)
+    with pytest.raises(TimeoutError):
+        client.get("/runs")
+    assert conn.closed
+    assert client._idle.empty()  # noqa: SLF001
+
+
+def test_release_closes_when_pool_full(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Connections beyond the pool size are closed instead of kept."""
+    monkeypatch.setattr(github_api, "POOL_SIZE", 1)
+    api = github_api.GitHubClient("t", etag_path=tmp_path / "etags.json")
+    kept, extra = FakeConnection(OSError()), FakeConnection(OSError())
+    api._release(kept)  # noqa: SLF001
+    api._release(extra)  # noqa: SLF001
+    assert not kept.closed
+    assert extra.closed
+    api.close()
+    assert kept.closed
+
+
+class RecordingConnection:
+    """Stand-in for ``http.client.HTTPSConnection`` that records its arguments."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int | None = None,
+        *,
+        timeout: float,
+        context: ssl.SSLContext | None = None,
+    ) -> None:
+        """Keep ``host`` and ``context``; nothing is connected."""
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.context = context
+
+
+def test_https_connections_share_ssl_context(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Every HTTPS connection is built on the same SSL context."""
+    monkeypatch.setattr(http.client, "HTTPSConnection", RecordingConnection)
+    api = github_api.GitHubClient("t", etag_path=tmp_path / "etags.json")
+    first, second = api._connect(), api._connect()  # noqa: SLF001
+    assert isinstance(first, RecordingConnection)
+    assert isinstance(second, RecordingConnection)
+    assert first.host == "api.github.com"
+    assert first.context is second.context is github_api.shared_ssl_context()
+
+
+def test_corrupt_etag_cache_starts_empty(tmp_path: Path) -> None:
+    """An unreadable cache file is ignored."""
+    etags = tmp_path / "etags.json"
+    etags.write_text("{not json", encoding="utf-8")
+    assert github_api.GitHubClient("t", etag_path=etags)._etags == {}  # noqa: SLF001
+
+
+def test_base_url_from_environment(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """$GITHUB_API_URL selects the endpoint when no base URL is given."""
+    monkeypatch.setenv(github_api.API_URL_ENV, "http://localhost:9/api/v3")
+    api = github_api.GitHubClient("t", etag_path=tmp_path / "etags.json")
+    assert api._url("/runs", {"b": "2", "a": "1"}) == "/api/v3/runs?a=1&b=2"  # noqa: SLF001
+
+
+@pytest.mark.parametrize(
+    ("url", "message"),
+    [
+        ("http://api.github.com", "non-https"),
+        ("https://example.com", "Unexpected GitHub API host"),
+        ("ftp://127.0.0.1", "non-https"),
+    ],
+)
+def test_check_base_url_rejects(url: str, message: str) -> None:
+    """Only https to GitHub or http to loopback is accepted."""
+    with pytest.raises(ValueError, match=message):
+        github_api.check_base_url(url)
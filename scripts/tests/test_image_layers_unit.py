@@ -0,0 +1,71 @@
+"""Unit tests for registry layer comparison helpers."""
+
+import json
+import subprocess
+
+import pytest
+
+from scripts.lib import image_layers
+
+INDEX = {
+    "mediaType": "application/vnd.oci.image.index.v1+json",
+    "manifests": [
+        {"digest": "sha256:att", "platform": {"os": "unknown", "architecture": "unknown"}},
+        {"digest": "sha256:amd", "platform": {"os": "linux", "architecture": "amd64"}},
+    ],
+}
+MANIFEST = {
+    "mediaType": "application/vnd.oci.image.manifest.v1+json",
+    "layers": [{"digest": "sha256:l1", "size": 10}, {"digest": "sha256:l2", "size": 5}],
+}
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Serve INDEX for tags, MANIFEST for the amd64 digest, garbage/errors otherwise."""
+    refs: list[str] = []
+
+    def fake_run(cmd: list[str], **_: object) -> subprocess.CompletedProcess[str]:
+        ref = cmd[-1]
+        refs.append(ref)
+        if ref.endswith(("@sha256:amd", ":single")):
+            return subprocess.CompletedProcess(cmd, 0, json.dumps(MANIFEST), "")
+        if ref.endswith(":garbage"):
+            return subprocess.CompletedProcess(cmd, 0, "not json", "")
+        if ref.endswith(":missing"):
+            return subprocess.CompletedProcess(cmd, 1, "", "not found")
+        return subprocess.CompletedProcess(cmd, 0, json.dumps(INDEX), "")
+
+    monkeypatch.setattr(image_layers.subprocess, "run", fake_run)
+    return refs
+
+
+def test_repository() -> None:
+    """Tags and digests are stripped; registry ports are not."""
+    assert image_layers.repository("localhost:5000/cpp:noble") == "localhost:5000/cpp"
+    assert image_layers.repository("localhost:5000/cpp") == "localhost:5000/cpp"
+    assert image_layers.repository("ghcr.io/o/cpp@sha256:abc") == "ghcr.io/o/cpp"
+
+
+def test_manifest_layers_follows_platform(registry: list[str]) -> None:
+    """Indexes resolve to the platform manifest; plain manifests are read directly."""
+    expected = [{"digest": "sha256:l1", "size": 10}, {"digest": "sha256:l2", "size": 5}]
+    assert image_layers.manifest_layers("localhost:5000/cpp:noble") == expected
+    assert registry == ["localhost:5000/cpp:noble", "localhost:5000/cpp@sha256:amd"]
+    assert image_layers.manifest_layers("r/cpp:single") == expected
+    assert image_layers.manifest_layers("r/cpp:noble", platform="linux/arm64") is None
+    assert image_layers.manifest_layers("r/cpp:missing") is None
+    assert image_layers.manifest_layers("r/cpp:garbage") is None
+
+
+def test_layer_delta() -> None:
+    """Layers already present in the previous image count as reused."""
+    previous = [image_layers.Layer(digest="sha256:l1", size=10)]
+    current = [
+        image_layers.Layer(digest="sha256:l1", size=10),
+        image_layers.Layer(digest="sha256:l3", size=7),
+    ]
+    delta = image_layers.layer_delta(previous, current)
+    assert [layer["status"] for layer in delta["layers"]] == ["reused", "new"]
+    assert (delta["total_bytes"], delta["new_bytes"], delta["reused_bytes"]) == (17, 7, 10)
+    assert image_layers.layer_delta(None, current)["new_bytes"] == 17  # noqa: PLR2004
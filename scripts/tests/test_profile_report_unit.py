@@ -0,0 +1,65 @@
+"""Unit tests for validation profile reports and history."""
+
+from pathlib import Path
+
+import pytest
+
+from scripts.lib import profile_report
+from scripts.lib.procs import Execution
+
+
+def _executions() -> dict[str, Execution]:
+    return {
+        "fast": Execution(returncode=0, output="", wall=0.5, user=0.2, sys=0.1, max_rss_kb=2048),
+        "slow": Execution(returncode=1, output="", wall=9.0, user=8.0, sys=1.0, max_rss_kb=512),
+    }
+
+
+def test_build_report_sorted_slowest_first(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Checks are ordered by wall time and totals are summed."""
+    monkeypatch.setattr(profile_report, "current_commit", lambda: "abc")
+    report = profile_report.build_report(_executions(), wall_clock=9.5)
+    assert [c["name"] for c in report["checks"]] == ["slow", "fast"]
+    assert report["commit"] == "abc"
+    assert report["cpu_s"] == pytest.approx(9.3)
+    lines = profile_report.render_table(report)
+    assert lines[0].startswith("Check")
+    assert lines[1].startswith("slow")
+    assert "2.0" in lines[2]
+    assert lines[-1] == "Total wall 9.50s, CPU 9.30s"
+
+
+def test_current_commit(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Return HEAD or empty string when git is unavailable."""
+    monkeypatch.setattr(profile_report.subprocess, "check_output", lambda *_, **__: "sha\n")
+    assert profile_report.current_commit() == "sha"
+
+    def boom(*_: object, **__: object) -> None:
+        raise OSError
+
+    monkeypatch.setattr(profile_report.subprocess, "check_output", boom)
+    assert profile_report.current_commit() == ""
+
+
+def test_history_roundtrip_and_regressions(tmp_path: Path) -> None:
+    """Appended reports are reloaded and used to flag slow checks."""
+    path = tmp_path / "hist" / "history.jsonl"
+    assert profile_report.load_history(path) == []
+    for wall in (4.0, 5.0, 6.0):
+        profile_report.append_history(path, {"checks": [{"name": "slow", "wall_s": wall}]})
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write("not json\n")
+    history = profile_report.load_history(path)
+    assert len(history) == 3  # noqa: PLR2004
+
+    current = {
+        "checks": [
+            {"name": "slow", "wall_s": 9.0},
+            {"name": "new", "wall_s": 50.0},
+        ],
+    }
+    assert profile_report.find_regressions(current, history) == [
+        "slow took 9.0s vs median 5.0s over 3 run(s)",
+    ]
+    steady = {"checks": [{"name": "slow", "wall_s": 6.5}]}
+    assert profile_report.find_regressions(steady, history) == []
@@ -0,0 +1,55 @@
+"""Unit tests for rendering the frozen pixi environment as a shell file."""
+
+import importlib.util
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+# Loaded by path: ``docker`` is also the name of the docker-py package.
+_SPEC = importlib.util.spec_from_file_location(
+    "render_env",
+    Path(__file__).resolve().parents[2] / "docker" / "render_env.py",
+)
+assert _SPEC is not None
+assert _SPEC.loader is not None
+render_env = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(render_env)
+
+BASH = shutil.which("bash")
+
+
+def _sourced_env(rendered: Path) -> dict[str, str]:
+    """Return the environment of a clean bash after sourcing ``rendered``."""
+    out = subprocess.run(  # noqa: S603
+        [BASH or "bash", "--noprofile", "--norc", "-c", '. "$1" && env -0', "_", str(rendered)],
+        env={},
+        capture_output=True,
+        check=True,
+    ).stdout.decode()
+    return dict(entry.split("=", 1) for entry in out.split("\0") if entry)
+
+
+@pytest.mark.skipif(BASH is None, reason="bash not installed")
+def test_render_round_trips_through_bash(tmp_path: Path) -> None:
+    """Sourcing the rendered file reproduces every exportable variable byte for byte."""
+    env = {
+        "PLAIN": "/app/.pixi/envs/default/bin:/usr/bin",
+        "QUOTES": """it's "quoted" \\ here""",
+        "DOLLAR": "$HOME ${PATH} $(id) `id`",
+        "NEWLINES": "line one\nline two\n",
+        "EMPTY": "",
+        "UNICODE": "café",
+        "not-a-name": "skipped",
+        "1LEADING_DIGIT": "skipped",
+    }
+    rendered = tmp_path / "pixi_env.sh"
+    rendered.write_text(render_env.render(env), encoding="utf-8")
+
+    sourced = _sourced_env(rendered)
+
+    for name in ("PLAIN", "QUOTES", "DOLLAR", "NEWLINES", "EMPTY", "UNICODE"):
+        assert sourced[name] == env[name]
+    assert "not-a-name" not in sourced
+    assert "1LEADING_DIGIT" not in sourced
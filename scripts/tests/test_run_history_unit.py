@@ -0,0 +1,144 @@
+"""Unit tests for the SQLite run history."""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import TYPE_CHECKING
+
+from scripts.lib import run_history
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def ts(seconds: int) -> str:
+    """Return an ISO timestamp ``seconds`` after a fixed epoch."""
+    minutes, secs = divmod(seconds, 60)
+    return f"2026-01-01T00:{minutes:02d}:{secs:02d}Z"
+
+
+def make_run(run_id: int, duration: int, workflow: str = ".github/workflows/ci.yml") -> dict:
+    """Build a completed run that queued for 5s and ran ``duration`` seconds."""
+    return {
+        "id": run_id,
+        "path": workflow,
+        "head_branch": "main",
+        "event": "push",
+        "conclusion": "success",
+        "run_attempt": 1,
+        "created_at": ts(run_id),
+        "run_started_at": ts(run_id + 5),
+        "updated_at": ts(run_id + 5 + duration),
+    }
+
+
+def make_job(job_id: int, name: str, queue: int, duration: int, steps: list[int]) -> dict:
+    """Build a job with the given queue time, duration and step durations."""
+    job_steps, clock = [], queue
+    for number, step in enumerate(steps, start=1):
+        job_steps.append(
+            {
+                "number": number,
+                "name": f"step{number}",
+                "conclusion": "success",
+                "started_at": ts(clock),
+                "completed_at": ts(clock + step),
+            },
+        )
+        clock += step
+    return {
+        "id": job_id,
+        "name": name,
+        "conclusion": "success",
+        "runner_name": "gh",
+        "created_at": ts(0),
+        "started_at": ts(queue),
+        "completed_at": ts(queue + duration),
+        "steps": job_steps,
+    }
+
+
+def test_add_is_append_only(tmp_path: Path) -> None:
+    """A run is recorded once; later adds of the same id are ignored."""
+    history = run_history.RunHistory(tmp_path / "h" / "history.sqlite")
+    assert history.add("o/r", make_run(1, 60), [make_job(10, "build", 2, 30, [10, 20])])
+    assert not history.add("o/r", make_run(1, 999), [])
+    assert history.known([1, 2]) == {1}
+    assert history.known([]) == set()
+    assert history.db.execute("SELECT COUNT(*) FROM steps").fetchone() == (2,)
+    history.close()
+
+
+def test_known_queries_large_id_lists_in_chunks(tmp_path: Path) -> None:
+    """More ids than SQLite binds in one statement are looked up chunk by chunk."""
+    history = run_history.RunHistory(tmp_path / "history.sqlite")
+    history.add("o/r", make_run(2500, 60), [])
+    history.add("o/r", make_run(5, 60), [])
+    # The bind limit of SQLite builds before 3.32.
+    history.db.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    assert history.known(range(3000)) == {5, 2500}
+    history.close()
+
+
+def test_report_percentiles_and_slowest_steps(tmp_path: Path) -> None:
+    """Reports cover the last N runs of one workflow with p50/p95 and the slowest steps."""
+    history = run_history.RunHistory(tmp_path / "history.sqlite")
+    for n in range(1, 11):
+        history.add(
+            "o/r",
+            make_run(n, n * 10),
+            [
+                make_job(n * 100, "build", n, n * 6, [n, n * 5]),
+                make_job(n * 100 + 1, "lint", 1, 5, [5]),
+            ],
+        )
+    history.add("o/r", make_run(99, 1, ".github/workflows/renovate.yml"), [])
+    history.add("other/repo", make_run(500, 1), [])
+    assert history.workflows("o/r") == [
+        ".github/workflows/ci.yml",
+        ".github/workflows/renovate.yml",
+    ]
+
+    report = history.report("o/r", ".github/workflows/ci.yml", last=10, top=2)
+    assert report["runs"] == 10  # noqa: PLR2004
+    assert report["duration"] == {"p50_s": 60.0, "p95_s": 100.0}
+    assert report["queue"] == {"p50_s": 5.0, "p95_s": 5.0}
+    build, lint = report["jobs"]
+    assert build["name"] == "build"
+    assert build["count"] == 10  # noqa: PLR2004
+    assert build["duration"] == {"p50_s": 36.0, "p95_s": 60.0}
+    assert build["queue"] == {"p50_s": 6.0, "p95_s": 10.0}
+    assert lint["duration"] == {"p50_s": 5.0, "p95_s": 5.0}
+    assert [(s["job"], s["step"], s["p95_s"]) for s in report["slowest_steps"]] == [
+        ("build", "step2", 50.0),
+        ("build", "step1", 10.0),
+    ]
+
+    recent = history.report("o/r", ".github/workflows/ci.yml", last=3, top=1)
+    assert recent["runs"] == 3  # noqa: PLR2004
+    assert recent["duration"] == {"p50_s": 90.0, "p95_s": 100.0}
+    history.close()
+
+
+def test_report_handles_missing_data(tmp_path: Path) -> None:
+    """Unknown workflows and missing timestamps yield empty percentiles."""
+    history = run_history.RunHistory(tmp_path / "history.sqlite")
+    run = make_run(1, 10) | {"run_started_at": None, "path": None, "name": None}
+    job = {"id": 7, "steps": [{"name": "x"}]}
+    history.add("o/r", run, [job])
+    report = history.report("o/r", "unknown", last=5, top=5)
+    assert report["duration"] == {"p50_s": None, "p95_s": None}
+    assert report["jobs"][0]["name"] == "7"
+    assert report["slowest_steps"] == [
+        {"job": "7", "step": "x", "count": 1, "p50_s": None, "p95_s": None},
+    ]
+    assert history.report("o/r", "missing", last=5, top=5)["runs"] == 0
+    history.close()
+
+
+def test_default_db_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """The history lives in the shared user cache."""
+    monkeypatch.setenv("PIXI_DEVCONTAINER_CACHE", str(tmp_path))
+    assert run_history.default_db_path() == tmp_path / "gha" / "history.sqlite"
@@ -0,0 +1,203 @@
+"""Unit tests for subprocess accounting and the cost-aware scheduler."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from scripts.lib import procs, scheduler
+
+
+def test_run_measured_captures_output_and_usage() -> None:
+    """Combined output, exit code and CPU time come from the child itself."""
+    code = "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"
+    result = procs.run_measured([sys.executable, "-c", code])
+    expected_code = 3
+    assert result.returncode == expected_code
+    assert "out" in result.output
+    assert "err" in result.output
+    assert result.wall > 0
+    assert result.cpu == result.user + result.sys
+
+
+def test_stats_store_roundtrip_and_smoothing(tmp_path: Path) -> None:
+    """Observations are averaged and survive a save/load cycle."""
+    path = tmp_path / "stats.json"
+    store = scheduler.StatsStore(path)
+    store.record("a", wall=10.0, cpu=20.0)
+    store.record("a", wall=20.0, cpu=0.0)
+    store.save()
+    loaded = scheduler.StatsStore(path).get("a")
+    expected = scheduler.CheckStats(wall=15.0, cpu=10.0, runs=2)
+    assert loaded == expected
+
+
+def test_stats_store_ignores_corrupt_file(tmp_path: Path) -> None:
+    """Unreadable history starts empty."""
+    path = tmp_path / "stats.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert scheduler.StatsStore(path).get("a") is None
+
+
+def _scheduler(tmp_path: Path, cores: int, **stats: tuple[float, float]) -> scheduler.Scheduler:
+    store = scheduler.StatsStore(tmp_path / "stats.json")
+    for name, (wall, cpu) in stats.items():
+        store.record(name, wall, cpu)
+    return scheduler.Scheduler(store, cores)
+
+
+def test_order_longest_first_unknown_leading(tmp_path: Path) -> None:
+    """Unknown checks go first, then by descending expected duration."""
+    sched = _scheduler(tmp_path, 4, fast=(1.0, 1.0), slow=(9.0, 9.0))
+    checks = [("fast", 1), ("new", 2), ("slow", 3)]
+    assert [name for name, _ in sched.order(checks)] == ["new", "slow", "fast"]
+
+
+def test_tokens_reflect_cpu_usage(tmp_path: Path) -> None:
+    """I/O-bound checks bypass the budget; parallel tools hold several cores."""
+    sched = _scheduler(tmp_path, 4, io=(10.0, 1.0), single=(10.0, 9.0), wide=(10.0, 80.0))
+    assert sched.tokens("io") == 0
+    assert sched.tokens("single") == 1
+    expected_wide = 4
+    assert sched.tokens("wide") == expected_wide
+    assert sched.tokens("unknown") == 1
+
+
+def test_cpu_budget_limits_concurrency() -> None:
+    """No more than ``capacity`` tokens are ever held at once."""
+    budget = scheduler.CpuBudget(2)
+    peak = 0
+    active = 0
+    lock = threading.Lock()
+
+    def work() -> None:
+        nonlocal peak, active
+        with budget.reserve(1):
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak <= budget.capacity
+    assert budget.available == budget.capacity
+
+
+def test_cpu_budget_admits_by_priority() -> None:
+    """Waiting reservations are admitted highest priority first."""
+    budget = scheduler.CpuBudget(1)
+    order: list[str] = []
+    release = threading.Event()
+
+    def hold() -> None:
+        with budget.reserve(1, priority=100):
+            release.wait()
+
+    def wait_for(name: str, priority: float) -> None:
+        with budget.reserve(5, priority=priority):
+            order.append(name)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    while budget.available:
+        time.sleep(0.001)
+    waiters = [
+        threading.Thread(target=wait_for, args=("short", 1.0)),
+        threading.Thread(target=wait_for, args=("long", 50.0)),
+    ]
+    for thread in waiters:
+        thread.start()
+    while len(budget._waiting) < len(waiters):  # noqa: SLF001
+        time.sleep(0.001)
+    release.set()
+    for thread in [holder, *waiters]:
+        thread.join()
+    assert order == ["long", "short"]
+
+
+def test_zero_token_reservation_is_free() -> None:
+    """Light checks never block."""
+    budget = scheduler.CpuBudget(1)
+    with budget.reserve(0):
+        assert budget.available == 1
+
+
+def test_report_names_critical_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The last check to finish is reported as the critical path."""
+    sched = _scheduler(tmp_path, 2)
+    assert sched.report() == []
+    ticks = iter([0.0, 0.0, 5.0, 1.0, 4.0])
+    monkeypatch.setattr(scheduler.time, "monotonic", lambda: next(ticks))
+    sched = scheduler.Scheduler(sched.stats, 2)
+    with sched.slot("long"):
+        pass
+    with sched.slot("late"):
+        pass
+    lines = sched.report()
+    assert lines[0].startswith("Critical path: long")
+    assert "Lower bound: long ran 5.0s" in lines[1]
+
+
+def test_process_group_kill_stops_running_child() -> None:
+    """Killing the group terminates live children and refuses new ones."""
+    group = procs.ProcessGroup()
+    results: list[procs.Execution] = []
+    worker = threading.Thread(
+        target=lambda: results.append(procs.run_measured(["sleep", "30"], group)),
+    )
+    worker.start()
+    while not group._live:  # noqa: SLF001
+        time.sleep(0.001)
+    assert group.kill() == 1
+    worker.join(timeout=5)
+    assert results[0].returncode < 0
+    assert results[0].wall < 30  # noqa: PLR2004
+    with pytest.raises(procs.CancelledError):
+        procs.run_measured(["true"], group)
+
+
+def test_process_group_kill_tolerates_exited_child(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A child that exited between listing and signalling is skipped."""
+    group = procs.ProcessGroup()
+    proc = group.spawn(["true"])
+    proc.wait()
+
+    def gone(*_: object) -> None:
+        raise ProcessLookupError
+
+    monkeypatch.setattr(procs.os, "killpg", gone)
+    assert group.kill() == 1
+
+
+def test_scheduler_elapsed_tracks_running(tmp_path: Path) -> None:
+    """Running checks report elapsed time until they finish."""
+    sched = _scheduler(tmp_path, 1)
+    with sched.slot("busy"):
+        assert set(sched.elapsed()) == {"busy"}
+    assert sched.elapsed() == {}
+
+
+def test_run_measured_reports_peak_rss(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Peak RSS is normalised to kilobytes on macOS."""
+    linux = procs.run_measured([sys.executable, "-c", "pass"])
+    assert linux.max_rss_kb > 0
+    monkeypatch.setattr(procs.sys, "platform", "darwin")
+    darwin = procs.run_measured([sys.executable, "-c", "pass"])
+    assert darwin.max_rss_kb < linux.max_rss_kb
+
+
+def test_wall_clock(tmp_path: Path) -> None:
+    """Wall clock is the latest finish time (0 before anything ran)."""
+    sched = _scheduler(tmp_path, 1)
+    assert sched.wall_clock == 0.0
+    with sched.slot("a"):
+        pass
+    assert sched.wall_clock == sched.spans["a"].finished
@@ -0,0 +1,50 @@
+"""Unit tests for the toolchain/rest layer split."""
+
+import importlib.util
+import json
+from pathlib import Path
+
+# Loaded by path: ``docker`` is also the name of the docker-py package.
+_SPEC = importlib.util.spec_from_file_location(
+    "split_layers",
+    Path(__file__).resolve().parents[2] / "docker" / "split_layers.py",
+)
+assert _SPEC is not None
+assert _SPEC.loader is not None
+split_layers = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(split_layers)
+
+
+def _layer(out: Path, layer: str, src: Path) -> Path:
+    return out / layer / src.relative_to(src.anchor)
+
+
+def test_split_keeps_directory_symlinks_and_empty_directories(tmp_path: Path) -> None:
+    """Directory symlinks, empty directories and directory modes survive the split."""
+    prefix = tmp_path / "app" / ".pixi" / "envs" / "default"
+    record = prefix / "conda-meta" / "gcc-14.json"
+    record.parent.mkdir(parents=True)
+    record.write_text(
+        json.dumps({"name": "gcc", "files": ["lib/libgcc_s.so"]}),
+        encoding="utf-8",
+    )
+    (prefix / "lib").mkdir()
+    (prefix / "lib" / "libgcc_s.so").write_bytes(b"gcc")
+    (prefix / "lib" / "libz.so").write_bytes(b"zlib")
+    (prefix / "lib64").symlink_to("lib")
+    (prefix / "var" / "empty").mkdir(parents=True)
+    (prefix / "var" / "empty").chmod(0o750)
+    out = tmp_path / "layers"
+
+    sizes = split_layers.split(tmp_path / "app" / ".pixi", out)
+
+    assert _layer(out, "toolchain", prefix / "lib" / "libgcc_s.so").read_bytes() == b"gcc"
+    assert _layer(out, "rest", prefix / "lib" / "libz.so").read_bytes() == b"zlib"
+    link = _layer(out, "rest", prefix / "lib64")
+    assert link.is_symlink()
+    assert link.readlink() == Path("lib")
+    empty = _layer(out, "rest", prefix / "var" / "empty")
+    assert empty.is_dir()
+    assert not any(empty.iterdir())
+    assert empty.stat().st_mode & 0o777 == 0o750  # noqa: PLR2004
+    assert sizes["toolchain"] == len(b"gcc") + record.stat().st_size
@@ -0,0 +1,197 @@
+"""Unit tests for the pinned tool binary cache."""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from scripts.lib import tool_cache
+
+KEY = ("Linux", "x86_64")
+CONTENT = b"#!/bin/sh\necho tool\n"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def spec(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> tool_cache.ToolSpec:
+    """Register a fake pinned tool and isolate the cache directory."""
+    monkeypatch.setenv("PIXI_DEVCONTAINER_CACHE", str(tmp_path / "cache"))
+    monkeypatch.delenv(tool_cache.SEED_DIR_ENV, raising=False)
+    monkeypatch.setattr(tool_cache, "platform_key", lambda: KEY)
+    pinned = tool_cache.ToolSpec(
+        name="demo",
+        version="v1",
+        urls={KEY: "https://example.invalid/demo-Linux-x86_64"},
+    )
+    monkeypatch.setitem(tool_cache.PINNED_TOOLS, "demo", pinned)
+    return pinned
+
+
+def _no_network(monkeypatch: pytest.MonkeyPatch) -> None:
+    def offline(url: str, dest: Path) -> bool:
+        pytest.fail(f"network used for {url} -> {dest}")
+
+    monkeypatch.setattr(tool_cache, "download", offline)
+
+
+def test_parse_sha256() -> None:
+    """Accept `sha256sum`-style sidecars and reject garbage."""
+    assert tool_cache.parse_sha256(f"{DIGEST.upper()}  demo\n") == DIGEST
+    assert tool_cache.parse_sha256("nope") is None
+
+
+def test_seed_from_directory_with_sidecar(
+    spec: tool_cache.ToolSpec,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Seeded assets are verified, installed executable and reused offline."""
+    seed = tmp_path / "seed"
+    seed.mkdir()
+    (seed / "demo-Linux-x86_64").write_bytes(CONTENT)
+    (seed / "demo-Linux-x86_64.sha256").write_text(f"{DIGEST}  demo-Linux-x86_64\n")
+    _no_network(monkeypatch)
+    monkeypatch.setenv(tool_cache.SEED_DIR_ENV, str(seed))
+
+    binary = tool_cache.ensure_tool("demo")
+    assert binary is not None
+    assert binary == tool_cache.tool_dir(spec, KEY) / "demo"
+    assert binary.read_bytes() == CONTENT
+    assert binary.stat().st_mode & 0o111
+
+    monkeypatch.delenv(tool_cache.SEED_DIR_ENV)
+    assert tool_cache.ensure_tool("demo") == binary
+
+
+def test_seed_rejects_bad_or_unverifiable_assets(
+    spec: tool_cache.ToolSpec,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Checksum mismatches and assets without any checksum are not installed."""
+    seed = tmp_path / "seed"
+    seed.mkdir()
+    (seed / "demo").write_bytes(CONTENT)
+    assert tool_cache.seed_from(spec, KEY, seed) is None
+
+    monkeypatch.setitem(spec.sha256, KEY, "0" * 64)
+    assert tool_cache.seed_from(spec, KEY, seed) is None
+    assert tool_cache.cached_binary(spec, KEY) is None
+
+
+def test_fetch_with_pinned_digest(
+    spec: tool_cache.ToolSpec,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Pinned digests skip the sidecar download."""
+    monkeypatch.setitem(spec.sha256, KEY, DIGEST)
+    urls: list[str] = []
+
+    def fake_download(url: str, dest: Path) -> bool:
+        urls.append(url)
+        dest.write_bytes(CONTENT)
+        return True
+
+    monkeypatch.setattr(tool_cache, "download", fake_download)
+    assert tool_cache.ensure_tool("demo") is not None
+    assert urls == [spec.urls[KEY]]
+
+
+def test_fetch_rejects_pinned_digest_mismatch(
+    spec: tool_cache.ToolSpec,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """A download that does not match the pinned digest is never installed."""
+    monkeypatch.setitem(spec.sha256, KEY, "0" * 64)
+
+    def fake_download(url: str, dest: Path) -> bool:
+        dest.write_text(f"{DIGEST}\n" if url.endswith(".sha256") else "tampered")
+        return True
+
+    monkeypatch.setattr(tool_cache, "download", fake_download)
+    assert tool_cache.ensure_tool("demo") is None
+    assert not (tool_cache.tool_dir(spec, KEY) / "demo").exists()
+    assert "Checksum mismatch" in caplog.text
+
+
+def test_hadolint_pins_every_platform() -> None:
+    """Every hadolint asset is pinned; Apple silicon reuses the x86_64 asset and digest."""
+    hadolint = tool_cache.PINNED_TOOLS["hadolint"]
+    assert set(hadolint.sha256) == set(hadolint.urls)
+    assert all(tool_cache.parse_sha256(digest) == digest for digest in hadolint.sha256.values())
+    assert hadolint.urls[("Darwin", "arm64")] == hadolint.urls[("Darwin", "x86_64")]
+    assert hadolint.sha256[("Darwin", "arm64")] == hadolint.sha256[("Darwin", "x86_64")]
+
+
+def test_fetch_failures(spec: tool_cache.ToolSpec, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Missing assets, sidecars or digests leave nothing cached."""
+    monkeypatch.setattr(tool_cache, "download", lambda *_: False)
+    assert tool_cache.fetch(spec, KEY) is None
+
+    def binary_only(url: str, dest: Path) -> bool:
+        dest.write_bytes(CONTENT)
+        return not url.endswith(".sha256")
+
+    monkeypatch.setattr(tool_cache, "download", binary_only)
+    assert tool_cache.fetch(spec, KEY) is None
+
+    def garbage_sidecar(_url: str, dest: Path) -> bool:
+        dest.write_bytes(b"not a digest")
+        return True
+
+    monkeypatch.setattr(tool_cache, "download", garbage_sidecar)
+    assert tool_cache.fetch(spec, KEY) is None
+    assert not (tool_cache.tool_dir(spec, KEY) / ".download").exists()
+
+
+def test_corrupt_cache_entry_is_discarded(
+    spec: tool_cache.ToolSpec,
+    tmp_path: Path,
+) -> None:
+    """A cached binary that no longer matches its checksum is removed with its record."""
+    seed = tmp_path / "seed"
+    seed.mkdir()
+    (seed / "demo").write_bytes(CONTENT)
+    (seed / "demo.sha256").write_text(DIGEST)
+    binary = tool_cache.seed_from(spec, KEY, seed)
+    assert binary is not None
+    record = binary.with_name("demo.sha256")
+    assert record.is_file()
+    binary.write_bytes(b"tampered")
+    assert tool_cache.cached_binary(spec, KEY) is None
+    assert not binary.exists()
+    assert not record.exists()
+
+
+def test_ensure_tool_unknown(spec: tool_cache.ToolSpec, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unknown tools and unsupported platforms resolve to None."""
+    assert tool_cache.ensure_tool("unknown") is None
+    monkeypatch.setattr(tool_cache, "platform_key", lambda: ("Plan9", "mips"))
+    assert tool_cache.ensure_tool(spec.name) is None
+
+
+def test_download_wraps_curl(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Curl failures are reported as False."""
+    dest = tmp_path / "out"
+
+    def fake_run(cmd: list[str], *, check: bool) -> None:
+        _ = check
+        Path(cmd[3]).write_text("x")
+
+    monkeypatch.setattr(tool_cache.subprocess, "run", fake_run)
+    assert tool_cache.download("https://example.invalid/x", dest) is True
+
+    def boom(*_: object, **__: object) -> None:
+        raise OSError
+
+    monkeypatch.setattr(tool_cache.subprocess, "run", boom)
+    assert tool_cache.download("https://example.invalid/x", tmp_path / "other") is False
+
+
+def test_platform_key() -> None:
+    """Platform key mirrors the platform module."""
+    assert tool_cache.platform_key() == (
+        tool_cache.platform.system(),
+        tool_cache.platform.machine(),
+    )
@@ -0,0 +1,229 @@
+"""Unit tests for devcontainer validation helpers that do not need docker."""
+
+import json
+import subprocess
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from scripts import validate_container
+
+BAKE = """
+target "image" {
+  matrix = {
+    os  = ["focal", "noble"]
+    env = ["stable", "edge"]
+  }
+}
+"""
+
+
+def test_load_variants_default_matrix() -> None:
+    """The repository's bake file yields every os x env variant, in matrix order."""
+    variants = validate_container.load_variants()
+    assert [v.name for v in variants] == ["focal-stable", "noble-stable"]
+    assert validate_container.DEFAULT_VARIANT in variants
+    assert {v.platform for v in variants} == {"linux-64"}
+
+
+def test_load_variants_selects_names(tmp_path: Path) -> None:
+    """Requested names come back in the order given."""
+    bake = tmp_path / "docker-bake.hcl"
+    bake.write_text(BAKE, encoding="utf-8")
+    assert len(validate_container.load_variants(bake)) == 4  # noqa: PLR2004
+    selected = validate_container.load_variants(bake, ["noble-edge", "focal-stable"])
+    assert selected == [
+        validate_container.Variant(os="noble", env="edge"),
+        validate_container.Variant(os="focal", env="stable"),
+    ]
+
+
+def test_load_variants_rejects_unknown_name(tmp_path: Path) -> None:
+    """Unknown names fail with the variants the matrix does define."""
+    bake = tmp_path / "docker-bake.hcl"
+    bake.write_text(BAKE, encoding="utf-8")
+    with pytest.raises(ValueError, match=r"Unknown variant.*jammy-stable.*noble-stable"):
+        validate_container.load_variants(bake, ["noble-stable", "jammy-stable"])
+    bake.write_text('target "image" {}\n', encoding="utf-8")
+    assert validate_container.load_variants(bake) == []
+    with pytest.raises(ValueError, match="defines none"):
+        validate_container.load_variants(bake, ["noble-stable"])
+
+
+def test_parse_tool_output_normal_and_failures() -> None:
+    """The first output line is the version; exit codes and mismatches are failures."""
+    ok = validate_container.parse_tool_output(
+        "gcc",
+        "gcc",
+        0,
+        "gcc (conda) 14.2.0\nCopyright\n",
+        0.5,
+    )
+    assert ok.success
+    assert ok.version == "gcc (conda) 14.2.0"
+    assert ok.output == "gcc (conda) 14.2.0\nCopyright\n"
+    assert ok.latency == 0.5  # noqa: PLR2004
+
+    missing = validate_container.parse_tool_output(
+        "ld.lld",
+        "LLD",
+        127,
+        "exec: ld.lld: not found\n",
+    )
+    assert not missing.success
+    assert missing.exit_code == 127  # noqa: PLR2004
+    assert missing.error == "exec: ld.lld: not found"
+
+    wrong = validate_container.parse_tool_output("clang", "clang version", 0, "Apple LLVM 15\n")
+    assert not wrong.success
+    assert wrong.error == "unexpected version string"
+    assert validate_container.parse_tool_output("ninja", "", 0, "1.12.1\n").success
+
+
+def _probe_stdout(monkeypatch: pytest.MonkeyPatch, stdout: str, returncode: int = 0) -> None:
+    monkeypatch.setattr(
+        validate_container,
+        "run_cmd",
+        lambda cmd, **_: subprocess.CompletedProcess(cmd, returncode, stdout=stdout, stderr=""),
+    )
+
+
+def test_probe_tools_parses_records_and_skips_noise(monkeypatch: pytest.MonkeyPatch) -> None:
+    """One JSON record per line; lines without the record shape are ignored."""
+    gcc = {"tool": "gcc", "returncode": 0, "output": "gcc 14\n", "seconds": 0.01}
+    cmake = {"tool": "cmake", "returncode": 127, "output": "No such file", "seconds": 0.0}
+    _probe_stdout(
+        monkeypatch,
+        "\n".join(
+            [
+                json.dumps(gcc),
+                "gcc 14 | 0 | no json delimiter",
+                '{"tool": "clang", "returncode": 0',
+                json.dumps(["ninja", 0, "1.12"]),
+                json.dumps({"tool": "python", "output": "Python 3.12"}),
+                json.dumps(cmake),
+            ],
+        ),
+    )
+    assert validate_container.probe_tools("cid") == {"gcc": gcc, "cmake": cmake}
+
+    _probe_stdout(monkeypatch, "", returncode=126)
+    assert validate_container.probe_tools("cid") is None
+
+
+def test_validate_tools_reports_unprobed_tools(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tools missing from the batched probe fail; a failed probe falls back per tool."""
+    monkeypatch.setattr(validate_container, "console", SimpleNamespace(print=lambda *_: None))
+    gcc = {"tool": "gcc", "returncode": 0, "output": "gcc 14\n", "seconds": 0.25}
+    monkeypatch.setattr(validate_container, "probe_tools", lambda _cid: {"gcc": gcc})
+    results = {r.name: r for r in validate_container.validate_tools("cid")}
+    assert results["gcc"].success
+    assert results["gcc"].latency == 0.25  # noqa: PLR2004
+    assert results["cmake"].error == "no probe output"
+    assert len(results) == len(validate_container.EXPECTED_TOOLS)
+
+    monkeypatch.setattr(validate_container, "probe_tools", lambda _cid: None)
+    monkeypatch.setattr(
+        validate_container,
+        "get_tool_version",
+        lambda _cid, tool, _args, _expected: validate_container.ToolResult(tool, "v", success=True),
+    )
+    assert all(r.success for r in validate_container.validate_tools("cid"))
+
+
+def _reports() -> list[validate_container.VariantReport]:
+    noble = validate_container.Variant(os="noble", env="stable")
+    focal = validate_container.Variant(os="focal", env="stable")
+    return [
+        validate_container.VariantReport(
+            variant=noble,
+            results=[
+                validate_container.ToolResult(
+                    "gcc",
+                    "gcc 14",
+                    success=True,
+                    variant=noble.name,
+                    exit_code=0,
+                    latency=0.25,
+                    output="gcc 14\n",
+                ),
+                validate_container.ToolResult(
+                    "clang",
+                    "",
+                    success=False,
+                    error='error: <stdin> & "quotes"\nmore',
+                    variant=noble.name,
+                    exit_code=1,
+                    latency=0.5,
+                    output='error: <stdin> & "quotes" ]]> done',
+                ),
+            ],
+            config_hash="abc",
+            image_id="sha256:img",
+            container_id="cid",
+            metadata={"org.opencontainers.image.revision": "deadbeef"},
+        ),
+        validate_container.VariantReport(
+            variant=focal,
+            results=[validate_container.failure_row(focal, "<build>", "build failed")],
+        ),
+    ]
+
+
+def test_results_payload_serializes_everything() -> None:
+    """The JSON document keeps full output, exit codes, latency and image metadata."""
+    payload = json.loads(json.dumps(validate_container.results_payload(_reports())))
+    assert payload["success"] is False
+    noble, focal = payload["variants"]
+    assert noble["variant"] == "noble-stable"
+    assert noble["image"] == "cpp-devcontainer:validation-noble-stable"
+    assert noble["image_id"] == "sha256:img"
+    assert noble["config_hash"] == "abc"
+    assert noble["metadata"] == {"org.opencontainers.image.revision": "deadbeef"}
+    assert noble["tools"][1] == {
+        "name": "clang",
+        "version": "",
+        "success": False,
+        "error": 'error: <stdin> & "quotes"\nmore',
+        "exit_code": 1,
+        "latency": 0.5,
+        "output": 'error: <stdin> & "quotes" ]]> done',
+    }
+    assert focal["tools"][0]["exit_code"] is None
+    assert focal["config_hash"] is None
+
+
+def test_junit_xml_escapes_failures_and_omits_unknown_exit_codes(tmp_path: Path) -> None:
+    """Failure text survives XML escaping; rows that never ran have no exit code line."""
+    output = tmp_path / "out" / "results.xml"
+    validate_container.write_structured(_reports(), "junit", output)
+    text = output.read_text(encoding="utf-8")
+    assert text.startswith('<?xml version="1.0" encoding="utf-8"?>\n<testsuites')
+    assert "&lt;stdin&gt; &amp;" in text
+    root = ET.fromstring(text)  # noqa: S314 - parsing our own output
+    noble, focal = root.findall("testsuite")
+    assert noble.attrib == {
+        "name": "noble-stable",
+        "tests": "2",
+        "failures": "1",
+        "time": "0.750",
+    }
+    properties = {p.get("name"): p.get("value") for p in noble.iter("property")}
+    assert properties["image_id"] == "sha256:img"
+    assert properties["org.opencontainers.image.revision"] == "deadbeef"
+    failure = noble.find("testcase[@name='clang']/failure")
+    assert failure is not None
+    assert failure.get("message") == 'error: <stdin> & "quotes"'
+    assert failure.text == 'exit code: 1\nerror: <stdin> & "quotes" ]]> done'
+    assert noble.find("testcase[@name='gcc']/failure") is None
+    build = focal.find("testcase/failure")
+    assert build is not None
+    assert build.text == "build failed"
+
+
+def test_write_structured_json_to_stdout(capsys: pytest.CaptureFixture[str]) -> None:
+    """Without --output the document goes to stdout."""
+    validate_container.write_structured(_reports(), "json", None)
+    assert json.loads(capsys.readouterr().out)["variants"][1]["variant"] == "focal-stable"
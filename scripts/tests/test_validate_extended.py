@@ -1,11 +1,17 @@
 """Extended unit tests for validate module."""
 
+import hashlib
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from types import SimpleNamespace
 
 import pytest
 
 from scripts import validate
+from scripts.lib import tool_cache
+from scripts.lib.procs import Execution, ProcessGroup
+from scripts.lib.scheduler import Scheduler, StatsStore
 
 
 def test_ensure_hadolint_present(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -14,44 +20,56 @@ def test_ensure_hadolint_present(monkeypatch: pytest.MonkeyPatch) -> None:
     assert validate.ensure_hadolint() is True
 
 
-def test_ensure_hadolint_download_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
-    """Download hadolint successfully when missing."""
+def _pin_platform(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    system: str,
+    machine: str,
+) -> None:
     monkeypatch.setattr(validate.shutil, "which", lambda _: False)
-    monkeypatch.setattr(validate.platform, "system", lambda: "Linux")
-    monkeypatch.setattr(validate.platform, "machine", lambda: "x86_64")
+    monkeypatch.setattr(tool_cache.platform, "system", lambda: system)
+    monkeypatch.setattr(tool_cache.platform, "machine", lambda: machine)
+    monkeypatch.setenv("PIXI_DEVCONTAINER_CACHE", str(tmp_path))
+    monkeypatch.delenv(tool_cache.SEED_DIR_ENV, raising=False)
+    monkeypatch.setenv("PATH", "/usr/bin")
 
-    called = {"ran": False}
 
-    def fake_run(cmd: list[str] | str, *, check: bool = True) -> SimpleNamespace:
+def test_ensure_hadolint_download_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Download and verify hadolint when missing, then resolve it offline."""
+    _pin_platform(monkeypatch, tmp_path, "Linux", "x86_64")
+
+    pinned = tool_cache.PINNED_TOOLS["hadolint"].sha256
+    monkeypatch.setitem(pinned, ("Linux", "x86_64"), hashlib.sha256(b"bin").hexdigest())
+    called: list[str] = []
+
+    def fake_run(cmd: list[str], *, check: bool = True) -> SimpleNamespace:
         _ = check
-        called["ran"] = True
-        dest = Path(cmd[-1]) if isinstance(cmd, list) else None
-        if dest:
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            dest.write_text("bin")
+        called.append(cmd[-1])
+        Path(cmd[3]).write_bytes(b"bin")
         return SimpleNamespace(returncode=0)
 
-    monkeypatch.setattr(validate.subprocess, "run", fake_run)
-    monkeypatch.setattr(validate.tempfile, "gettempdir", lambda: str(tmp_path))
+    monkeypatch.setattr(tool_cache.subprocess, "run", fake_run)
+
+    assert validate.ensure_hadolint() is True
+    assert called == [tool_cache.PINNED_TOOLS["hadolint"].urls[("Linux", "x86_64")]]
+    assert "tools/hadolint/v2.12.0/Linux-x86_64" in validate.os.environ["PATH"]
 
+    monkeypatch.setattr(tool_cache.subprocess, "run", lambda *_, **__: pytest.fail("network"))
     assert validate.ensure_hadolint() is True
-    assert called["ran"] is True
 
 
 def test_ensure_hadolint_download_failure(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     """Handle hadolint download failure gracefully."""
-    monkeypatch.setattr(validate.shutil, "which", lambda _: False)
-    monkeypatch.setattr(validate.platform, "system", lambda: "Linux")
-    monkeypatch.setattr(validate.platform, "machine", lambda: "x86_64")
+    _pin_platform(monkeypatch, tmp_path, "Linux", "x86_64")
 
     def fake_run(cmd: list[str] | str, *, check: bool = True) -> SimpleNamespace:
         _ = check
         raise validate.subprocess.CalledProcessError(1, cmd)
 
-    monkeypatch.setattr(validate.subprocess, "run", fake_run)
-    monkeypatch.setattr(validate.tempfile, "gettempdir", lambda: str(tmp_path))
+    monkeypatch.setattr(tool_cache.subprocess, "run", fake_run)
 
     assert validate.ensure_hadolint() is False
+    assert validate.os.environ["PATH"] == "/usr/bin"
 
 
 def test_list_shell_scripts_filters(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -89,11 +107,9 @@ def test_build_checks_without_shells(monkeypatch: pytest.MonkeyPatch) -> None:
     assert names[-1] == "Semgrep"
 
 
-def test_ensure_hadolint_unknown_platform(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_ensure_hadolint_unknown_platform(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     """Return False when platform is unsupported."""
-    monkeypatch.setattr(validate.shutil, "which", lambda _: False)
-    monkeypatch.setattr(validate.platform, "system", lambda: "Other")
-    monkeypatch.setattr(validate.platform, "machine", lambda: "Foo")
+    _pin_platform(monkeypatch, tmp_path, "Other", "Foo")
     assert validate.ensure_hadolint() is False
 
 
@@ -112,7 +128,7 @@ def test_run_check_exception(monkeypatch: pytest.MonkeyPatch) -> None:
         msg = "boom"
         raise ValueError(msg)
 
-    monkeypatch.setattr(validate.subprocess, "run", boom)
+    monkeypatch.setattr(validate, "run_measured", boom)
     monkeypatch.setattr(validate.shutil, "which", lambda _: True)
     success, _name, out = validate.run_check(("Other", ["tool"]))
     assert success is False
@@ -123,18 +139,154 @@ def test_run_check_success(monkeypatch: pytest.MonkeyPatch) -> None:
     """Return success when command exits 0."""
     monkeypatch.setattr(validate.shutil, "which", lambda _: True)
 
-    def fake_run(
-        cmd: list[str] | str,
-        *,
-        check: bool = False,
-        capture_output: bool = True,
-        text: bool = True,
-        **kwargs: object,
-    ) -> SimpleNamespace:
-        _ = (cmd, check, capture_output, text, kwargs)
-        return SimpleNamespace(returncode=0, stdout="ok", stderr="")
-
-    monkeypatch.setattr(validate.subprocess, "run", fake_run)
+    def fake_run(cmd: list[str], group: ProcessGroup | None = None) -> Execution:
+        _ = (cmd, group)
+        return Execution(returncode=0, output="ok", wall=0.1, user=0.0, sys=0.0)
+
+    monkeypatch.setattr(validate, "run_measured", fake_run)
     success, _, out = validate.run_check(("ok", ["echo", "x"]))
     assert success is True
     assert "ok" in out
+
+
+def test_select_checks_python_change_skips_infra(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """A Python-only change skips Dockerfile, workflow and TOML linters."""
+    monkeypatch.setattr(validate, "list_shell_scripts", list)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "scripts").mkdir()
+    (tmp_path / "scripts" / "build.py").write_text("x = 1\n", encoding="utf-8")
+    selected = dict(validate.select_checks(validate.build_checks(), ["scripts/build.py"]))
+
+    for skipped in ["Hadolint", "Checkov (Sec)", "Actionlint", "Zizmor (GHA)", "Taplo (TOML)"]:
+        assert skipped not in selected
+    assert selected["Ruff Lint"] == ["ruff", "check", "--force-exclude", "scripts/build.py"]
+    assert selected["Tests & Coverage"] == ["pytest", "--cov=scripts", "scripts/tests"]
+
+
+def test_select_checks_config_change_runs_full_commands(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A tool config change runs the full commands instead of narrowing to the config file."""
+    monkeypatch.setattr(validate, "list_shell_scripts", list)
+    checks = validate.build_checks()
+    full = dict(checks)
+    selected = dict(validate.select_checks(checks, ["pyproject.toml"]))
+    assert selected["Ruff Lint"] == full["Ruff Lint"] == ["ruff", "check", "."]
+    assert selected["Ruff Format"] == full["Ruff Format"]
+    assert selected["Typos"] == full["Typos"]
+
+    selected = dict(validate.select_checks(checks, [".yamllint.yml", ".github/workflows/ci.yml"]))
+    assert selected["Yamllint"] == full["Yamllint"]
+
+
+def test_select_checks_narrows_to_tool_extensions(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Narrowed commands only receive files with the tool's own extensions."""
+    monkeypatch.setattr(validate, "list_shell_scripts", list)
+    monkeypatch.chdir(tmp_path)
+    changed = [".devcontainer/Dockerfile", ".devcontainer/compose.yaml", "scripts/build.py"]
+    for path in changed:
+        (tmp_path / path).parent.mkdir(exist_ok=True)
+        (tmp_path / path).write_text("x\n", encoding="utf-8")
+    selected = dict(validate.select_checks(validate.build_checks(), changed))
+
+    assert selected["Yamllint"] == ["yamllint", ".devcontainer/compose.yaml"]
+    assert selected["Ruff Lint"] == ["ruff", "check", "--force-exclude", "scripts/build.py"]
+    assert selected["Typos"] == ["typos", "--force-exclude", *changed]
+    dockerfile_only = validate.select_checks(validate.build_checks(), changed[:1])
+    assert "Yamllint" not in dict(dockerfile_only)
+
+
+def test_select_checks_environment_change_runs_tests(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Docker and pixi environment changes re-run the test suite; lockfile changes re-run ty."""
+    monkeypatch.setattr(validate, "list_shell_scripts", list)
+    checks = validate.build_checks()
+    for changed in ["docker/render_env.py", "pixi.toml", "pixi.lock", ".dockerignore"]:
+        assert "Tests & Coverage" in dict(validate.select_checks(checks, [changed]))
+    assert "Astral Ty" in dict(validate.select_checks(checks, ["pixi.lock"]))
+
+
+def test_select_checks_keeps_unknown_and_deleted(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unknown checks always run; deleted inputs fall back to the full command."""
+    monkeypatch.setattr(validate.Path, "is_file", lambda _self: False)
+    checks = [("Custom", ["tool"]), ("Ruff Lint", ["ruff", "check", "."])]
+    assert validate.select_checks(checks, ["gone.py"]) == checks
+
+
+def test_merge_base_falls_back(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Try origin/main then main; return None when neither resolves."""
+    tried: list[str] = []
+
+    def fake_check_output(cmd: list[str], **_: object) -> str:
+        tried.append(cmd[-1])
+        if cmd[-1] == "main":
+            return "abc\n"
+        raise validate.subprocess.CalledProcessError(1, cmd)
+
+    monkeypatch.setattr(validate.subprocess, "check_output", fake_check_output)
+    assert validate.merge_base() == "abc"
+    assert tried == ["origin/main", "main"]
+    assert validate.merge_base("feature") is None
+
+
+def test_changed_files(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Merge diff and untracked listings."""
+    outputs = iter(["b.py\na.py\n", "a.py\nnew.toml\n"])
+    monkeypatch.setattr(validate.subprocess, "check_output", lambda *_, **__: next(outputs))
+    assert validate.changed_files("abc") == ["a.py", "b.py", "new.toml"]
+
+
+def _futures(
+    exe: ThreadPoolExecutor,
+    results: dict[str, tuple[bool, float]],
+) -> dict[Future[tuple[bool, str, str]], str]:
+    def run(name: str) -> tuple[bool, str, str]:
+        success, delay = results[name]
+        time.sleep(delay)
+        return success, name, "out"
+
+    return {exe.submit(run, name): name for name in results}
+
+
+def test_collect_results_reports_all(
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Without fail-fast every result is reported as it completes."""
+    scheduler = Scheduler(StatsStore(tmp_path / "s.json"), 2)
+    caplog.set_level("INFO")
+    with ThreadPoolExecutor() as exe:
+        futures = _futures(exe, {"slow": (True, 0.05), "bad": (False, 0.0)})
+        assert validate.collect_results(futures, scheduler, ProcessGroup()) is True
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages.index("FAIL bad:\nout") < messages.index("PASS slow")
+
+
+def test_collect_results_fail_fast_cancels(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Fail-fast kills the group, cancels queued checks and logs progress."""
+    monkeypatch.setattr(validate, "PROGRESS_INTERVAL", 0.01)
+    scheduler = Scheduler(StatsStore(tmp_path / "s.json"), 1)
+    group = ProcessGroup()
+    caplog.set_level("INFO")
+    with ThreadPoolExecutor(max_workers=1) as exe:
+        futures = _futures(exe, {"bad": (False, 0.05), "queued": (True, 0.0)})
+        assert validate.collect_results(futures, scheduler, group, fail_fast=True) is True
+    assert group.closed is True
+    messages = [r.getMessage() for r in caplog.records]
+    assert "CANCELLED queued" in messages
+    assert any(m.startswith("Still running") for m in messages)
+
+
+def test_collect_results_fail_fast_ignores_late_results(tmp_path: Path) -> None:
+    """Results finishing after the abort are reported as cancelled, not failures."""
+    scheduler = Scheduler(StatsStore(tmp_path / "s.json"), 2)
+    with ThreadPoolExecutor() as exe:
+        futures = _futures(exe, {"bad": (False, 0.0), "late": (False, 0.05)})
+        assert validate.collect_results(futures, scheduler, ProcessGroup(), fail_fast=True)
@@ -1,27 +1,25 @@
 """Unit tests for validate module helpers."""
 
+from pathlib import Path
 from types import SimpleNamespace
 
 import pytest
 
 from scripts import validate
+from scripts.lib.cache import ResultCache
+from scripts.lib.procs import Execution, ProcessGroup
+from scripts.lib.scheduler import CheckStats, Scheduler, StatsStore
 
 
 def test_run_check_pass(monkeypatch: pytest.MonkeyPatch) -> None:
     """Validate a passing check returns success."""
     monkeypatch.setattr(validate.shutil, "which", lambda _: True)
 
-    def fake_run(
-        cmd: list[str] | str,
-        *,
-        check: bool = False,
-        capture_output: bool = True,
-        text: bool = True,
-    ) -> SimpleNamespace:
-        _ = (cmd, check, capture_output, text)
-        return SimpleNamespace(returncode=0, stdout="ok", stderr="")
-
-    monkeypatch.setattr(validate.subprocess, "run", fake_run)
+    def fake_run(cmd: list[str], group: ProcessGroup | None = None) -> Execution:
+        _ = (cmd, group)
+        return Execution(returncode=0, output="ok", wall=0.1, user=0.0, sys=0.0)
+
+    monkeypatch.setattr(validate, "run_measured", fake_run)
     success, name, out = validate.run_check(("ok", ["echo"]))
     assert success is True
     assert name == "ok"
@@ -44,3 +42,96 @@ def test_run_check_semgrep_missing(monkeypatch: pytest.MonkeyPatch) -> None:
     assert success is True
     assert name == "Semgrep"
     assert "semgrep missing" in out
+
+
+def test_run_check_replays_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """A second run with unchanged inputs replays the stored result."""
+    monkeypatch.setattr(validate.shutil, "which", lambda _: "/bin/tool")
+    monkeypatch.setattr(validate, "tool_version", lambda _: "tool 1.0")
+    monkeypatch.setattr(validate, "repo_files", lambda: ("a.py",))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+    calls: list[list[str]] = []
+
+    def fake_run(cmd: list[str], _group: ProcessGroup | None = None) -> Execution:
+        calls.append(cmd)
+        return Execution(returncode=1, output="lint error", wall=0.1, user=0.0, sys=0.0)
+
+    monkeypatch.setattr(validate, "run_measured", fake_run)
+    store = ResultCache(tmp_path / "cache")
+    check = ("Ruff Lint", ["ruff", "check", "."])
+    assert validate.run_check(check, cache=store) == (False, "Ruff Lint", "lint error")
+    assert validate.run_check(check, cache=store) == (False, "Ruff Lint", "lint error")
+    assert len(calls) == 1
+
+    (tmp_path / "a.py").write_text("x = 2\n", encoding="utf-8")
+    validate.run_check(check, cache=store)
+    assert len(calls) == 2  # noqa: PLR2004
+
+
+def test_check_cache_key_skips_uncacheable(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Remote-backed and unknown checks are never cached."""
+    monkeypatch.setattr(validate, "tool_version", lambda _: "v")
+    monkeypatch.setattr(validate, "repo_files", lambda: ("a.py", "docker/Dockerfile"))
+    assert validate.check_cache_key(("Semgrep", ["semgrep"])) is None
+    assert validate.check_cache_key(("Custom", ["tool"])) is None
+    assert validate.check_cache_key(("Hadolint", ["hadolint"])) is not None
+
+
+def test_matching_files() -> None:
+    """Patterns match nested paths."""
+    files = ("a.py", "scripts/lib/b.py", "docker/Dockerfile")
+    assert validate.matching_files(("*.py",), files) == ["a.py", "scripts/lib/b.py"]
+
+
+def test_repo_files(monkeypatch: pytest.MonkeyPatch) -> None:
+    """List tracked and untracked files, falling back to empty on git errors."""
+    validate.repo_files.cache_clear()
+    monkeypatch.setattr(validate.subprocess, "check_output", lambda *_, **__: "b\na\n\n")
+    assert validate.repo_files() == ("a", "b")
+    validate.repo_files.cache_clear()
+
+    def boom(*_: object, **__: object) -> None:
+        raise validate.subprocess.CalledProcessError(1, ["git"])
+
+    monkeypatch.setattr(validate.subprocess, "check_output", boom)
+    assert validate.repo_files() == ()
+    validate.repo_files.cache_clear()
+
+
+def test_tool_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Combine tool path and version output; tolerate missing or broken tools."""
+    validate.tool_version.cache_clear()
+    monkeypatch.setattr(validate.shutil, "which", lambda tool: None if tool == "nope" else "/t")
+    monkeypatch.setattr(
+        validate.subprocess,
+        "run",
+        lambda *_, **__: SimpleNamespace(returncode=0, stdout="t 1.2\n", stderr=""),
+    )
+    assert validate.tool_version("nope") == ""
+    assert validate.tool_version("ok") == "/t\nt 1.2"
+
+    def boom(*_: object, **__: object) -> None:
+        raise OSError
+
+    monkeypatch.setattr(validate.subprocess, "run", boom)
+    assert validate.tool_version("broken") == "/t"
+    validate.tool_version.cache_clear()
+
+
+def test_run_check_records_with_scheduler(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Executed checks hold a scheduler slot and feed its stats."""
+    monkeypatch.setattr(validate.shutil, "which", lambda _: "/bin/tool")
+    monkeypatch.setattr(
+        validate,
+        "run_measured",
+        lambda _cmd, _group: Execution(returncode=0, output="", wall=2.0, user=3.0, sys=1.0),
+    )
+    scheduler = Scheduler(StatsStore(tmp_path / "stats.json"), cores=4)
+    validate.run_check(("Tool", ["tool"]), scheduler=scheduler)
+    assert scheduler.stats.get("Tool") == CheckStats(wall=2.0, cpu=4.0)
+    assert "Tool" in scheduler.spans
+    assert scheduler.executions["Tool"].wall == 2.0  # noqa: PLR2004
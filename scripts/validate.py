@@ -1,16 +1,31 @@
 #!/usr/bin/env python3
 """Run the full pre-push validation suite with zero tolerance for failures."""
 
+import argparse
+import contextlib
+import fnmatch
+import functools
+import json
 import logging
 import os
-import platform
 import shutil
 import subprocess
 import sys
-import tempfile
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 
+from scripts.lib.cache import DEFAULT_MAX_BYTES, CachedResult, ResultCache, user_cache_dir
+from scripts.lib.procs import ProcessGroup, run_measured
+from scripts.lib.profile_report import (
+    append_history,
+    build_report,
+    find_regressions,
+    load_history,
+    render_table,
+)
+from scripts.lib.scheduler import Scheduler, StatsStore
+from scripts.lib.tool_cache import SEED_DIR_ENV, ensure_tool
+
 logger = logging.getLogger(__name__)
 
 # 🛡️ STRICT QUALITY GATE
@@ -53,48 +68,91 @@ BASE_CHECKS: list[tuple[str, list[str]]] = [
     ("Tests & Coverage", ["pytest", "--cov=scripts", "scripts/tests"]),
 ]
 
-HADOLINT_URLS = {
-    (
-        "Linux",
-        "x86_64",
-    ): "https://github.com/hadolint/hadolint/releases/latest/download/hadolint-Linux-x86_64",
-    (
-        "Linux",
-        "aarch64",
-    ): "https://github.com/hadolint/hadolint/releases/latest/download/hadolint-Linux-arm64",
-    (
-        "Darwin",
-        "x86_64",
-    ): "https://github.com/hadolint/hadolint/releases/latest/download/hadolint-Darwin-x86_64",
-    (
-        "Darwin",
-        "arm64",
-    ): "https://github.com/hadolint/hadolint/releases/latest/download/hadolint-Darwin-arm64",
+# Repo paths (fnmatch patterns, "*" spans directories) each check reads.
+# Checks without an entry are never cached.
+CHECK_INPUTS: dict[str, tuple[str, ...]] = {
+    "Ruff Format": ("*.py", "pyproject.toml"),
+    "Ruff Lint": ("*.py", "pyproject.toml"),
+    "Astral Ty": ("scripts/*.py", "pyproject.toml", "pixi.lock"),
+    "Vulture (Dead Code)": ("scripts/*.py", "docker/*.py", "pyproject.toml"),
+    "Hadolint": ("docker/Dockerfile",),
+    "Actionlint": (".github/workflows/*",),
+    "Checkov (Sec)": ("docker/*",),
+    "Taplo (TOML)": ("pixi.toml", "pyproject.toml"),
+    "Yamllint": (
+        ".github/*.yml",
+        ".github/*.yaml",
+        ".devcontainer/*.yml",
+        ".devcontainer/*.yaml",
+        ".yamllint*",
+    ),
+    "Typos": ("*",),
+    "JSON Schema": (".devcontainer/devcontainer.json",),
+    "Zizmor (GHA)": (".github/workflows/*",),
+    "Tests & Coverage": (
+        "scripts/*",
+        "docker/*",
+        "pyproject.toml",
+        "pixi.toml",
+        "pixi.lock",
+        ".dockerignore",
+    ),
+    "ShellCheck": ("*.sh",),
+    "Semgrep": ("*",),
 }
 
+# Checks whose verdict depends on remote rules/schemas, not just local inputs.
+UNCACHEABLE_CHECKS = frozenset({"JSON Schema", "Semgrep"})
 
-def ensure_hadolint() -> bool:
-    """Install hadolint locally if not available on the platform."""
-    if shutil.which("hadolint"):
-        return True
+# Command prefixes for checks that accept an explicit file list in incremental mode.
+NARROWABLE_CHECKS: dict[str, list[str]] = {
+    "Ruff Format": ["ruff", "format", "--check", "--force-exclude"],
+    "Ruff Lint": ["ruff", "check", "--force-exclude"],
+    "Taplo (TOML)": ["taplo", "format", "--check"],
+    "Yamllint": ["yamllint"],
+    "Typos": ["typos", "--force-exclude"],
+    "ShellCheck": ["shellcheck"],
+    "Semgrep": [
+        "semgrep",
+        "scan",
+        "--error",
+        "--config",
+        "auto",
+    ],
+}
 
-    url = HADOLINT_URLS.get((platform.system(), platform.machine()))
-    if not url:
-        return False
+# Files a narrowable check lints; other changed inputs never become its arguments.
+NARROWABLE_FILES: dict[str, tuple[str, ...]] = {
+    "Ruff Format": ("*.py",),
+    "Ruff Lint": ("*.py",),
+    "Taplo (TOML)": ("*.toml",),
+    "Yamllint": ("*.yml", "*.yaml"),
+    "Typos": ("*",),
+    "ShellCheck": ("*.sh",),
+    "Semgrep": ("*",),
+}
 
-    dest_dir = Path(tempfile.gettempdir()) / "hadolint-bin"
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    dest = dest_dir / "hadolint"
+# Tool configuration: a change can alter verdicts for unchanged files, so the
+# checks it feeds run in full instead of on the changed files only.
+CONFIG_INPUTS = ("pyproject.toml", "pixi.toml", ".yamllint*", ".typos.toml")
 
-    try:
-        subprocess.run(["curl", "-sSL", "-o", str(dest), url], check=True)  # noqa: S603,S607
-        dest.touch(exist_ok=True)
-        dest.chmod(0o755)
-    except subprocess.CalledProcessError:
-        # Leave PATH untouched if download fails; validation will report missing tool.
+DEFAULT_BASE_REFS = ("origin/main", "main")
+
+# Seconds between "still running" progress lines while waiting on checks.
+PROGRESS_INTERVAL = 10.0
+
+
+def ensure_hadolint(seed_dir: Path | None = None) -> bool:
+    """Put a pinned, checksum-verified hadolint on PATH if none is installed."""
+    if shutil.which("hadolint"):
+        return True
+
+    binary = ensure_tool("hadolint", seed_dir)
+    if binary is None:
+        # Leave PATH untouched; validation will report missing tool.
         return False
 
-    os.environ["PATH"] = f"{dest_dir}:{os.environ.get('PATH', '')}"
+    os.environ["PATH"] = f"{binary.parent}{os.pathsep}{os.environ.get('PATH', '')}"
     return True
 
 
@@ -142,39 +200,325 @@ def build_checks() -> list[tuple[str, list[str]]]:
     return checks
 
 
-def run_check(check: tuple[str, list[str]]) -> tuple[bool, str, str]:
-    """Run a single check and return (success, name, output)."""
+@functools.cache
+def repo_files() -> tuple[str, ...]:
+    """Return tracked and untracked-but-not-ignored files relative to the repo root."""
+    try:
+        output = subprocess.check_output(
+            ["git", "ls-files", "--cached", "--others", "--exclude-standard"],  # noqa: S607
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return ()
+    return tuple(sorted({line for line in output.splitlines() if line}))
+
+
+def matching_files(patterns: tuple[str, ...], files: tuple[str, ...]) -> list[str]:
+    """Return the files matching any of the fnmatch ``patterns``."""
+    return [f for f in files if any(fnmatch.fnmatch(f, pattern) for pattern in patterns)]
+
+
+@functools.cache
+def tool_version(tool: str) -> str:
+    """Return the resolved path plus ``--version`` output of a tool (empty when unknown)."""
+    path = shutil.which(tool)
+    if not path:
+        return ""
+    try:
+        res = subprocess.run(  # noqa: S603
+            [path, "--version"],
+            check=False,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return path
+    return f"{path}\n{res.stdout.strip()}"
+
+
+def check_cache_key(check: tuple[str, list[str]]) -> str | None:
+    """Return the cache key for a check, or None when it must always run."""
+    name, cmd = check
+    patterns = CHECK_INPUTS.get(name)
+    if patterns is None or name in UNCACHEABLE_CHECKS:
+        return None
+    inputs = [Path(f) for f in matching_files(patterns, repo_files())]
+    return ResultCache.key(cmd, tool_version(cmd[0]), inputs)
+
+
+def merge_base(base_ref: str | None = None) -> str | None:
+    """Return the merge-base of HEAD with ``base_ref`` (default: origin/main, then main)."""
+    for ref in (base_ref,) if base_ref else DEFAULT_BASE_REFS:
+        try:
+            return subprocess.check_output(  # noqa: S603
+                ["git", "merge-base", "HEAD", ref],  # noqa: S607
+                text=True,
+                stderr=subprocess.DEVNULL,
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            continue
+    return None
+
+
+def changed_files(base: str) -> list[str]:
+    """Return paths changed since ``base`` (committed, staged, unstaged and untracked)."""
+    diff = subprocess.check_output(  # noqa: S603
+        ["git", "diff", "--name-only", base],  # noqa: S607
+        text=True,
+    )
+    untracked = subprocess.check_output(
+        ["git", "ls-files", "--others", "--exclude-standard"],  # noqa: S607
+        text=True,
+    )
+    return sorted({line for line in (diff + untracked).splitlines() if line})
+
+
+def select_checks(
+    checks: list[tuple[str, list[str]]],
+    changed: list[str],
+) -> list[tuple[str, list[str]]]:
+    """Keep checks whose inputs changed, narrowing file arguments where the tool allows."""
+    selected = []
+    for name, cmd in checks:
+        patterns = CHECK_INPUTS.get(name)
+        if patterns is None:
+            selected.append((name, cmd))
+            continue
+        touched = matching_files(patterns, tuple(changed))
+        if not touched:
+            logger.info("%s skipped (no relevant changes)", name)
+            continue
+        narrowed = narrowed_command(name, touched)
+        selected.append((name, narrowed or cmd))
+    return selected
+
+
+def narrowed_command(name: str, touched: list[str]) -> list[str] | None:
+    """Return the check's command over just the changed files it lints, if that is safe.
+
+    None means run the full command: the check cannot take a file list, a tool
+    config changed, or none of its own files still exist.
+    """
+    if name not in NARROWABLE_CHECKS or matching_files(CONFIG_INPUTS, tuple(touched)):
+        return None
+    files = matching_files(NARROWABLE_FILES[name], tuple(touched))
+    existing = [path for path in files if Path(path).is_file()]
+    return [*NARROWABLE_CHECKS[name], *existing] if existing else None
+
+
+def missing_tool_result(name: str, tool: str) -> tuple[bool, str, str]:
+    """Return the verdict for a check whose tool is not installed."""
+    lowered = name.lower()
+    if lowered.startswith("hadolint"):
+        return True, name, "hadolint missing, skipped"
+    if lowered.startswith("semgrep"):
+        return True, name, "semgrep missing, skipped"
+    return False, name, f"Tool not found: {tool}"
+
+
+def run_check(
+    check: tuple[str, list[str]],
+    *,
+    cache: ResultCache | None = None,
+    scheduler: Scheduler | None = None,
+    group: ProcessGroup | None = None,
+) -> tuple[bool, str, str]:
+    """Run a single check and return (success, name, output), replaying cached results.
+
+    With a scheduler the check waits for its CPU budget and its cost is recorded;
+    with a process group the child can be killed by fail-fast.
+    """
     name, cmd = check
     if not shutil.which(cmd[0]):
-        lowered = name.lower()
-        if lowered.startswith("hadolint"):
-            return True, name, "hadolint missing, skipped"
-        if lowered.startswith("semgrep"):
-            return True, name, "semgrep missing, skipped"
-        return False, name, f"Tool not found: {cmd[0]}"
+        return missing_tool_result(name, cmd[0])
+
+    key = check_cache_key(check) if cache is not None else None
+    if cache is not None and key is not None and (hit := cache.get(key)) is not None:
+        logger.info("%s: replaying cached result", name)
+        return hit.success, name, hit.output
+
     try:
-        res = subprocess.run(cmd, check=False, capture_output=True, text=True)  # noqa: S603
+        with scheduler.slot(name) if scheduler else contextlib.nullcontext():
+            res = run_measured(cmd, group)
     except (OSError, subprocess.SubprocessError, ValueError) as exc:  # pragma: no cover - defensive
         if name.lower().startswith("hadolint"):
             return True, name, f"hadolint skipped: {exc}"
         return False, name, str(exc)
-    return res.returncode == 0, name, res.stdout + res.stderr
+
+    if scheduler is not None:
+        scheduler.record(name, res)
+    success, output = res.returncode == 0, res.output
+    if cache is not None and key is not None:
+        cache.put(key, CachedResult(success=success, output=output))
+    return success, name, output
+
+
+def collect_results(
+    futures: dict[Future[tuple[bool, str, str]], str],
+    scheduler: Scheduler,
+    group: ProcessGroup,
+    *,
+    fail_fast: bool = False,
+) -> bool:
+    """Log checks as they finish and return True if any failed.
+
+    With ``fail_fast`` the first failure kills running children and cancels the rest.
+    """
+    failed = False
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+        if not done:
+            running = ", ".join(f"{n} {t:.0f}s" for n, t in sorted(scheduler.elapsed().items()))
+            logger.info("Still running: %s", running or "waiting for CPU budget")
+        for future in done:
+            if future.cancelled() or (fail_fast and failed):
+                logger.info("CANCELLED %s", futures[future])
+                continue
+            success, name, out = future.result()
+            span = scheduler.spans.get(name)
+            label = f"{name} ({span.duration:.1f}s)" if span else name
+            if success:
+                logger.info("PASS %s", label)
+                continue
+            logger.error("FAIL %s:\n%s", label, out)
+            failed = True
+            if fail_fast:
+                killed = group.kill()
+                cancelled = sum(f.cancel() for f in pending)
+                logger.error(
+                    "Fail-fast: killed %d running and cancelled %d queued checks",
+                    killed,
+                    cancelled,
+                )
+    return failed
+
+
+def parse_args() -> argparse.Namespace:  # pragma: no cover - CLI wiring
+    """Parse CLI arguments."""
+    p = argparse.ArgumentParser(description="Run the zero-tolerance validation suite")
+    p.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="bypass the result cache (neither replay nor store results)",
+    )
+    p.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="invalidate every cached result before running",
+    )
+    p.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="evict least recently used results beyond this size",
+    )
+    p.add_argument(
+        "--changed",
+        action="store_true",
+        help="only run checks whose inputs changed since the merge-base with --base-ref",
+    )
+    p.add_argument(
+        "--base-ref",
+        default=None,
+        help="ref to diff against in --changed mode (default: origin/main, then main)",
+    )
+    p.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop at the first failing check, killing the ones still running",
+    )
+    p.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="write a JSON timing/resource profile of every executed check to this path",
+    )
+    p.add_argument(
+        "--history",
+        type=Path,
+        nargs="?",
+        const=user_cache_dir("validate", "history.jsonl"),
+        default=None,
+        help="append the profile to a JSONL history (default: user cache) and flag regressions",
+    )
+    p.add_argument(
+        "--tool-seed-dir",
+        type=Path,
+        default=None,
+        help=f"seed pinned tool binaries (hadolint) from this directory (env: {SEED_DIR_ENV})",
+    )
+    return p.parse_args()
+
+
+def publish_profile(args: argparse.Namespace, scheduler: Scheduler) -> None:  # pragma: no cover
+    """Log the profile table and write the JSON report/history when requested."""
+    report = build_report(scheduler.executions, scheduler.wall_clock)
+    if report["checks"]:
+        for line in render_table(report):
+            logger.info("%s", line)
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        logger.info("Profile written to %s", args.report)
+    if args.history:
+        for message in find_regressions(report, load_history(args.history)):
+            logger.warning("Slower than usual: %s", message)
+        append_history(args.history, report)
+
+
+def planned_checks(args: argparse.Namespace) -> list[tuple[str, list[str]]]:  # pragma: no cover
+    """Return the checks to run, restricted to changed inputs when requested."""
+    checks = build_checks()
+    if not args.changed:
+        return checks
+    base = merge_base(args.base_ref)
+    if base is None:
+        logger.warning("No merge-base with %s; running the full suite", args.base_ref or "main")
+        return checks
+    changed = changed_files(base)
+    logger.info("Incremental mode: %d changed path(s) since %s", len(changed), base[:12])
+    return select_checks(checks, changed)
 
 
 def main() -> None:  # pragma: no cover
     """Run all validations and exit non-zero on any failure."""
     logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    args = parse_args()
     logger.info("Starting Zero-Tolerance Validation...")
-    ensure_hadolint()
-    failed = False
-    checks = build_checks()
-    with ThreadPoolExecutor() as exe:
-        for success, name, out in exe.map(run_check, checks):
-            if success:
-                logger.info("PASS %s", name)
-            else:
-                logger.error("FAIL %s:\n%s", name, out)
-                failed = True
+    checks = planned_checks(args)
+    if any(name == "Hadolint" for name, _ in checks):
+        ensure_hadolint(args.tool_seed_dir)
+
+    cache = ResultCache(user_cache_dir("validate", "results"), args.cache_max_mb * 1024 * 1024)
+    if args.clear_cache:
+        logger.info("Cleared %d cached results", cache.clear())
+    stats = StatsStore(user_cache_dir("validate", "stats.json"))
+    scheduler = Scheduler(stats, os.cpu_count() or 1)
+    group = ProcessGroup()
+    runner = functools.partial(
+        run_check,
+        cache=None if args.no_cache else cache,
+        scheduler=scheduler,
+        group=group,
+    )
+
+    # One thread per check: I/O-bound checks start at once, CPU-heavy ones queue on the budget.
+    with ThreadPoolExecutor(max_workers=max(len(checks), 1)) as exe:
+        futures = {exe.submit(runner, check): check[0] for check in scheduler.order(checks)}
+        try:
+            failed = collect_results(futures, scheduler, group, fail_fast=args.fail_fast)
+        except KeyboardInterrupt:
+            # Children run in their own sessions, so Ctrl-C must be forwarded explicitly.
+            group.kill()
+            raise
+    publish_profile(args, scheduler)
+    for line in scheduler.report():
+        logger.info("%s", line)
+    stats.save()
+    if not args.no_cache:
+        cache.evict()
     sys.exit(1 if failed else 0)
 
 
@@ -1,14 +1,32 @@
 #!/usr/bin/env python3
 """Validate devcontainer builds and runs correctly with all tools."""
 
+import argparse
+import json
 import subprocess
 import sys
-from dataclasses import dataclass
-
-from rich.console import Console
-from rich.table import Table
-
-console = Console()
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from scripts.build import BASE_IMAGES, calculate_hash, resolve_digests
+from scripts.devcontainer_ports import parse_matrix
+from scripts.lib.cache import FileDigestCache, user_cache_dir
+from scripts.lib.console import LazyConsole
+
+console = LazyConsole()
+
+BAKE_FILE = Path("docker/docker-bake.hcl")
+DEFAULT_JOBS = 4
+OUTPUT_FORMATS = ("table", "json", "junit")
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-8"?>\n'
+CONFIG_HASH_LABEL = "dev.pixi-devcontainer.config-hash"
+# Shell entrypoint: sources the pre-rendered env without starting Python.
+ENTRYPOINT = "/app/entrypoint.sh"
 
 EXPECTED_TOOLS = [
     ("gcc", "--version", "gcc"),
@@ -24,6 +42,51 @@ EXPECTED_TOOLS = [
 ]
 
 
+# Runs inside the container (via the entrypoint, so the pixi env is loaded) and
+# probes every tool in one exec, printing one JSON object per tool with its
+# in-container wall time.
+PROBE_SCRIPT = """
+import json, subprocess, sys, time
+for tool, arg in json.loads(sys.argv[1]):
+    started = time.perf_counter()
+    try:
+        res = subprocess.run([tool, arg], capture_output=True, text=True, check=False)
+        code, out = res.returncode, res.stdout + res.stderr
+    except OSError as exc:
+        code, out = 127, str(exc)
+    seconds = time.perf_counter() - started
+    print(json.dumps({"tool": tool, "returncode": code, "output": out, "seconds": seconds}))
+    sys.stdout.flush()
+"""
+
+
+@dataclass(frozen=True)
+class Variant:
+    """One os/env cell of the bake matrix."""
+
+    os: str
+    env: str
+    platform: str = "linux-64"
+
+    @property
+    def name(self) -> str:
+        """Return the bake-style ``<os>-<env>`` name."""
+        return f"{self.os}-{self.env}"
+
+    @property
+    def image(self) -> str:
+        """Return the local tag the variant is built under."""
+        return f"cpp-devcontainer:validation-{self.name}"
+
+    @property
+    def base_image(self) -> str:
+        """Return the upstream pixi base image for the variant."""
+        return f"ghcr.io/prefix-dev/pixi:{self.os}"
+
+
+DEFAULT_VARIANT = Variant(os="noble", env="stable")
+
+
 @dataclass
 class ToolResult:
     """Result of a tool validation within the container."""
@@ -32,6 +95,22 @@ class ToolResult:
     version: str
     success: bool
     error: str = ""
+    variant: str = ""
+    exit_code: int | None = None
+    latency: float = 0.0
+    output: str = ""
+
+
+@dataclass
+class VariantReport:
+    """Every tool result for one variant plus the image/container it was probed in."""
+
+    variant: Variant
+    results: list[ToolResult]
+    config_hash: str | None = None
+    image_id: str = ""
+    container_id: str = ""
+    metadata: dict[str, str] = field(default_factory=dict)
 
 
 def run_cmd(cmd: list[str], *, check: bool = True) -> subprocess.CompletedProcess:
@@ -39,38 +118,184 @@ def run_cmd(cmd: list[str], *, check: bool = True) -> subprocess.CompletedProces
     return subprocess.run(cmd, capture_output=True, text=True, check=check)  # noqa: S603
 
 
+def load_variants(bake_file: Path = BAKE_FILE, names: list[str] | None = None) -> list[Variant]:
+    """Return every os x env variant declared in the bake matrix, or just ``names``.
+
+    Raises ValueError when a requested name is not in the matrix.
+    """
+    os_values, env_values = parse_matrix(bake_file)
+    variants = [
+        Variant(os=os_name, env=env_name) for os_name in os_values for env_name in env_values
+    ]
+    if names is None:
+        return variants
+    by_name = {variant.name: variant for variant in variants}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        message = (
+            f"Unknown variant(s) {', '.join(unknown)}; "
+            f"{bake_file} defines {', '.join(by_name) or 'none'}"
+        )
+        raise ValueError(message)
+    return [by_name[name] for name in names]
+
+
+def parse_tool_output(
+    tool: str,
+    expected: str,
+    returncode: int,
+    output: str,
+    latency: float = 0.0,
+) -> ToolResult:
+    """Turn one tool's exit code and output into a validated result (output kept in full)."""
+    if returncode != 0:
+        return ToolResult(
+            name=tool,
+            version="",
+            success=False,
+            error=output.strip(),
+            exit_code=returncode,
+            latency=latency,
+            output=output,
+        )
+
+    version_line = output.strip().split("\n")[0]
+    if expected and expected not in version_line:
+        return ToolResult(
+            name=tool,
+            version=version_line,
+            success=False,
+            error="unexpected version string",
+            exit_code=returncode,
+            latency=latency,
+            output=output,
+        )
+    return ToolResult(
+        name=tool,
+        version=version_line,
+        success=True,
+        exit_code=returncode,
+        latency=latency,
+        output=output,
+    )
+
+
 def get_tool_version(container_id: str, tool: str, args: str, expected: str) -> ToolResult:
     """Execute a tool inside the container and validate its output."""
+    started = time.perf_counter()
     result = run_cmd(
         [
             "docker",
             "exec",
             container_id,
-            "/app/python_runtime",
-            "/app/entrypoint.py",
+            ENTRYPOINT,
             tool,
             args,
         ],
         check=False,
     )
-    output = result.stdout + result.stderr
-    if result.returncode != 0:
-        return ToolResult(name=tool, version="", success=False, error=output[:100])
+    return parse_tool_output(
+        tool,
+        expected,
+        result.returncode,
+        result.stdout + result.stderr,
+        time.perf_counter() - started,
+    )
 
-    version_line = output.strip().split("\n")[0]
-    if expected and expected not in version_line:
-        return ToolResult(
-            name=tool,
-            version=version_line,
-            success=False,
-            error="unexpected version string",
-        )
-    return ToolResult(name=tool, version=version_line, success=True)
+
+def probe_tools(container_id: str) -> dict[str, dict] | None:
+    """Run every tool's version check in a single exec; None if the probe itself failed."""
+    result = run_cmd(
+        [
+            "docker",
+            "exec",
+            container_id,
+            ENTRYPOINT,
+            "/app/python_runtime",
+            "-c",
+            PROBE_SCRIPT,
+            json.dumps([[tool, args] for tool, args, _ in EXPECTED_TOOLS]),
+        ],
+        check=False,
+    )
+    if result.returncode != 0:
+        return None
+    probes: dict[str, dict] = {}
+    for line in result.stdout.splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        # Stray output from the entrypoint or a tool is not a probe record.
+        if isinstance(entry, dict) and {"tool", "returncode", "output"} <= entry.keys():
+            probes[entry["tool"]] = entry
+    return probes
+
+
+def image_config_hash(image: str) -> str | None:
+    """Return the config-hash label of a local image, or None if absent/unlabeled."""
+    result = run_cmd(
+        [
+            "docker",
+            "image",
+            "inspect",
+            "--format",
+            f'{{{{ index .Config.Labels "{CONFIG_HASH_LABEL}" }}}}',
+            image,
+        ],
+        check=False,
+    )
+    label = result.stdout.strip()
+    if result.returncode != 0 or not label or label == "<no value>":
+        return None
+    return label
 
 
-def build_image() -> bool:
-    """Build the devcontainer image for validation."""
-    console.print("\n[bold cyan]Building devcontainer image...[/]")
+def image_metadata(image: str) -> dict[str, str]:
+    """Return the id, creation time, size and platform of a local image (empty if unknown)."""
+    result = run_cmd(
+        [
+            "docker",
+            "image",
+            "inspect",
+            "--format",
+            (
+                '{"id": "{{.Id}}", "created": "{{.Created}}", "size": "{{.Size}}", '
+                '"platform": "{{.Os}}/{{.Architecture}}"}'
+            ),
+            image,
+        ],
+        check=False,
+    )
+    if result.returncode != 0:
+        return {}
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        return {}
+
+
+def current_config_hash() -> str:
+    """Compute the same input hash scripts/build.py tags published images with."""
+    file_digests = FileDigestCache(user_cache_dir("build", "file-digests.json"))
+    config_hash = calculate_hash(resolve_digests(BASE_IMAGES), file_digests)
+    file_digests.save()
+    return config_hash
+
+
+def build_image(
+    variant: Variant = DEFAULT_VARIANT,
+    config_hash: str | None = None,
+    *,
+    rebuild: bool = False,
+) -> bool:
+    """Build the devcontainer image for validation, reusing a local image with the same hash."""
+    if config_hash and not rebuild and image_config_hash(variant.image) == config_hash:
+        console.print(f"[green]✓ Reusing {variant.image} (config hash {config_hash})[/]")
+        return True
+
+    console.print(f"\n[bold cyan]Building devcontainer image ({variant.name})...[/]")
+    label = ["--label", f"{CONFIG_HASH_LABEL}={config_hash}"] if config_hash else []
     result = run_cmd(
         [
             "docker",
@@ -80,27 +305,28 @@ def build_image() -> bool:
             "-f",
             "docker/Dockerfile",
             "--build-arg",
-            "BASE_IMAGE=ghcr.io/prefix-dev/pixi:noble",
+            f"BASE_IMAGE={variant.base_image}",
             "--build-arg",
-            "PIXI_ENV=stable",
+            f"PIXI_ENV={variant.env}",
             "--build-arg",
-            "PIXIPACK_PLATFORM=linux-64",
+            f"PIXIPACK_PLATFORM={variant.platform}",
+            *label,
             "-t",
-            "cpp-devcontainer:validation",
+            variant.image,
             ".",
         ],
         check=False,
     )
     if result.returncode != 0:
-        console.print(f"[red]Build failed:[/]\n{result.stderr}")
+        console.print(f"[red]Build failed ({variant.name}):[/]\n{result.stderr}")
         return False
-    console.print("[green]✓ Image built successfully[/]")
+    console.print(f"[green]✓ Image built successfully ({variant.name})[/]")
     return True
 
 
-def start_container() -> str | None:
-    """Start the validation container and return its ID."""
-    console.print("\n[bold cyan]Starting container...[/]")
+def start_container(variant: Variant = DEFAULT_VARIANT) -> str | None:
+    """Start a uniquely named validation container and return its ID."""
+    console.print(f"\n[bold cyan]Starting container ({variant.name})...[/]")
     result = run_cmd(
         [
             "docker",
@@ -108,20 +334,20 @@ def start_container() -> str | None:
             "-d",
             "--rm",
             "--name",
-            "cpp-validation-test",
+            f"cpp-validation-{variant.name}-{uuid.uuid4().hex[:8]}",
             "--entrypoint",
             "/bin/sh",
-            "cpp-devcontainer:validation",
+            variant.image,
             "-c",
             "sleep 300",
         ],
         check=False,
     )
     if result.returncode != 0:
-        console.print(f"[red]Failed to start container:[/]\n{result.stderr}")
+        console.print(f"[red]Failed to start container ({variant.name}):[/]\n{result.stderr}")
         return None
     container_id = result.stdout.strip()
-    console.print(f"[green]✓ Container started: {container_id[:12]}[/]")
+    console.print(f"[green]✓ Container started ({variant.name}): {container_id[:12]}[/]")
     return container_id
 
 
@@ -133,16 +359,85 @@ def stop_container(container_id: str) -> None:
 def validate_tools(container_id: str) -> list[ToolResult]:
     """Validate expected tool versions inside the container."""
     console.print("\n[bold cyan]Validating tools...[/]")
+    probes = probe_tools(container_id)
+    if probes is None:
+        console.print("[yellow]Batched probe failed; probing tools one exec at a time[/]")
+        return [
+            get_tool_version(container_id, tool, args, expected)
+            for tool, args, expected in EXPECTED_TOOLS
+        ]
     results = []
-    for tool, args, expected in EXPECTED_TOOLS:
-        result = get_tool_version(container_id, tool, args, expected)
-        results.append(result)
+    for tool, _, expected in EXPECTED_TOOLS:
+        probe = probes.get(tool, {"returncode": -1, "output": "no probe output"})
+        results.append(
+            parse_tool_output(
+                tool,
+                expected,
+                probe["returncode"],
+                probe["output"],
+                probe.get("seconds", 0.0),
+            ),
+        )
     return results
 
 
+def failure_row(variant: Variant, step: str, error: str) -> ToolResult:
+    """Return a failed result row standing in for a variant that never got probed."""
+    return ToolResult(name=step, version="", success=False, error=error, variant=variant.name)
+
+
+def validate_variant(
+    variant: Variant,
+    config_hash: str | None = None,
+    *,
+    rebuild: bool = False,
+) -> VariantReport:
+    """Build (or reuse), start and probe one variant; failures become result rows."""
+    report = VariantReport(variant=variant, results=[], config_hash=config_hash)
+    if not build_image(variant, config_hash, rebuild=rebuild):
+        report.results = [failure_row(variant, "<build>", "build failed")]
+        return report
+    report.metadata = image_metadata(variant.image)
+    report.image_id = report.metadata.pop("id", "")
+
+    container_id = start_container(variant)
+    if not container_id:
+        report.results = [failure_row(variant, "<start>", "start failed")]
+        return report
+    report.container_id = container_id
+
+    try:
+        report.results = validate_tools(container_id)
+    finally:
+        console.print(f"\n[dim]Cleaning up ({variant.name})...[/]")
+        stop_container(container_id)
+    for result in report.results:
+        result.variant = variant.name
+    return report
+
+
+def validate_variants(
+    variants: list[Variant],
+    jobs: int,
+    config_hash: str | None = None,
+    *,
+    rebuild: bool = False,
+) -> list[VariantReport]:
+    """Validate variants concurrently with at most ``jobs`` in flight, keeping matrix order."""
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(variants)))) as exe:
+        return list(
+            exe.map(lambda v: validate_variant(v, config_hash, rebuild=rebuild), variants),
+        )
+
+
 def print_results(results: list[ToolResult]) -> bool:
     """Render a results table and return True if all passed."""
+    from rich.table import Table  # noqa: PLC0415 - keep rich off the import path
+
     table = Table(title="Tool Validation Results")
+    show_variant = any(r.variant for r in results)
+    if show_variant:
+        table.add_column("Variant", style="magenta")
     table.add_column("Tool", style="cyan")
     table.add_column("Version", style="green")
     table.add_column("Status", style="bold")
@@ -150,8 +445,9 @@ def print_results(results: list[ToolResult]) -> bool:
     all_passed = True
     for r in results:
         status = "[green]✓ PASS[/]" if r.success else "[red]✗ FAIL[/]"
-        version = r.version if r.success else r.error
-        table.add_row(r.name, version[:60], status)
+        version = r.version if r.success else r.error.split("\n")[0]
+        row = [r.name, version[:60], status]
+        table.add_row(*([r.variant, *row] if show_variant else row))
         if not r.success:
             all_passed = False
 
@@ -159,30 +455,160 @@ def print_results(results: list[ToolResult]) -> bool:
     return all_passed
 
 
+def results_payload(reports: list[VariantReport]) -> dict:
+    """Return the full, untruncated results as a JSON-serialisable document."""
+    return {
+        "generated_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "success": all(r.success for report in reports for r in report.results),
+        "variants": [
+            {
+                "variant": report.variant.name,
+                "os": report.variant.os,
+                "env": report.variant.env,
+                "platform": report.variant.platform,
+                "image": report.variant.image,
+                "base_image": report.variant.base_image,
+                "image_id": report.image_id,
+                "container_id": report.container_id,
+                "config_hash": report.config_hash,
+                "metadata": report.metadata,
+                "tools": [
+                    {k: v for k, v in asdict(r).items() if k != "variant"} for r in report.results
+                ],
+            }
+            for report in reports
+        ],
+    }
+
+
+def junit_xml(reports: list[VariantReport]) -> ET.Element:
+    """Return a JUnit ``testsuites`` element: one testsuite per variant, one testcase per tool."""
+    suites = ET.Element("testsuites", name="devcontainer-validation")
+    for report in reports:
+        failures = sum(not r.success for r in report.results)
+        suite = ET.SubElement(
+            suites,
+            "testsuite",
+            name=report.variant.name,
+            tests=str(len(report.results)),
+            failures=str(failures),
+            time=f"{sum(r.latency for r in report.results):.3f}",
+        )
+        props = ET.SubElement(suite, "properties")
+        for key, value in {
+            "image": report.variant.image,
+            "image_id": report.image_id,
+            "container_id": report.container_id,
+            "config_hash": report.config_hash or "",
+            **report.metadata,
+        }.items():
+            ET.SubElement(props, "property", name=key, value=value)
+        for r in report.results:
+            case = ET.SubElement(
+                suite,
+                "testcase",
+                classname=f"devcontainer.{report.variant.name}",
+                name=r.name,
+                time=f"{r.latency:.3f}",
+            )
+            if not r.success:
+                failure = ET.SubElement(case, "failure", message=r.error.split("\n")[0])
+                # Build/start failure rows never ran a tool, so they have no exit code.
+                exit_line = "" if r.exit_code is None else f"exit code: {r.exit_code}\n"
+                failure.text = exit_line + (r.output or r.error)
+            ET.SubElement(case, "system-out").text = r.output
+    ET.indent(suites)
+    return suites
+
+
+def write_structured(reports: list[VariantReport], fmt: str, output: Path | None) -> None:
+    """Write JSON or JUnit results to ``output`` (stdout when None)."""
+    if fmt == "json":
+        text = json.dumps(results_payload(reports), indent=2) + "\n"
+    else:
+        text = XML_DECLARATION + ET.tostring(junit_xml(reports), encoding="unicode")
+        text += "\n"
+    if output is None:
+        sys.stdout.write(text)
+        return
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(text, encoding="utf-8")
+    console.print(f"📝 Wrote {fmt} results to {output}")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse CLI arguments."""
+    p = argparse.ArgumentParser(description="Build and validate devcontainer images")
+    p.add_argument(
+        "--all-variants",
+        action="store_true",
+        help=f"validate every os x env variant from {BAKE_FILE} (default: noble-stable only)",
+    )
+    p.add_argument(
+        "--variant",
+        action="append",
+        default=None,
+        help="validate this <os>-<env> variant from the bake matrix; repeatable",
+    )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="maximum variants built and validated concurrently",
+    )
+    p.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="build even when a local image already carries the current config hash",
+    )
+    p.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="table",
+        help="also emit untruncated results as JSON or JUnit XML (table is always shown)",
+    )
+    p.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="write --format json/junit results here instead of stdout",
+    )
+    return p.parse_args()
+
+
 def main() -> int:
     """Entrypoint for devcontainer validation."""
+    args = parse_args()
+    if args.format != "table" and args.output is None:
+        # Keep stdout machine-readable; progress and the table go to stderr.
+        console.file = sys.stderr
     console.rule("[bold blue]Devcontainer Validation")
 
-    if not build_image():
-        return 1
-
-    container_id = start_container()
-    if not container_id:
-        return 1
-
     try:
-        results = validate_tools(container_id)
-        success = print_results(results)
-
-        console.print()
-        if success:
-            console.print("[bold green]✓ All validations passed![/]")
-            return 0
-        console.print("[bold red]✗ Some validations failed[/]")
+        variants = (
+            load_variants(names=args.variant)
+            if args.variant or args.all_variants
+            else [DEFAULT_VARIANT]
+        )
+    except ValueError as exc:
+        console.print(f"[red]{exc}[/]")
         return 1
-    finally:
-        console.print("\n[dim]Cleaning up...[/]")
-        stop_container(container_id)
+    if not variants:
+        console.print(f"[red]Could not parse os/env matrix from {BAKE_FILE}[/]")
+        return 1
+    config_hash = current_config_hash()
+    console.print(f"🔑 Config hash: {config_hash}")
+    reports = validate_variants(variants, args.jobs, config_hash, rebuild=args.rebuild)
+    success = print_results([r for report in reports for r in report.results])
+    if args.format != "table":
+        write_structured(reports, args.format, args.output)
+
+    console.print()
+    if success:
+        console.print("[bold green]✓ All validations passed![/]")
+        return 0
+    console.print("[bold red]✗ Some validations failed[/]")
+    return 1
 
 
 if __name__ == "__main__":